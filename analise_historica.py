@@ -0,0 +1,157 @@
+"""
+Análises históricas com DuckDB:
+une a tabela de vagas do SQLite (lida pelo sqlite scanner, em modo somente leitura) com as partições Parquet
+arquivadas pela retenção, para tendências de meses por site, empresa, palavra-chave e estado
+sem passar pelo banco de escrita.
+"""
+
+import os
+import glob
+import sqlite3
+import logging
+import pandas as pd
+import pyarrow as pa
+from retencao import DIRETORIO_ARQUIVO
+
+logger = logging.getLogger(__name__)
+
+# Colunas usadas nas análises (as mesmas nas vagas atuais e nas arquivadas)
+COLUNAS_HISTORICO = ['id', 'cluster_id', 'titulo', 'empresa', 'localizacao', 'estado',
+                     'site_origem', 'keyword_busca', 'coletada_em', 'salario_mensal_brl']
+
+# Dimensão -> expressão SQL sobre a view historico
+DIMENSOES = {
+    'site': "COALESCE(site_origem, 'Não informado')",
+    'empresa': "COALESCE(empresa, 'Não informado')",
+    'keyword': "COALESCE(keyword_busca, 'Não informado')",
+    # UF da localização ("São Paulo, SP - Brasil"); senão, o estado da busca
+    'estado': r"""COALESCE(NULLIF(regexp_extract(localizacao, ',\s*([A-Z]{2})\b', 1), ''),
+                           NULLIF(estado, ''), 'Não informado')"""
+}
+
+GRANULARIDADES = {'dia': 'day', 'semana': 'week', 'mes': 'month'}
+
+class AnaliseHistorica:
+    def __init__(self, db_path="vagas_linkedin.db", diretorio_arquivo=DIRETORIO_ARQUIVO, threads=None):
+        self.db_path = db_path
+        self.diretorio_arquivo = diretorio_arquivo
+        self.threads = threads  # None = todos os núcleos
+        self.conn = None
+        self._usar_scanner = True
+    
+    def _anexar_sqlite(self, conn):
+        """Anexa o banco pelo sqlite scanner; sem a extensão (ex.: offline), copia as colunas em lotes"""
+        import duckdb
+        
+        colunas = ", ".join(COLUNAS_HISTORICO)
+        if self._usar_scanner:
+            try:
+                conn.execute("INSTALL sqlite")
+                conn.execute("LOAD sqlite")
+                conn.execute("ATTACH ? AS quente (TYPE sqlite, READ_ONLY)", [self.db_path])
+                conn.execute(f"CREATE VIEW vagas_quentes AS SELECT {colunas} FROM quente.vagas")
+                return
+            except duckdb.Error as e:
+                logger.warning(f"⚠️ Extensão sqlite do DuckDB indisponível, lendo o banco via sqlite3: {e}")
+                self._usar_scanner = False
+        
+        conexao_sqlite = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            lotes = [pa.Table.from_pandas(lote, preserve_index=False) for lote in
+                     pd.read_sql_query(f"SELECT {colunas} FROM vagas", conexao_sqlite, chunksize=50000)]
+        finally:
+            conexao_sqlite.close()
+        
+        if lotes:
+            tabela = pa.concat_tables(lotes, promote_options='permissive')
+        else:
+            tipos = {'coletada_em': pa.int64(), 'salario_mensal_brl': pa.float64()}
+            tabela = pa.table({coluna: pa.array([], tipos.get(coluna, pa.string())) for coluna in COLUNAS_HISTORICO})
+        conn.register('vagas_quentes_arrow', tabela)
+        conn.execute(f"CREATE VIEW vagas_quentes AS SELECT {colunas} FROM vagas_quentes_arrow")
+    
+    def conectar(self):
+        """Conexão DuckDB em memória com a view historico (vagas atuais + arquivadas, coluna `origem`),
+        reaproveitada pelas consultas seguintes até fechar()"""
+        if self.conn is not None:
+            return self.conn
+        
+        import duckdb  # Carregado só quando o histórico é consultado, fora da inicialização do dashboard
+        
+        conn = duckdb.connect()
+        if self.threads:
+            conn.execute(f"SET threads = {int(self.threads)}")
+        
+        self._anexar_sqlite(conn)
+        consulta = f"SELECT {', '.join(COLUNAS_HISTORICO)}, 'atual' AS origem FROM vagas_quentes"
+        
+        padrao = os.path.join(self.diretorio_arquivo, "**", "*.parquet")
+        if glob.glob(padrao, recursive=True):
+            padrao_sql = padrao.replace("'", "''")
+            conn.execute(f"""
+                CREATE VIEW vagas_arquivadas AS
+                SELECT {', '.join(COLUNAS_HISTORICO)}, 'arquivo' AS origem
+                FROM read_parquet('{padrao_sql}', hive_partitioning = true, union_by_name = true)
+            """)
+            consulta += " UNION ALL BY NAME SELECT * FROM vagas_arquivadas"
+        
+        conn.execute(f"CREATE VIEW historico AS {consulta}")
+        self.conn = conn
+        return conn
+    
+    def fechar(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    def resumo(self):
+        """Totais do histórico: vagas atuais, arquivadas, únicas e período coberto"""
+        atuais, arquivadas, unicas, inicio, fim = self.conectar().execute("""
+            SELECT COUNT(*) FILTER (WHERE origem = 'atual'),
+                   COUNT(*) FILTER (WHERE origem = 'arquivo'),
+                   COUNT(DISTINCT COALESCE(cluster_id, id)),
+                   MIN(coletada_em), MAX(coletada_em)
+            FROM historico
+        """).fetchone()
+        
+        return {'atuais': atuais, 'arquivadas': arquivadas, 'total': atuais + arquivadas,
+                'unicas': unicas, 'inicio': inicio, 'fim': fim}
+    
+    def tendencia(self, dimensao, granularidade='semana', top=8):
+        """Vagas únicas por período para os `top` valores mais frequentes da dimensão"""
+        expressao = DIMENSOES[dimensao]
+        periodo = GRANULARIDADES[granularidade]
+        
+        return self.conectar().execute(f"""
+            WITH base AS (
+                SELECT {expressao} AS valor,
+                       date_trunc('{periodo}', to_timestamp(coletada_em)) AS periodo,
+                       COALESCE(cluster_id, id) AS vaga
+                FROM historico
+                WHERE coletada_em IS NOT NULL
+            ),
+            principais AS (
+                SELECT valor FROM base GROUP BY valor ORDER BY COUNT(DISTINCT vaga) DESC LIMIT ?
+            )
+            SELECT periodo, valor, COUNT(DISTINCT vaga) AS vagas
+            FROM base
+            WHERE valor IN (SELECT valor FROM principais)
+            GROUP BY periodo, valor
+            ORDER BY periodo, vagas DESC
+        """, [top]).df()
+    
+    def ranking(self, dimensao, top=15):
+        """Valores da dimensão com mais vagas únicas no histórico, com salário mediano e primeira/última coleta"""
+        expressao = DIMENSOES[dimensao]
+        
+        return self.conectar().execute(f"""
+            SELECT {expressao} AS valor,
+                   COUNT(DISTINCT COALESCE(cluster_id, id)) AS vagas,
+                   ROUND(MEDIAN(salario_mensal_brl), 2) AS salario_mediano,
+                   to_timestamp(MIN(coletada_em)) AS primeira_coleta,
+                   to_timestamp(MAX(coletada_em)) AS ultima_coleta
+            FROM historico
+            GROUP BY valor
+            ORDER BY vagas DESC
+            LIMIT ?
+        """, [top]).df()
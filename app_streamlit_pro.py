@@ -4,15 +4,24 @@ App Streamlit com DataTable interativa e funcionalidades de exclusão
 
 import streamlit as st
 import pandas as pd
+import os
 import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from functools import partial
 import time
-from scraper import executar_scraping_jobspy, executar_scraping_selenium
+from backends_scraping import executar_backend
+from database import DatabaseManager
+from datas import agora_epoch, formatar_epoch
+from exportacao import FORMATOS, exportar_para_temporario, ler_exportacao
+from analise_historica import AnaliseHistorica, DIMENSOES, GRANULARIDADES
 import threading
 import asyncio
 
+# Intervalo (s) das seções atualizadas sem recarregar a página: métricas, cards e verificação do auto-scraping
+INTERVALO_ATUALIZACAO = 120
+
 # Configuração da página
 st.set_page_config(
     page_title="SearchVagas - Dashboard",
@@ -138,21 +147,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 class StreamlitAppAvancado:
-    def __init__(self):
-        self.db_path = "vagas_linkedin.db"
-        
+    def __init__(self, db_path="vagas_linkedin.db"):
+        self.db_path = db_path
+        self.db = DatabaseManager(db_path)  # Garante o esquema atualizado (descrições à parte)
+    
     def conectar_db(self):
         """Conecta ao banco de dados"""
         return sqlite3.connect(self.db_path)
     
     def deletar_vaga(self, vaga_id):
-        """Deleta uma vaga específica"""
+        """Deleta uma vaga específica (o tombstone impede que volte no próximo scraping)"""
         try:
-            conn = self.conectar_db()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM vagas WHERE id = ?", (vaga_id,))
-            conn.commit()
-            conn.close()
+            self.db.excluir_vagas([vaga_id])
             return True
         except Exception as e:
             st.error(f"Erro ao deletar vaga: {e}")
@@ -161,11 +167,8 @@ class StreamlitAppAvancado:
     def deletar_todas_vagas(self):
         """Deleta todas as vagas do banco"""
         try:
-            conn = self.conectar_db()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM vagas")
-            conn.commit()
-            conn.close()
+            self.db.remover_vagas()
+            self.db.liberar_espaco()
             return True
         except Exception as e:
             st.error(f"Erro ao deletar todas as vagas: {e}")
@@ -222,94 +225,71 @@ class StreamlitAppAvancado:
                 'estados': sorted(list(estados)),
                 'cidades': sorted(list(cidades))
             }
-            
+        
         except Exception as e:
             st.error(f"Erro ao extrair estados e cidades: {e}")
             conn.close()
             return {'estados': [], 'cidades': []}
     
-    def obter_vagas_dataframe(self, limit=None, horas_recentes=None, filtros=None):
-        """Obtém vagas como DataFrame para a datatable"""
+    def obter_vagas_dataframe(self, limit=None, horas_recentes=None, filtros=None, agrupar_duplicatas=False,
+                              apos_seq=None, ids=None, perfil=None):
+        """Obtém vagas como DataFrame para a datatable
+        
+        Com agrupar_duplicatas=True, vagas do mesmo cluster (mesma vaga em sites diferentes)
+        aparecem uma vez só, representadas pela coleta mais recente.
+        Com apos_seq, só as vagas inseridas depois dessa marca; com ids, só essas vagas
+        (agrupando, os grupos completos que as contêm).
+        Com perfil, ordena pela relevância em relação ao perfil em vez da data de coleta.
+        """
+        if perfil:
+            return self.obter_vagas_relevantes(perfil, limit, horas_recentes, filtros, agrupar_duplicatas)
+        
         conn = self.conectar_db()
         
-        query = """
-        SELECT id, titulo, empresa, localizacao, descricao, link, data_postagem, 
-               data_coleta, keyword_busca, area_vaga, numero_candidatos, 
-               site_origem, job_type, is_remote, salary_info
+        if agrupar_duplicatas:
+            # MAX() faz o SQLite preencher as demais colunas com a linha mais recente do grupo
+            coluna_data = """MAX(coletada_em) AS coletada_em, COUNT(*) AS ocorrencias,
+               GROUP_CONCAT(DISTINCT site_origem) AS sites_duplicatas"""
+        else:
+            coluna_data = "coletada_em"
+        
+        query = f"""
+        SELECT id, seq, COALESCE(cluster_id, id) AS grupo, titulo, empresa, empresa_id, localizacao,
+               descricao_resumo, horario_flexivel, link, data_postagem, postada_em, {coluna_data},
+               keyword_busca, area_vaga, numero_candidatos, site_origem, job_type, is_remote,
+               salary_info, salario_mensal_brl, oculta
         FROM vagas
         """
         
-        conditions = []
-        params = []
+        conditions, params = self.db.montar_filtros(horas_recentes, filtros)
         
-        if horas_recentes:
-            conditions.append("data_coleta >= datetime('now', '-{} hours')".format(horas_recentes))
+        # Subconjunto de poucas linhas (vagas novas ou candidatas do ranking)
+        subconjunto = None
+        if apos_seq is not None:
+            subconjunto, params_subconjunto = "seq > ?", [apos_seq]
+        elif ids is not None:
+            subconjunto, params_subconjunto = f"id IN ({', '.join('?' * len(ids))})", list(ids)
         
-        # Aplicar filtros adicionais
-        if filtros:
-            if filtros.get('empresa') and filtros['empresa'] != 'Todas':
-                conditions.append("empresa = ?")
-                params.append(filtros['empresa'])
-            
-            if filtros.get('site') and filtros['site'] != 'Todos':
-                conditions.append("site_origem = ?")
-                params.append(filtros['site'])
-            
-            if filtros.get('keyword') and filtros['keyword'] != 'Todas':
-                conditions.append("keyword_busca = ?")
-                params.append(filtros['keyword'])
-            
-            if filtros.get('job_type') and filtros['job_type'] != 'Todos':
-                conditions.append("job_type = ?")
-                params.append(filtros['job_type'])
-            
-            if filtros.get('is_remote') and filtros['is_remote'] != 'Todos':
-                conditions.append("is_remote = ?")
-                params.append(filtros['is_remote'])
-            
-            # Filtro por horário flexível
-            if filtros.get('horario_flexivel') and filtros['horario_flexivel'] != 'Todos':
-                if filtros['horario_flexivel'] == 'True':
-                    conditions.append("""(
-                        LOWER(descricao) LIKE '%horário flexível%' OR 
-                        LOWER(descricao) LIKE '%horario flexivel%' OR 
-                        LOWER(descricao) LIKE '%flexible schedule%' OR 
-                        LOWER(descricao) LIKE '%flexibilidade de horário%' OR 
-                        LOWER(descricao) LIKE '%flexibilidade horário%' OR 
-                        LOWER(descricao) LIKE '%horários flexíveis%' OR 
-                        LOWER(descricao) LIKE '%horarios flexiveis%'
-                    )""")
-                else:  # False
-                    conditions.append("""NOT (
-                        LOWER(descricao) LIKE '%horário flexível%' OR 
-                        LOWER(descricao) LIKE '%horario flexivel%' OR 
-                        LOWER(descricao) LIKE '%flexible schedule%' OR 
-                        LOWER(descricao) LIKE '%flexibilidade de horário%' OR 
-                        LOWER(descricao) LIKE '%flexibilidade horário%' OR 
-                        LOWER(descricao) LIKE '%horários flexíveis%' OR 
-                        LOWER(descricao) LIKE '%horarios flexiveis%'
-                    )""")
-            
-            # Filtro por estados (múltipla seleção)
-            if filtros.get('estados') and filtros['estados']:
-                estados_conditions = []
-                for estado in filtros['estados']:
-                    estados_conditions.append(f"localizacao LIKE '%{estado}%'")
-                if estados_conditions:
-                    conditions.append(f"({' OR '.join(estados_conditions)})")
-            
-            # Filtro por cidades (múltipla seleção)
-            if filtros.get('cidades') and filtros['cidades']:
-                cidades_conditions = []
-                for cidade in filtros['cidades']:
-                    cidades_conditions.append(f"localizacao LIKE '%{cidade}%'")
-                if cidades_conditions:
-                    conditions.append(f"({' OR '.join(cidades_conditions)})")
+        if subconjunto:
+            # NOT INDEXED: a busca parte do rowid das linhas do subconjunto, não de idx_vagas_visiveis
+            query = query.replace("FROM vagas", "FROM vagas NOT INDEXED")
+            if agrupar_duplicatas:
+                # Grupos completos das linhas do subconjunto (as demais linhas do cluster vêm pelo índice)
+                conditions.append(f"""rowid IN (
+                    SELECT rowid FROM vagas WHERE cluster_id IN (SELECT cluster_id FROM vagas WHERE {subconjunto})
+                    UNION SELECT rowid FROM vagas WHERE {subconjunto})""")
+                params.extend(params_subconjunto * 2)
+            else:
+                conditions.append(f"rowid IN (SELECT rowid FROM vagas WHERE {subconjunto})")
+                params.extend(params_subconjunto)
         
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
-        query += " ORDER BY data_coleta DESC"
+        if agrupar_duplicatas:
+            query += " GROUP BY COALESCE(cluster_id, id)"
+        
+        query += " ORDER BY coletada_em DESC"
         
         if limit:
             query += f" LIMIT {limit}"
@@ -329,9 +309,15 @@ class StreamlitAppAvancado:
                 df['is_remote'] = df['is_remote'].fillna('Não informado')
                 df['salary_info'] = df['salary_info'].fillna('Não informado')
                 df['keyword_busca'] = df['keyword_busca'].fillna('Não informado')
-                df['data_postagem'] = df['data_postagem'].fillna('Não informado')
+                df['data_postagem'] = [
+                    formatar_epoch(postada_em, '%Y-%m-%d', utc=True) if pd.notna(postada_em)
+                    else (texto if texto and texto != 'nan' else 'Não informado')
+                    for postada_em, texto in zip(df['postada_em'], df['data_postagem'])
+                ]
+                df['data_coleta'] = df['coletada_em'].apply(formatar_epoch)
                 df['numero_candidatos'] = df['numero_candidatos'].fillna('0')
-                df['descricao'] = df['descricao'].fillna('Sem descrição')
+                df['descricao_resumo'] = df['descricao_resumo'].fillna('Sem descrição')
+                df['horario_flexivel'] = df['horario_flexivel'].fillna(0).astype(bool)
                 df['link'] = df['link'].fillna('')
                 df['area_vaga'] = df['area_vaga'].fillna('Não informado')
                 
@@ -344,38 +330,116 @@ class StreamlitAppAvancado:
             conn.close()
             return pd.DataFrame()
     
+    def obter_vagas_relevantes(self, perfil, limit=None, horas_recentes=None, filtros=None,
+                               agrupar_duplicatas=False, tamanho_bloco=2000):
+        """Vagas dos filtros ordenadas pela similaridade TF-IDF com o perfil (empates: as mais recentes).
+        Percorre o ranking em blocos crescentes, buscando pela seq só o id e o grupo das candidatas
+        que passam nos filtros; a listagem completa é montada apenas para as `limit` primeiras.
+        Candidatas cujo id no banco difere do id indexado são descartadas e o índice é reconstruído no próximo uso."""
+        indice = carregar_indice_relevancia(self.db_path)
+        indice.atualizar(salvar=False)  # Só o scheduler grava o índice em disco
+        ids, seqs, pontuacoes = indice.ranquear(perfil)
+        
+        conditions, params = self.db.montar_filtros(horas_recentes, filtros)
+        selecionadas = {}  # id (ou grupo) -> (id da melhor vaga, pontuação), na ordem do ranking
+        divergentes = 0
+        conn = self.conectar_db()
+        try:
+            inicio = 0
+            while inicio < len(ids) and not (limit and len(selecionadas) >= limit):
+                lote = seqs[inicio:inicio + tamanho_bloco].tolist()
+                posicoes = {seq: inicio + i for i, seq in enumerate(lote)}
+                # INDEXED BY: cada candidata é lida direto pela seq, não por idx_vagas_visiveis
+                consulta = f"""
+                    SELECT seq, id, COALESCE(cluster_id, id) FROM vagas INDEXED BY idx_vagas_seq
+                    WHERE {' AND '.join(conditions + [f"seq IN ({', '.join('?' * len(lote))})"])}
+                """
+                linhas = conn.execute(consulta, params + lote).fetchall()
+                for seq, vaga_id, grupo in sorted(linhas, key=lambda linha: posicoes[linha[0]]):
+                    if vaga_id != ids[posicoes[seq]]:
+                        divergentes += 1  # A pontuação é de outra vaga (ids recalculados no banco)
+                        continue
+                    chave = grupo if agrupar_duplicatas else vaga_id
+                    if chave not in selecionadas:
+                        selecionadas[chave] = (vaga_id, float(pontuacoes[posicoes[seq]]))
+                
+                inicio += tamanho_bloco
+                tamanho_bloco = min(tamanho_bloco * 2, 30000)  # Filtros seletivos: blocos maiores a cada volta
+        finally:
+            conn.close()
+        
+        if divergentes:
+            indice.invalidar()
+        
+        selecionadas = dict(list(selecionadas.items())[:limit] if limit else selecionadas)
+        if not selecionadas:
+            return pd.DataFrame()
+        
+        df = self.obter_vagas_dataframe(horas_recentes=horas_recentes, filtros=filtros,
+                                        agrupar_duplicatas=agrupar_duplicatas,
+                                        ids=[vaga_id for vaga_id, _ in selecionadas.values()])
+        if df.empty:
+            return df
+        
+        chave = 'grupo' if agrupar_duplicatas else 'id'
+        ordem = {valor: posicao for posicao, valor in enumerate(selecionadas)}
+        df['relevancia'] = df[chave].map(lambda valor: selecionadas[valor][1] if valor in selecionadas else 0.0)
+        df = df.iloc[sorted(range(len(df)), key=lambda i: ordem.get(df[chave].iat[i], len(ordem)))]
+        return df.reset_index(drop=True)
+    
+    def obter_descricao(self, vaga_id):
+        """Obtém a descrição completa de uma vaga sob demanda"""
+        try:
+            return self.db.obter_descricao(vaga_id)
+        except Exception as e:
+            st.error(f"Erro ao obter descrição: {e}")
+            return None
+    
     def obter_estatisticas(self):
-        """Obtém estatísticas das vagas"""
+        """Obtém estatísticas das vagas (sem as ocultas, como nas listagens)"""
         conn = self.conectar_db()
         
         stats = {}
         
         try:
             # Total de vagas
-            stats['total'] = pd.read_sql_query("SELECT COUNT(*) as count FROM vagas", conn).iloc[0]['count']
+            stats['total'] = pd.read_sql_query(
+                "SELECT COUNT(*) as count FROM vagas WHERE oculta = 0", conn
+            ).iloc[0]['count']
+            
+            # Vagas únicas (a mesma vaga em vários sites conta uma vez)
+            stats['unicas'] = pd.read_sql_query(
+                "SELECT COUNT(DISTINCT COALESCE(cluster_id, id)) as count FROM vagas WHERE oculta = 0", conn
+            ).iloc[0]['count']
             
             # Vagas por site
             stats['por_site'] = pd.read_sql_query("""
                 SELECT COALESCE(site_origem, 'Não informado') as site_origem, COUNT(*) as count 
                 FROM vagas 
+                WHERE oculta = 0
                 GROUP BY COALESCE(site_origem, 'Não informado')
                 ORDER BY count DESC
             """, conn)
             
-            # Vagas por empresa (top 10)
+            # Vagas por empresa (top 10), agrupadas pela empresa canônica
             stats['por_empresa'] = pd.read_sql_query("""
-                SELECT COALESCE(empresa, 'Não informado') as empresa, COUNT(*) as count 
-                FROM vagas 
-                GROUP BY COALESCE(empresa, 'Não informado')
-                ORDER BY count DESC 
-                LIMIT 10
+                SELECT COALESCE(e.nome, 'Não informado') as empresa, c.count
+                FROM (
+                    SELECT empresa_id, COUNT(*) as count
+                    FROM vagas
+                    WHERE oculta = 0
+                    GROUP BY empresa_id
+                    ORDER BY count DESC
+                    LIMIT 10
+                ) c LEFT JOIN empresas e ON e.id = c.empresa_id
+                ORDER BY c.count DESC
             """, conn)
             
             # Vagas por tipo de trabalho
             stats['por_tipo'] = pd.read_sql_query("""
                 SELECT COALESCE(job_type, 'Não informado') as job_type, COUNT(*) as count 
                 FROM vagas 
-                WHERE COALESCE(job_type, 'Não informado') != 'Não informado'
+                WHERE oculta = 0 AND COALESCE(job_type, 'Não informado') != 'Não informado'
                 GROUP BY COALESCE(job_type, 'Não informado')
                 ORDER BY count DESC
             """, conn)
@@ -384,6 +448,7 @@ class StreamlitAppAvancado:
             stats['remotas'] = pd.read_sql_query("""
                 SELECT COALESCE(is_remote, 'Não informado') as is_remote, COUNT(*) as count 
                 FROM vagas 
+                WHERE oculta = 0
                 GROUP BY COALESCE(is_remote, 'Não informado')
             """, conn)
             
@@ -391,6 +456,7 @@ class StreamlitAppAvancado:
             stats['por_keyword'] = pd.read_sql_query("""
                 SELECT COALESCE(keyword_busca, 'Não informado') as keyword_busca, COUNT(*) as count 
                 FROM vagas 
+                WHERE oculta = 0
                 GROUP BY COALESCE(keyword_busca, 'Não informado')
                 ORDER BY count DESC
             """, conn)
@@ -399,12 +465,12 @@ class StreamlitAppAvancado:
             stats['ultimas_24h'] = pd.read_sql_query("""
                 SELECT COUNT(*) as count 
                 FROM vagas 
-                WHERE data_coleta >= datetime('now', '-24 hours')
-            """, conn).iloc[0]['count']
-            
+                WHERE oculta = 0 AND coletada_em >= ?
+            """, conn, params=[agora_epoch() - 24 * 3600]).iloc[0]['count']
+        
         except Exception as e:
             st.error(f"Erro ao obter estatísticas: {e}")
-            stats = {'total': 0, 'ultimas_24h': 0}
+            stats = {'total': 0, 'unicas': 0, 'ultimas_24h': 0}
         
         conn.close()
         return stats
@@ -412,10 +478,10 @@ class StreamlitAppAvancado:
     def executar_scraping_async(self, metodo):
         """Executa scraping em thread separada"""
         try:
-            if metodo == "jobspy":
-                return executar_scraping_jobspy()
-            else:
-                return executar_scraping_selenium()
+            # O backend (JobsPy ou Selenium) só é importado no primeiro scraping da sessão
+            novas_vagas = executar_backend("jobspy" if metodo == "jobspy" else "selenium")
+            self.db.atualizar_rollups()
+            return novas_vagas
         except Exception as e:
             st.error(f"Erro no scraping: {e}")
             return 0
@@ -425,13 +491,12 @@ class StreamlitAppAvancado:
         try:
             conn = self.conectar_db()
             cursor = conn.cursor()
-            cursor.execute("SELECT MAX(data_coleta) FROM vagas")
+            cursor.execute("SELECT MAX(coletada_em) FROM vagas")
             ultimo_scraping = cursor.fetchone()[0]
             conn.close()
             
             if ultimo_scraping:
-                ultimo_datetime = datetime.strptime(ultimo_scraping, '%Y-%m-%d %H:%M:%S')
-                return ultimo_datetime
+                return datetime.fromtimestamp(ultimo_scraping)  # Horário local, como datetime.now()
             return None
         except Exception as e:
             return None
@@ -486,16 +551,31 @@ def renderizar_card_individual(vaga, idx, app):
     
     cor = cores_site.get(vaga['site_origem'], '#6c757d')
     
+    # Vaga coletada depois da marca de leitura do usuário (avança em "Marcar como vistas")
+    selo_nova = "🆕 " if vaga.get('seq', 0) > st.session_state.get('marca_leitura', float('inf')) else ""
+    
+    # Pontuação na ordenação por relevância
+    relevancia_vaga = ""
+    if 'relevancia' in vaga:
+        relevancia_vaga = f"<div>🎯 Relevância: {vaga['relevancia']:.0%}</div>"
+    
+    # Vaga agrupada com duplicatas de outros sites
+    sites_vaga = ""
+    if vaga.get('ocorrencias', 1) > 1:
+        sites_vaga = f"<div>🔁 Também em: {str(vaga['sites_duplicatas']).replace(',', ', ')}</div>"
+    
     # Card HTML
     card_html = f"""
     <div class="vaga-card" style="background: linear-gradient(135deg, {cor} 0%, {cor}AA 100%);">
-        <div class="vaga-title">{titulo_card}</div>
+        <div class="vaga-title">{selo_nova}{titulo_card}</div>
         <div><strong>🏢 {empresa_card}</strong></div>
         <div>📍 {vaga['localizacao'][:40]}...</div>
         <div>🌐 {vaga['site_origem'].title()}</div>
         <div>💼 {vaga['job_type']}</div>
         <div>🏠 {'Remoto' if 'true' in str(vaga['is_remote']).lower() else 'Presencial'}</div>
         <div>💰 {vaga['salary_info'][:25]}...</div>
+        {relevancia_vaga}
+        {sites_vaga}
     </div>
     """
     
@@ -526,9 +606,9 @@ def renderizar_card_individual(vaga, idx, app):
     
     # Modal de detalhes
     if st.session_state.get(f'mostrar_detalhes_{idx}', False):
-        mostrar_modal_detalhes(vaga, idx)
+        mostrar_modal_detalhes(vaga, idx, app)
 
-def mostrar_modal_detalhes(vaga, idx):
+def mostrar_modal_detalhes(vaga, idx, app):
     """Mostra modal com detalhes completos da vaga"""
     
     with st.expander(f"📋 Detalhes: {vaga['titulo'][:50]}...", expanded=True):
@@ -551,17 +631,9 @@ def mostrar_modal_detalhes(vaga, idx):
             """)
         
         with col2:
-            # Verificar se tem horário flexível na descrição
-            descricao_texto = str(vaga['descricao']).lower()
-            tem_horario_flexivel = any(termo in descricao_texto for termo in [
-                'horário flexível', 'horario flexivel', 'flexible schedule', 
-                'flexibilidade de horário', 'flexibilidade horário',
-                'horários flexíveis', 'horarios flexiveis'
-            ])
-            
             st.markdown(f"""
             **⏰ Horário Flexível:**  
-            {'✅ Sim' if tem_horario_flexivel else '❌ Não'}
+            {'✅ Sim' if vaga['horario_flexivel'] else '❌ Não'}
             """)
         
         # Link da vaga
@@ -582,14 +654,208 @@ def mostrar_modal_detalhes(vaga, idx):
         # Descrição completa
         st.markdown("---")
         st.markdown("**📄 Descrição da Vaga:**")
-        if vaga['descricao'] and vaga['descricao'] != 'Sem descrição':
+        # Texto completo carregado só quando os detalhes são abertos
+        descricao = app.obter_descricao(vaga['id']) or vaga['descricao_resumo']
+        if descricao and descricao not in ('Sem descrição', 'Não informado'):
             st.markdown(f"""
             <div style="background-color: #ffffff; padding: 20px; border-radius: 10px; border: 1px solid #e0e0e0; color: #000000; line-height: 1.6; max-height: 400px; overflow-y: auto;">
-                {vaga['descricao'].replace(chr(10), '<br>')}
+                {descricao.replace(chr(10), '<br>')}
             </div>
             """, unsafe_allow_html=True)
         else:
             st.info("📝 Descrição não disponível para esta vaga")
+        
+        # Vizinhas pré-calculadas pelo scheduler: só uma consulta por chave primária
+        similares = app.db.obter_vagas_similares(vaga['id'])
+        if not similares.empty:
+            st.markdown("---")
+            st.markdown("**🔗 Vagas Similares:**")
+            for _, similar in similares.iterrows():
+                st.markdown(
+                    f"- [{similar['titulo']}]({similar['link']}) — {similar['empresa']} "
+                    f"· {similar['localizacao'] or 'Local não informado'} · {similar['similaridade']:.0%}"
+                )
+
+@st.cache_data(ttl=600, show_spinner=False)
+def carregar_historico(db_path, dimensao, granularidade, top):
+    """Consultas DuckDB da aba Histórico (cache de 10 minutos, fora do caminho de escrita)"""
+    analise = AnaliseHistorica(db_path)
+    try:
+        return analise.resumo(), analise.tendencia(dimensao, granularidade, top), analise.ranking(dimensao)
+    finally:
+        analise.fechar()
+
+def mostrar_historico(app):
+    """Aba Histórico: tendências sobre as vagas atuais e as arquivadas pela retenção"""
+    st.markdown("### 📜 Histórico de Vagas")
+    
+    col_dim, col_gran, col_top = st.columns(3)
+    with col_dim:
+        dimensao = st.selectbox(
+            "Agrupar por:",
+            list(DIMENSOES),
+            format_func={'site': 'Site', 'empresa': 'Empresa', 'keyword': 'Palavra-chave', 'estado': 'Estado'}.get,
+            key="historico_dimensao_select"
+        )
+    with col_gran:
+        granularidade = st.selectbox(
+            "Período:",
+            list(GRANULARIDADES),
+            index=1,
+            format_func={'dia': 'Diário', 'semana': 'Semanal', 'mes': 'Mensal'}.get,
+            key="historico_granularidade_select"
+        )
+    with col_top:
+        top = st.slider("Séries no gráfico:", 3, 15, 8, key="historico_top_slider")
+    
+    try:
+        with st.spinner("Consultando histórico..."):
+            resumo, df_tendencia, df_ranking = carregar_historico(app.db.db_path, dimensao, granularidade, top)
+    except Exception as e:
+        st.error(f"❌ Erro ao consultar o histórico: {e}")
+        return
+    
+    if not resumo['total']:
+        st.info("📭 Nenhuma vaga no histórico ainda")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Vagas no Histórico", resumo['total'])
+    with col2:
+        st.metric("Vagas Únicas", resumo['unicas'])
+    with col3:
+        st.metric("Arquivadas", resumo['arquivadas'])
+    with col4:
+        st.metric("Desde", formatar_epoch(resumo['inicio'], '%d/%m/%Y'))
+    
+    fig_tendencia = px.line(
+        df_tendencia,
+        x='periodo',
+        y='vagas',
+        color='valor',
+        markers=True,
+        title="Vagas únicas por período",
+        labels={'periodo': 'Período', 'vagas': 'Vagas', 'valor': ''}
+    )
+    st.plotly_chart(fig_tendencia, use_container_width=True)
+    
+    st.dataframe(
+        df_ranking.rename(columns={
+            'valor': 'Valor', 'vagas': 'Vagas', 'salario_mediano': 'Salário mediano (R$)',
+            'primeira_coleta': 'Primeira coleta', 'ultima_coleta': 'Última coleta'
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+@st.cache_resource(show_spinner="Indexando vagas para o ranking de relevância...")
+def carregar_indice_relevancia(db_path):
+    """Índice TF-IDF compartilhado entre as sessões (atualizado de forma incremental a cada uso)"""
+    from relevancia import IndiceRelevancia  # SciPy só é carregado quando a ordenação por relevância é usada
+    return IndiceRelevancia(DatabaseManager(db_path))
+
+def carregar_vagas(app, parametros, forcar=False):
+    """Listagem filtrada e estatísticas guardadas na sessão.
+    Sem alterações no banco, nada é consultado; se só entraram vagas novas, busca apenas as de seq acima
+    da marca do cache e as mescla na lista. Exclusões, ocultações, parâmetros novos, vagas novas na
+    ordenação por relevância ou forcar=True (execução completa da página) recarregam a lista inteira."""
+    versao = app.db.versao_vagas()
+    cache = st.session_state.get('cache_vagas')
+    
+    if (forcar or cache is None or cache['parametros'] != parametros
+            or cache['versao']['remocoes'] != versao['remocoes']
+            or (parametros.get('perfil') and cache['versao']['ultima_vaga'] != versao['ultima_vaga'])):
+        cache = {
+            'versao': versao,
+            'parametros': parametros,
+            'df_vagas': app.obter_vagas_dataframe(**parametros),
+            'stats': app.obter_estatisticas()
+        }
+    elif cache['versao']['alteracoes'] != versao['alteracoes']:
+        df_novas = app.obter_vagas_dataframe(**parametros, apos_seq=cache['versao']['ultima_vaga'])
+        df_vagas = cache['df_vagas']
+        if not df_novas.empty:
+            st.toast(f"🆕 {len(df_novas)} vaga(s) nova(s)")
+            chave = 'grupo' if parametros['agrupar_duplicatas'] else 'id'
+            df_vagas = (pd.concat([df_novas, df_vagas], ignore_index=True)
+                        .drop_duplicates(chave)
+                        .sort_values(['coletada_em', 'seq'], ascending=False))
+            if parametros['horas_recentes']:
+                df_vagas = df_vagas[df_vagas['coletada_em'] >= agora_epoch() - int(parametros['horas_recentes'] * 3600)]
+            if parametros['limit']:
+                df_vagas = df_vagas.head(parametros['limit'])
+            df_vagas = df_vagas.reset_index(drop=True)
+        cache = {
+            'versao': versao,
+            'parametros': parametros,
+            'df_vagas': df_vagas,
+            'stats': app.obter_estatisticas() if not df_novas.empty else cache['stats']
+        }
+    else:
+        return cache['df_vagas'], cache['stats']
+    
+    st.session_state.cache_vagas = cache
+    
+    return cache['df_vagas'], cache['stats']
+
+def painel_metricas(app, parametros):
+    """Métricas principais (fragmento: reexecutado sozinho no auto-refresh)"""
+    df_vagas, stats = carregar_vagas(app, parametros)
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("Vagas Únicas", stats['unicas'],
+                  help=f"{stats['total']} registros, contando a mesma vaga publicada em sites diferentes")
+    
+    with col2:
+        st.metric("Últimas 24h", stats['ultimas_24h'])
+    
+    with col3:
+        st.metric("Sites Ativos", len(stats['por_site']))
+    
+    with col4:
+        empresas_unicas = df_vagas['empresa_id'].nunique()  # Grafias diferentes da mesma empresa contam uma vez
+        st.metric("Empresas Únicas", empresas_unicas)
+    
+    with col5:
+        vagas_filtradas = len(df_vagas)
+        st.metric("Vagas Filtradas", vagas_filtradas)
+
+def painel_cards(app, parametros, cards_por_linha, max_cards):
+    """Resumo e cards das vagas (fragmento: reexecutado sozinho no auto-refresh)"""
+    df_vagas, _ = carregar_vagas(app, parametros)
+    
+    col_metrics1, col_metrics2, col_metrics3, col_metrics4, col_metrics5 = st.columns(5)
+    
+    with col_metrics1:
+        st.metric("📊 Total Exibido", min(len(df_vagas), max_cards))
+    with col_metrics2:
+        sites_unicos = df_vagas['site_origem'].nunique()
+        st.metric("🌐 Sites", sites_unicos)
+    with col_metrics3:
+        empresas_unicas = df_vagas['empresa_id'].nunique()
+        st.metric("🏢 Empresas", empresas_unicas)
+    with col_metrics4:
+        remotas = len(df_vagas[df_vagas['is_remote'].fillna('').astype(str).str.contains('True|true|Sim', case=False, na=False)])
+        st.metric("🏠 Remotas", remotas)
+    with col_metrics5:
+        novas = int((df_vagas['seq'] > st.session_state.marca_leitura).sum())
+        st.metric("🆕 Novas", novas, help="Vagas coletadas desde a última vez que você as marcou como vistas")
+        if novas and st.button("✔️ Marcar como vistas", key="marcar_vistas_button"):
+            # A marca só avança aqui, até a vaga mais recente da lista exibida
+            st.session_state.marca_leitura = int(df_vagas['seq'].max())
+            app.db.registrar_leitura(st.session_state.usuario, st.session_state.marca_leitura)
+            st.rerun(scope="fragment")
+    
+    # Renderizar cards das vagas
+    renderizar_cards_vagas(df_vagas.head(max_cards), cards_por_linha, app)
+
+def verificar_auto_scraping(app):
+    """Fragmento sem elementos: quando o auto-scraping vence, reexecuta a página inteira, que faz a coleta"""
+    if st.session_state.auto_scraping_ativo and app.precisa_scraping_automatico():
+        st.rerun()
 
 def main():
     app = StreamlitAppAvancado()
@@ -640,6 +906,16 @@ def main():
     if 'ultimo_auto_scraping' not in st.session_state:
         st.session_state.ultimo_auto_scraping = None
     
+    # Marca de leitura por usuário (?usuario=nome na URL): vagas acima dela aparecem como novas
+    if 'usuario' not in st.session_state:
+        st.session_state.usuario = st.query_params.get('usuario', 'padrao')
+        marca = app.db.obter_marca_leitura(st.session_state.usuario)
+        if marca is None:
+            # Na primeira visita nada é destacado: o que já existe fica como visto
+            marca = app.db.versao_vagas()['ultima_vaga']
+            app.db.registrar_leitura(st.session_state.usuario, marca)
+        st.session_state.marca_leitura = marca
+    
     # Header
     st.title("🔍 SearchVagas Dashboard Pro")
     st.markdown("**Sistema Avançado de Coleta de Vagas com Auto-Scraping**")
@@ -853,7 +1129,12 @@ def main():
                 cidades_selecionadas = []
             
             # Filtros específicos - tratando valores None
-            empresas_disponiveis = ['Todas'] + sorted([emp for emp in df_todos['empresa'].fillna('Não informado').unique().tolist() if emp])
+            # Uma opção por empresa canônica (o filtro pelo nome alcança todas as grafias dela)
+            nomes_empresas = app.db.obter_empresas()
+            empresas_disponiveis = ['Todas'] + sorted({
+                nomes_empresas.get(empresa_id, empresa)
+                for empresa_id, empresa in df_todos[['empresa_id', 'empresa']].drop_duplicates().itertuples(index=False)
+            } - {''})
             empresa_filtro = st.sidebar.selectbox(
                 "Filtrar por empresa:", 
                 empresas_disponiveis,
@@ -896,6 +1177,21 @@ def main():
                 key="horario_flexivel_filtro_select"
             )
             
+            # Filtro por faixa salarial (valor mensal em reais)
+            faixa_salarial = None
+            faixa_disponivel = app.db.obter_faixa_salarios()
+            if faixa_disponivel and faixa_disponivel[1] > faixa_disponivel[0]:
+                minimo = int(faixa_disponivel[0] // 500 * 500)
+                maximo = int(-(-faixa_disponivel[1] // 500) * 500)
+                faixa_selecionada = st.sidebar.slider(
+                    "💰 Salário mensal (R$):",
+                    minimo, maximo, (minimo, maximo), 500,
+                    key="salario_filtro_slider",
+                    help="Ao restringir a faixa, vagas sem salário informado deixam de aparecer"
+                )
+                if faixa_selecionada != (minimo, maximo):
+                    faixa_salarial = faixa_selecionada
+            
             # Aplicar filtros
             filtros = {
                 'empresa': empresa_filtro,
@@ -904,6 +1200,7 @@ def main():
                 'job_type': tipo_filtro,
                 'is_remote': remoto_filtro,
                 'horario_flexivel': horario_flexivel_filtro,
+                'faixa_salarial': faixa_salarial,
                 'estados': estados_selecionados,
                 'cidades': cidades_selecionadas
             }
@@ -912,218 +1209,307 @@ def main():
             filtros = {}
             estados_selecionados = []
             cidades_selecionadas = []
-            
-        # Refresh automático
-        auto_refresh = st.sidebar.checkbox(
-            "🔄 Auto-refresh (2min)",
-            key="auto_refresh_checkbox"
-        )
         
-        if auto_refresh:
-            # Usar meta refresh do HTML em vez de sleep
-            st.markdown('<meta http-equiv="refresh" content="120">', unsafe_allow_html=True)
-        
-        # Obter dados filtrados
-        df_vagas = app.obter_vagas_dataframe(
-            limit=limite_vagas, 
-            horas_recentes=horas_filtro,
-            filtros=filtros if not df_todos.empty else None
+        filtros['mostrar_ocultas'] = st.sidebar.checkbox(
+            "🙈 Mostrar vagas ocultas",
+            key="mostrar_ocultas_checkbox",
+            help="Inclui na lista as vagas ocultadas pelas ações em massa"
         )
         
-        stats = app.obter_estatisticas()
-        
-        # Verificar se há dados
-        if df_vagas.empty:
-            st.warning("🚫 Nenhuma vaga encontrada. Execute o scraping primeiro!")
-            
-            # Botão para executar scraping diretamente
-            col1, col2, col3 = st.columns(3)
-            with col2:
-                if st.button("🚀 Executar Scraping Agora", type="primary", use_container_width=True):
-                    with st.spinner("Executando scraping..."):
-                        resultado = app.executar_scraping_async("jobspy")
-                        st.success(f"✅ {resultado} novas vagas coletadas!")
-                        time.sleep(2)
-                        st.rerun()
-            return
+        # Mesma vaga coletada em vários sites
+        agrupar_duplicatas = st.sidebar.checkbox(
+            "🧩 Agrupar vagas duplicadas",
+            value=True,
+            key="agrupar_duplicatas_checkbox",
+            help="Mostra uma vez só a mesma vaga publicada em sites diferentes"
+        )
         
-        # Métricas principais
-        st.markdown("### 📊 Métricas Principais")
+        # Ordenação da lista: coleta mais recente ou relevância em relação ao perfil do usuário
+        ordenacao = st.sidebar.selectbox(
+            "Ordenar por:",
+            ['recentes', 'relevancia'],
+            format_func={'recentes': '🕒 Mais recentes', 'relevancia': '🎯 Relevância'}.get,
+            key="ordenacao_select"
+        )
+        perfil_relevancia = None
+        if ordenacao == 'relevancia':
+            perfil_relevancia = st.sidebar.text_area(
+                "Seu perfil:",
+                placeholder="Ex.: engenheiro de dados python airflow spark",
+                key="perfil_relevancia_input",
+                help="Cargos, tecnologias e palavras-chave; as vagas mais parecidas aparecem primeiro"
+            ).strip() or None
         
-        col1, col2, col3, col4, col5 = st.columns(5)
+        # Refresh automático: só as métricas e os cards, e só quando o banco mudou
+        auto_refresh = st.sidebar.checkbox(
+            "🔄 Auto-refresh (2min)",
+            key="auto_refresh_checkbox",
+            help="Atualiza métricas e cards quando chegam vagas novas, sem recarregar a página"
+        )
+        intervalo_refresh = INTERVALO_ATUALIZACAO if auto_refresh else None
         
-        with col1:
-            st.metric("Total de Vagas", stats['total'])
+        # Obter dados filtrados
+        parametros_vagas = {
+            'limit': limite_vagas,
+            'horas_recentes': horas_filtro,
+            'filtros': filtros,
+            'agrupar_duplicatas': agrupar_duplicatas,
+            'perfil': perfil_relevancia
+        }
+        df_vagas, stats = carregar_vagas(app, parametros_vagas, forcar=True)
         
-        with col2:
-            st.metric("Últimas 24h", stats['ultimas_24h'])
+        aba_vagas, aba_historico = st.tabs(["🎯 Vagas Atuais", "📜 Histórico"])
         
-        with col3:
-            st.metric("Sites Ativos", len(stats['por_site']))
+        with aba_historico:
+            mostrar_historico(app)
         
-        with col4:
-            empresas_unicas = df_vagas['empresa'].nunique()
-            st.metric("Empresas Únicas", empresas_unicas)
+        with aba_vagas:
+            # Verificar se há dados
+            if df_vagas.empty:
+                st.warning("🚫 Nenhuma vaga encontrada. Execute o scraping primeiro!")
+                
+                # Botão para executar scraping diretamente
+                col1, col2, col3 = st.columns(3)
+                with col2:
+                    if st.button("🚀 Executar Scraping Agora", type="primary", use_container_width=True):
+                        with st.spinner("Executando scraping..."):
+                            resultado = app.executar_scraping_async("jobspy")
+                            st.success(f"✅ {resultado} novas vagas coletadas!")
+                            time.sleep(2)
+                            st.rerun()
+                return
             
-        with col5:
-            vagas_filtradas = len(df_vagas)
-            st.metric("Vagas Filtradas", vagas_filtradas)
-        
-        # Gráficos
-        st.markdown("### 📈 Análises")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Gráfico de vagas por site
-            if not stats['por_site'].empty:
-                fig_sites = px.pie(
-                    stats['por_site'], 
-                    values='count', 
-                    names='site_origem',
-                    title="Distribuição por Site",
-                    color_discrete_sequence=px.colors.qualitative.Set3
+            # Métricas principais
+            st.markdown("### 📊 Métricas Principais")
+            
+            st.fragment(painel_metricas, run_every=intervalo_refresh)(app, parametros_vagas)
+            
+            # Gráficos
+            st.markdown("### 📈 Análises")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Gráfico de vagas por site
+                if not stats['por_site'].empty:
+                    fig_sites = px.pie(
+                        stats['por_site'], 
+                        values='count', 
+                        names='site_origem',
+                        title="Distribuição por Site",
+                        color_discrete_sequence=px.colors.qualitative.Set3
+                    )
+                    st.plotly_chart(fig_sites, use_container_width=True)
+            
+            with col2:
+                # Gráfico de vagas por keyword
+                if not stats['por_keyword'].empty:
+                    fig_keywords = px.bar(
+                        stats['por_keyword'], 
+                        x='keyword_busca', 
+                        y='count',
+                        title="Vagas por Termo de Busca",
+                        color='count',
+                        color_continuous_scale='Blues'
+                    )
+                    st.plotly_chart(fig_keywords, use_container_width=True)
+            
+            # Distribuição salarial (histograma agregado no banco)
+            df_salarios = app.db.obter_distribuicao_salarios(largura_faixa=1000)
+            if not df_salarios.empty:
+                fig_salarios = px.bar(
+                    df_salarios,
+                    x='faixa',
+                    y='quantidade',
+                    title="Distribuição de Salário Mensal (R$, faixas de 1.000)",
+                    labels={'faixa': 'Salário mensal (R$)', 'quantidade': 'Vagas'}
                 )
-                st.plotly_chart(fig_sites, use_container_width=True)
-        
-        with col2:
-            # Gráfico de vagas por keyword
-            if not stats['por_keyword'].empty:
-                fig_keywords = px.bar(
-                    stats['por_keyword'], 
-                    x='keyword_busca', 
-                    y='count',
-                    title="Vagas por Termo de Busca",
-                    color='count',
-                    color_continuous_scale='Blues'
+                fig_salarios.update_traces(offset=0, width=1000)
+                st.plotly_chart(fig_salarios, use_container_width=True)
+            
+            # Tendência diária (lida do rollup, independente do tamanho da tabela de vagas)
+            col_tend1, col_tend2 = st.columns([1, 3])
+            with col_tend1:
+                dimensao_tendencia = st.selectbox(
+                    "Tendência por:",
+                    ['total', 'site', 'keyword', 'estado', 'job_type'],
+                    format_func={'total': 'Total', 'site': 'Site', 'keyword': 'Palavra-chave',
+                                 'estado': 'Estado', 'job_type': 'Tipo de vaga'}.get,
+                    key="tendencia_dimensao_select"
                 )
-                st.plotly_chart(fig_keywords, use_container_width=True)
-        
-        # Cards de Vagas
-        st.markdown("### 🎯 Vagas Encontradas")
-        
-        # Controles para cards
-        col_card1, col_card2, col_card3, col_card4 = st.columns(4)
-        
-        with col_card1:
-            cards_por_linha = st.selectbox(
-                "Cards por linha:", 
-                [1, 2, 3, 4], 
-                index=1,
-                key="cards_por_linha_select"
-            )
-        
-        with col_card2:
-            max_cards = st.slider(
-                "Máximo de cards:", 
-                5, 100, 50,
-                key="max_cards_slider"
-            )
-        
-        with col_card3:
-            # Botão para exportar CSV
-            if st.button("📄 Exportar CSV", type="secondary"):
-                csv = df_vagas.to_csv(index=False)
-                st.download_button(
-                    label="💾 Download CSV",
-                    data=csv,
-                    file_name=f"vagas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
+                dias_tendencia = st.selectbox("Período:", [30, 90, 365], index=1,
+                                              format_func=lambda dias: f"{dias} dias",
+                                              key="tendencia_dias_select")
+            with col_tend2:
+                df_tendencia = app.db.obter_serie_diaria(dimensao_tendencia, dias=dias_tendencia)
+                if not df_tendencia.empty:
+                    fig_tendencia = px.line(
+                        df_tendencia,
+                        x='dia',
+                        y='novas',
+                        color='valor',
+                        markers=True,
+                        title="Novas Vagas por Dia",
+                        labels={'dia': 'Dia', 'novas': 'Novas vagas', 'valor': ''}
+                    )
+                    st.plotly_chart(fig_tendencia, use_container_width=True)
+                else:
+                    st.info("📭 Sem dados de tendência no período")
+            
+            # Cards de Vagas
+            st.markdown("### 🎯 Vagas Encontradas")
+            
+            # Controles para cards
+            col_card1, col_card2, col_card3, col_card4 = st.columns(4)
+            
+            with col_card1:
+                cards_por_linha = st.selectbox(
+                    "Cards por linha:", 
+                    [1, 2, 3, 4], 
+                    index=1,
+                    key="cards_por_linha_select"
                 )
-        
-        with col_card4:
-            # Botão de deletar todos com confirmação
-            if st.button("🗑️ Deletar Todas", type="secondary"):
-                st.session_state.mostrar_confirmacao = True
-        
-        # Modal de confirmação para deletar todas
-        if st.session_state.get('mostrar_confirmacao', False):
-            st.markdown("---")
-            st.warning("⚠️ **ATENÇÃO:** Esta ação irá deletar TODAS as vagas do banco de dados!")
             
-            col_conf1, col_conf2, col_conf3 = st.columns(3)
+            with col_card2:
+                max_cards = st.slider(
+                    "Máximo de cards:", 
+                    5, 100, 50,
+                    key="max_cards_slider"
+                )
+            
+            with col_card3:
+                # Exportação em streaming para arquivo temporário (todos os resultados dos filtros, sem o limite da tela)
+                formato_exportacao = st.selectbox(
+                    "Formato de exportação:",
+                    list(FORMATOS),
+                    format_func=str.upper,
+                    key="formato_exportacao_select"
+                )
+                banco_completo = st.checkbox("Banco completo", key="exportar_banco_completo_checkbox",
+                                             help="Ignora os filtros e exporta todas as vagas")
+                
+                if st.button("📄 Exportar", type="secondary"):
+                    exportacao_anterior = st.session_state.get('exportacao')
+                    if exportacao_anterior and os.path.exists(exportacao_anterior['caminho']):
+                        os.remove(exportacao_anterior['caminho'])
+                    
+                    with st.spinner("Exportando vagas..."):
+                        caminho, total = exportar_para_temporario(
+                            app.db,
+                            formato_exportacao,
+                            horas_recentes=None if banco_completo else horas_filtro,
+                            filtros=None if banco_completo or df_todos.empty else filtros
+                        )
+                    st.session_state.exportacao = {'caminho': caminho, 'formato': formato_exportacao, 'total': total}
+                
+                exportacao = st.session_state.get('exportacao')
+                if exportacao and os.path.exists(exportacao['caminho']):
+                    extensao, mime = FORMATOS[exportacao['formato']]
+                    # Download adiado: o arquivo só é lido no clique, não a cada execução da página
+                    st.download_button(
+                        label=f"💾 Download ({exportacao['total']} vagas)",
+                        data=partial(ler_exportacao, exportacao['caminho']),
+                        file_name=f"vagas_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extensao}",
+                        mime=mime
+                    )
+            
+            with col_card4:
+                # Botão de deletar todos com confirmação
+                if st.button("🗑️ Deletar Todas", type="secondary"):
+                    st.session_state.mostrar_confirmacao = True
             
-            with col_conf1:
-                if st.button("✅ Confirmar Exclusão", type="primary"):
-                    if app.deletar_todas_vagas():
-                        st.success("✅ Todas as vagas foram deletadas!")
+            # Modal de confirmação para deletar todas
+            if st.session_state.get('mostrar_confirmacao', False):
+                st.markdown("---")
+                st.warning("⚠️ **ATENÇÃO:** Esta ação irá deletar TODAS as vagas do banco de dados!")
+                
+                col_conf1, col_conf2, col_conf3 = st.columns(3)
+                
+                with col_conf1:
+                    if st.button("✅ Confirmar Exclusão", type="primary"):
+                        if app.deletar_todas_vagas():
+                            st.success("✅ Todas as vagas foram deletadas!")
+                            st.session_state.mostrar_confirmacao = False
+                            time.sleep(1)
+                            st.rerun()
+                        else:
+                            st.error("❌ Erro ao deletar vagas!")
+                
+                with col_conf2:
+                    if st.button("❌ Cancelar", type="secondary"):
                         st.session_state.mostrar_confirmacao = False
-                        time.sleep(1)
                         st.rerun()
-                    else:
-                        st.error("❌ Erro ao deletar vagas!")
+                
+                with col_conf3:
+                    st.empty()
             
-            with col_conf2:
-                if st.button("❌ Cancelar", type="secondary"):
-                    st.session_state.mostrar_confirmacao = False
-                    st.rerun()
+            # Ações em massa sobre as vagas listadas (uma transação por ação)
+            with st.expander("🧹 Ações em massa"):
+                rotulos = {
+                    row['id']: f"{row['titulo']} — {row['empresa']}" + (" (oculta)" if row['oculta'] else "")
+                    for _, row in df_vagas.iterrows()
+                }
+                selecionadas = st.multiselect(
+                    "Vagas selecionadas:",
+                    options=list(rotulos),
+                    format_func=rotulos.get,
+                    key="acoes_massa_multiselect"
+                )
+                
+                col_massa1, col_massa2, col_massa3 = st.columns(3)
+                with col_massa1:
+                    if st.button("🙈 Ocultar", disabled=not selecionadas, use_container_width=True):
+                        app.db.ocultar_vagas(selecionadas)
+                        st.rerun()
+                with col_massa2:
+                    if st.button("👁️ Reexibir", disabled=not selecionadas, use_container_width=True):
+                        app.db.ocultar_vagas(selecionadas, oculta=False)
+                        st.rerun()
+                with col_massa3:
+                    if st.button("🗑️ Excluir", disabled=not selecionadas, type="secondary", use_container_width=True):
+                        app.db.excluir_vagas(selecionadas)
+                        st.rerun()
+                st.caption("Vagas excluídas não voltam nos próximos scrapings; as ocultas continuam no banco.")
             
-            with col_conf3:
-                st.empty()
-        
-        # Exibir métricas dos cards
-        st.markdown("---")
-        col_metrics1, col_metrics2, col_metrics3, col_metrics4 = st.columns(4)
-        
-        with col_metrics1:
-            st.metric("📊 Total Exibido", min(len(df_vagas), max_cards))
-        with col_metrics2:
-            sites_unicos = df_vagas['site_origem'].nunique()
-            st.metric("🌐 Sites", sites_unicos)
-        with col_metrics3:
-            empresas_unicas = df_vagas['empresa'].nunique()
-            st.metric("🏢 Empresas", empresas_unicas)
-        with col_metrics4:
-            remotas = len(df_vagas[df_vagas['is_remote'].fillna('').astype(str).str.contains('True|true|Sim', case=False, na=False)])
-            st.metric("🏠 Remotas", remotas)
-        
-        # Renderizar cards das vagas
-        renderizar_cards_vagas(df_vagas.head(max_cards), cards_por_linha, app)
-        
-        # Informações do auto-scraping na parte inferior
-        if st.session_state.auto_scraping_ativo:
+            # Exibir métricas dos cards
             st.markdown("---")
-            st.markdown("### 🤖 Status do Auto-Scraping")
+            st.fragment(painel_cards, run_every=intervalo_refresh)(app, parametros_vagas, cards_por_linha, max_cards)
             
-            col_auto1, col_auto2, col_auto3 = st.columns(3)
-            
-            with col_auto1:
-                st.info("✅ **Auto-scraping ATIVO**  \nExecuta a cada 2 horas automaticamente")
-            
-            with col_auto2:
-                ultimo_scraping = app.verificar_ultimo_scraping()
-                if ultimo_scraping:
-                    tempo_desde = datetime.now() - ultimo_scraping
-                    horas_desde = tempo_desde.total_seconds() / 3600
-                    st.metric("⏰ Último Scraping", f"{horas_desde:.1f}h atrás")
-                else:
-                    st.metric("⏰ Último Scraping", "Nunca")
-            
-            with col_auto3:
-                if ultimo_scraping:
-                    proximo = ultimo_scraping + timedelta(hours=2)
-                    if proximo > datetime.now():
-                        tempo_para_proximo = proximo - datetime.now()
-                        horas_para_proximo = tempo_para_proximo.total_seconds() / 3600
-                        st.metric("⏭️ Próximo em", f"{horas_para_proximo:.1f}h")
+            # Informações do auto-scraping na parte inferior
+            if st.session_state.auto_scraping_ativo:
+                st.markdown("---")
+                st.markdown("### 🤖 Status do Auto-Scraping")
+                
+                col_auto1, col_auto2, col_auto3 = st.columns(3)
+                
+                with col_auto1:
+                    st.info("✅ **Auto-scraping ATIVO**  \nExecuta a cada 2 horas automaticamente")
+                
+                with col_auto2:
+                    ultimo_scraping = app.verificar_ultimo_scraping()
+                    if ultimo_scraping:
+                        tempo_desde = datetime.now() - ultimo_scraping
+                        horas_desde = tempo_desde.total_seconds() / 3600
+                        st.metric("⏰ Último Scraping", f"{horas_desde:.1f}h atrás")
                     else:
-                        st.metric("⏭️ Próximo", "Executando...")
-                else:
-                    st.metric("⏭️ Próximo", "Em breve")
-        
-        # Verificação automática de scraping sem bloquear interface
-        if st.session_state.auto_scraping_ativo:
-            # Usar JavaScript para verificar a cada 2 minutos se precisa fazer scraping
-            st.markdown("""
-            <script>
-            setTimeout(function() {
-                if (window.location.reload) {
-                    window.location.reload();
-                }
-            }, 120000); // 2 minutos
-            </script>
-            """, unsafe_allow_html=True)
-        
+                        st.metric("⏰ Último Scraping", "Nunca")
+                
+                with col_auto3:
+                    if ultimo_scraping:
+                        proximo = ultimo_scraping + timedelta(hours=2)
+                        if proximo > datetime.now():
+                            tempo_para_proximo = proximo - datetime.now()
+                            horas_para_proximo = tempo_para_proximo.total_seconds() / 3600
+                            st.metric("⏭️ Próximo em", f"{horas_para_proximo:.1f}h")
+                        else:
+                            st.metric("⏭️ Próximo", "Executando...")
+                    else:
+                        st.metric("⏭️ Próximo", "Em breve")
+            
+            # Verificação automática de scraping sem recarregar a página (mantém o session state)
+            if st.session_state.auto_scraping_ativo:
+                st.fragment(verificar_auto_scraping, run_every=INTERVALO_ATUALIZACAO)(app)
+    
     except Exception as e:
         st.error(f"❌ Erro ao carregar dados: {e}")
         st.info("💡 Tente executar o scraping primeiro")
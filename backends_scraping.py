@@ -0,0 +1,50 @@
+"""
+Registro dos backends de scraping:
+os módulos dos scrapers (JobsPy, Selenium e seus webdrivers) só são importados na primeira execução,
+para que o dashboard e o scheduler iniciem sem carregá-los.
+"""
+
+import importlib
+import threading
+
+# Configuração de busca dos scrapers, legível sem importá-los (o scheduler monta os jobs a partir dela)
+TERMOS_BUSCA = [
+    "Dados",
+    "BI",
+    "Estágio em Dados",
+    "Estágio em Engenheiro de Dados",
+    "Estágio em Ciência de Dados",
+    "Estágio em BI"
+]
+SITES_JOBSPY = ["linkedin", "indeed", "google", "glassdoor", "ziprecruiter"]
+
+# nome -> "módulo:atributo", resolvido só no primeiro uso
+BACKENDS = {
+    'jobspy': 'scraper:executar_scraping_jobspy',
+    'selenium': 'scraper:executar_scraping_selenium',
+    'completo': 'scraper:executar_scraping',
+    'jobspy_multilocal': 'scraper_jobspy:executar_scraping_jobspy_multilocal',
+    'jobspy_scraper': 'scraper_jobspy:JobSpyScraper'
+}
+
+_carregados = {}
+_lock = threading.Lock()
+
+def registrar_backend(nome, alvo):
+    """Registra (ou substitui) um backend no formato "módulo:atributo" """
+    with _lock:
+        BACKENDS[nome] = alvo
+        _carregados.pop(nome, None)
+
+def obter_backend(nome):
+    """Função/classe do backend, importando o módulo na primeira chamada"""
+    with _lock:
+        if nome not in _carregados:
+            if nome not in BACKENDS:
+                raise KeyError(f"Backend de scraping desconhecido: {nome} (disponíveis: {', '.join(BACKENDS)})")
+            modulo, atributo = BACKENDS[nome].split(':')
+            _carregados[nome] = getattr(importlib.import_module(modulo), atributo)
+        return _carregados[nome]
+
+def executar_backend(nome, *args, **kwargs):
+    return obter_backend(nome)(*args, **kwargs)
@@ -0,0 +1,298 @@
+"""
+Benchmark do banco de dados em escala sintética.
+
+Gera tabelas `vagas` realistas (descrições em português, distribuição enviesada de
+empresas e sites) e mede as operações do DatabaseManager e as consultas do dashboard,
+emitindo um relatório JSON para comparar execuções.
+
+Uso:
+    python benchmark_db.py --escalas 10000 100000 1000000 --saida relatorio_db.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import sqlite3
+import argparse
+import logging
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+from database import DatabaseManager
+from url_canonica import canonicalizar_url
+from datas import parsear_data
+from salarios import estruturar_salario
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+LOCALIZACOES = [
+    ("São Paulo", "SP", 40), ("Rio de Janeiro", "RJ", 15), ("Belo Horizonte", "MG", 8),
+    ("Curitiba", "PR", 6), ("Porto Alegre", "RS", 5), ("Recife", "PE", 4),
+    ("Florianópolis", "SC", 4), ("Campinas", "SP", 4), ("Salvador", "BA", 3),
+    ("Brasília", "DF", 3), ("Fortaleza", "CE", 2), ("Goiânia", "GO", 2),
+    ("Manaus", "AM", 1), ("Vitória", "ES", 1), ("Belém", "PA", 1), ("Natal", "RN", 1)
+]
+
+SITES = [("linkedin", 45), ("indeed", 30), ("google", 15), ("glassdoor", 7), ("ziprecruiter", 3)]
+
+KEYWORDS = ["Dados", "BI", "Estágio em Dados", "Estágio em Engenheiro de Dados",
+            "Estágio em Ciência de Dados", "Estágio em BI"]
+
+CARGOS = ["Analista de Dados", "Engenheiro de Dados", "Cientista de Dados", "Analista de BI",
+          "Estagiário de Dados", "Desenvolvedor Python", "Analista de Business Intelligence",
+          "Engenheiro de Machine Learning", "Arquiteto de Dados", "Estágio em Ciência de Dados"]
+
+NIVEIS = ["Júnior", "Pleno", "Sênior", "Estágio", "Especialista", ""]
+
+PREFIXOS_EMPRESA = ["Itaú", "Bradesco", "Nubank", "Ambev", "Magazine Luiza", "Stone", "iFood",
+                    "Mercado Livre", "Petrobras", "Vale", "XP Inc", "B3", "Natura", "Totvs",
+                    "Localiza", "Embraer", "Globo", "PicPay", "Creditas", "Loft"]
+
+SUFIXOS_EMPRESA = ["", " S.A.", " Tecnologia", " Serviços", " Digital", " Ltda", " Brasil", " Group"]
+
+FRASES_DESCRICAO = [
+    "Buscamos profissional para atuar com modelagem de dados e construção de pipelines.",
+    "Você irá desenvolver dashboards em Power BI e apoiar as áreas de negócio.",
+    "Experiência com SQL, Python e ferramentas de orquestração como Airflow.",
+    "Conhecimento em cloud (AWS, GCP ou Azure) será um diferencial.",
+    "Oferecemos vale-refeição, plano de saúde, plano odontológico e Gympass.",
+    "Trabalho em regime híbrido com dois dias presenciais por semana.",
+    "Ambiente colaborativo, com foco em aprendizado contínuo e inovação.",
+    "Responsável por garantir a qualidade e a governança dos dados.",
+    "Desejável experiência com Spark, Databricks e arquitetura de data lake.",
+    "Atuar junto ao time de produto na definição de métricas e experimentos.",
+    "Cursando ensino superior em Engenharia, Estatística, Computação ou áreas afins.",
+    "Inglês intermediário para leitura de documentação técnica.",
+    "Participar de rituais ágeis e colaborar com engenheiros de software.",
+    "Criar e manter processos de ETL e integrações com APIs.",
+]
+
+FRASES_FLEXIVEL = ["Horário flexível e possibilidade de home office.",
+                   "Oferecemos horários flexíveis para conciliar com os estudos."]
+
+def _sorteador_ponderado(opcoes_com_peso):
+    valores = [opcao[:-1] if len(opcao) > 2 else opcao[0] for opcao in opcoes_com_peso]
+    pesos = [opcao[-1] for opcao in opcoes_com_peso]
+    return valores, pesos
+
+def gerar_empresas(quantidade=3000):
+    """Empresas com distribuição de Zipf: poucas concentram muitas vagas"""
+    empresas = []
+    for i in range(quantidade):
+        prefixo = PREFIXOS_EMPRESA[i % len(PREFIXOS_EMPRESA)]
+        sufixo = SUFIXOS_EMPRESA[(i // len(PREFIXOS_EMPRESA)) % len(SUFIXOS_EMPRESA)]
+        empresas.append(f"{prefixo}{sufixo}" if i < 160 else f"{prefixo}{sufixo} {i}")
+    pesos = [1.0 / (posicao + 1) ** 1.1 for posicao in range(quantidade)]
+    return empresas, pesos
+
+def gerar_vagas(quantidade, semente=42):
+    """Gera (tupla na ordem de COLUNAS_INSERCAO sem as colunas derivadas, descrição completa)"""
+    rnd = random.Random(semente)
+    empresas, pesos_empresas = gerar_empresas()
+    locais, pesos_locais = _sorteador_ponderado(LOCALIZACOES)
+    sites, pesos_sites = _sorteador_ponderado(SITES)
+    agora = datetime.utcnow()
+    
+    lote = 10000
+    for inicio in range(0, quantidade, lote):
+        n = min(lote, quantidade - inicio)
+        empresas_lote = rnd.choices(empresas, pesos_empresas, k=n)
+        locais_lote = rnd.choices(locais, pesos_locais, k=n)
+        sites_lote = rnd.choices(sites, pesos_sites, k=n)
+        
+        for i in range(n):
+            numero = inicio + i
+            cidade, uf = locais_lote[i]
+            site = sites_lote[i]
+            titulo = f"{rnd.choice(CARGOS)} {rnd.choice(NIVEIS)}".strip()
+            frases = rnd.sample(FRASES_DESCRICAO, rnd.randint(4, 9))
+            if rnd.random() < 0.15:
+                frases.insert(rnd.randint(0, len(frases)), rnd.choice(FRASES_FLEXIVEL))
+            descricao = " ".join(frases)
+            coleta = agora - timedelta(seconds=rnd.randint(0, 30 * 24 * 3600))
+            postagem = (coleta - timedelta(days=rnd.randint(0, 5))).strftime('%Y-%m-%d')
+            salario = "Não informado"
+            if rnd.random() < 0.2:
+                minimo = rnd.randrange(1500, 15000, 500)
+                salario = f"R$ {minimo} - R$ {minimo + rnd.randrange(500, 8000, 500)} - /monthly"
+            
+            yield (
+                f"sintetica{numero:09d}", titulo, empresas_lote[i], f"{cidade}, {uf} - Brasil",
+                f"https://www.{site}.com/jobs/view/{numero}", postagem,
+                coleta.strftime('%Y-%m-%d %H:%M:%S'), rnd.choice(KEYWORDS), f"{cidade}, {uf}",
+                "Não informado", site, rnd.choice(["fulltime", "internship", "contract", "Não informado"]),
+                rnd.choice(["True", "False", "Não informado"]), salario, uf, f"{cidade}, {uf}, Brasil"
+            ), descricao
+
+COLUNAS_INSERCAO = [
+    'id', 'titulo', 'empresa', 'localizacao', 'link', 'data_postagem', 'data_coleta',
+    'keyword_busca', 'area_vaga', 'numero_candidatos', 'site_origem', 'job_type', 'is_remote',
+    'salary_info', 'estado', 'local_busca', 'descricao_resumo', 'horario_flexivel', 'cluster_id',
+    'site_job_id', 'canonical_url', 'postada_em', 'coletada_em',
+    'salary_min', 'salary_max', 'salary_interval', 'salario_mensal_brl'
+]
+
+def popular_banco(db_path, quantidade, semente=42):
+    """Cria o banco pelo DatabaseManager e insere as vagas sintéticas em massa"""
+    db = DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    placeholders = ", ".join("?" for _ in COLUNAS_INSERCAO)
+    query = f"INSERT INTO vagas ({', '.join(COLUNAS_INSERCAO)}) VALUES ({placeholders})"
+    
+    linhas, descricoes = [], []
+    for linha, descricao in gerar_vagas(quantidade, semente):
+        # cluster_id próprio: dados sintéticos não têm duplicatas e dispensam a indexação LSH
+        linhas.append(linha + (db.gerar_resumo(descricao), int(db.tem_horario_flexivel(descricao)), linha[0])
+                      + canonicalizar_url(linha[4]) + (parsear_data(linha[5]), parsear_data(linha[6]))
+                      + tuple(estruturar_salario({'salary_info': linha[13]}).values()))
+        descricoes.append((linha[0], db.comprimir_descricao(descricao)))
+        if len(linhas) >= 10000:
+            conn.executemany(query, linhas)
+            conn.executemany("INSERT INTO descricoes (vaga_id, conteudo) VALUES (?, ?)", descricoes)
+            linhas, descricoes = [], []
+    conn.executemany(query, linhas)
+    conn.executemany("INSERT INTO descricoes (vaga_id, conteudo) VALUES (?, ?)", descricoes)
+    conn.commit()
+    conn.close()
+    db.indexar_empresas()  # Inserção direta não passa pelo resolvedor de empresas
+    return db
+
+def cronometrar(funcao, repeticoes):
+    """Executa a função N vezes e resume os tempos (segundos)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        'media': round(statistics.mean(tempos), 6),
+        'mediana': round(statistics.median(tempos), 6),
+        'minimo': round(min(tempos), 6),
+        'maximo': round(max(tempos), 6),
+        'repeticoes': repeticoes
+    }
+
+def medir_escala(db_path, quantidade, repeticoes, limite_sem_limit, semente=42):
+    """Mede todas as operações para um banco com `quantidade` vagas"""
+    from app_streamlit_pro import StreamlitAppAvancado
+    
+    inicio = time.perf_counter()
+    db = popular_banco(db_path, quantidade, semente)
+    resultados = {'geracao_s': round(time.perf_counter() - inicio, 3),
+                  'tamanho_arquivo_mb': round(os.path.getsize(db_path) / 1024 / 1024, 2)}
+    
+    app = StreamlitAppAvancado(db_path)
+    operacoes = {}
+    
+    # inserir_vaga: vagas novas (caminho do scraping)
+    contador = iter(range(10 ** 9))
+    def inserir():
+        n = next(contador)
+        db.inserir_vaga({'titulo': f"Vaga benchmark {n}", 'empresa': "Empresa Benchmark",
+                         'link': f"https://benchmark/{quantidade}/{n}", 'descricao': FRASES_DESCRICAO[0]})
+    operacoes['inserir_vaga'] = cronometrar(inserir, max(repeticoes, 20))
+    
+    # obter_vagas com cada combinação de filtros
+    for horas in [None, 24]:
+        for estados in [None, ['SP'], ['SP', 'RJ', 'MG']]:
+            for flexivel in [None, True, False]:
+                for limit in [200, None]:
+                    if limit is None and quantidade > limite_sem_limit:
+                        continue
+                    nome = (f"obter_vagas(horas={horas}, estados={','.join(estados) if estados else None}, "
+                            f"flexivel={flexivel}, limit={limit})")
+                    operacoes[nome] = cronometrar(
+                        lambda: db.obter_vagas(limit=limit, horas_recentes=horas, estados=estados,
+                                               horario_flexivel=flexivel), repeticoes)
+    
+    for faixa in [(3000, 8000), (10000, 20000)]:
+        operacoes[f"obter_vagas(faixa_salarial={faixa}, limit=200)"] = cronometrar(
+            lambda: db.obter_vagas(limit=200, faixa_salarial=faixa), repeticoes)
+    operacoes['obter_distribuicao_salarios'] = cronometrar(db.obter_distribuicao_salarios, repeticoes)
+    
+    operacoes['obter_estatisticas'] = cronometrar(db.obter_estatisticas, repeticoes)
+    operacoes['app.obter_estatisticas'] = cronometrar(app.obter_estatisticas, repeticoes)
+    operacoes['extrair_estados_cidades'] = cronometrar(app.extrair_estados_cidades, repeticoes)
+    
+    # Descrição completa sob demanda (tela de detalhes)
+    ids_amostra = itertools.cycle(f"sintetica{n:09d}" for n in random.Random(semente).sample(range(quantidade), 100))
+    operacoes['obter_descricao'] = cronometrar(lambda: db.obter_descricao(next(ids_amostra)), max(repeticoes, 20))
+    
+    # obter_vagas_dataframe com os filtros do dashboard
+    filtros_dashboard = {
+        'sem_filtros': None,
+        'empresa': {'empresa': 'Itaú'},
+        'site': {'site': 'indeed'},
+        'keyword': {'keyword': 'Dados'},
+        'horario_flexivel': {'horario_flexivel': 'True'},
+        'estados': {'estados': ['SP', 'RJ']},
+        'cidades': {'cidades': ['Curitiba']},
+        'combinado': {'site': 'linkedin', 'keyword': 'BI', 'estados': ['SP'], 'horario_flexivel': 'False'}
+    }
+    for nome, filtros in filtros_dashboard.items():
+        for horas in [None, 24]:
+            operacoes[f"obter_vagas_dataframe({nome}, horas={horas}, limit=200)"] = cronometrar(
+                lambda: app.obter_vagas_dataframe(limit=200, horas_recentes=horas, filtros=filtros), repeticoes)
+    
+    operacoes['obter_vagas_dataframe(sem_filtros, agrupar_duplicatas, limit=200)'] = cronometrar(
+        lambda: app.obter_vagas_dataframe(limit=200, agrupar_duplicatas=True), repeticoes)
+    
+    # Carga completa usada para montar as opções dos filtros na sidebar
+    if quantidade <= limite_sem_limit:
+        operacoes['obter_vagas_dataframe(completo)'] = cronometrar(app.obter_vagas_dataframe, repeticoes)
+    
+    resultados['operacoes'] = operacoes
+    return resultados
+
+def executar_benchmark(escalas, repeticoes=3, limite_sem_limit=100000, diretorio=None, semente=42):
+    """Roda o benchmark para cada escala e retorna o relatório"""
+    relatorio = {
+        'data': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'sqlite': sqlite3.sqlite_version,
+        'repeticoes': repeticoes,
+        'escalas': {}
+    }
+    
+    with tempfile.TemporaryDirectory(dir=diretorio) as pasta:
+        for quantidade in escalas:
+            logger.info(f"📦 Escala: {quantidade} vagas")
+            db_path = os.path.join(pasta, f"benchmark_{quantidade}.db")
+            relatorio['escalas'][str(quantidade)] = medir_escala(db_path, quantidade, repeticoes,
+                                                                 limite_sem_limit, semente)
+            os.remove(db_path)
+    
+    return relatorio
+
+def imprimir_relatorio(relatorio):
+    for escala, dados in relatorio['escalas'].items():
+        print(f"\n📊 {escala} vagas ({dados['tamanho_arquivo_mb']} MB, gerado em {dados['geracao_s']}s)")
+        for operacao, tempos in dados['operacoes'].items():
+            print(f"  {tempos['mediana'] * 1000:10.2f} ms  {operacao}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do banco de vagas em escala sintética")
+    parser.add_argument("--escalas", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--limite-sem-limit", type=int, default=100000,
+                        help="Maior escala em que consultas sem LIMIT são medidas")
+    parser.add_argument("--diretorio", help="Diretório para os bancos temporários")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON para o relatório")
+    args = parser.parse_args(argv)
+    
+    relatorio = executar_benchmark(args.escalas, args.repeticoes, args.limite_sem_limit,
+                                   args.diretorio, args.semente)
+    imprimir_relatorio(relatorio)
+    if args.saida:
+        with open(args.saida, "w", encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        logger.info(f"💾 Relatório salvo em: {args.saida}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
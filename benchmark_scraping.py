@@ -0,0 +1,221 @@
+"""
+Benchmark ponta a ponta do pipeline de scraping sobre respostas gravadas (sem acessar os sites).
+
+Uso:
+    python benchmark_scraping.py gravar [--selenium]
+    python benchmark_scraping.py benchmark --latencia 0.2 --taxa-429 0.05 --taxa-400 0.02 --saida relatorio.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+from contextlib import contextmanager
+import scraper
+import scraper_jobspy
+from pipeline import PipelineIngestao
+from database import DatabaseManager
+from replay_scraping import DIRETORIO_FIXTURES, InjetorFalhas, modo_gravacao, modo_replay
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _TempoEscalado:
+    """Módulo time com as pausas dos scrapers escaladas (0 = sem pausas)"""
+    
+    def __init__(self, escala):
+        self.escala = escala
+    
+    def sleep(self, segundos):
+        if self.escala > 0:
+            time.sleep(segundos * self.escala)
+    
+    def __getattr__(self, nome):
+        return getattr(time, nome)
+
+class MedidorEstagios:
+    """Acumula tempo de CPU (da thread que executa) e tempo real por estágio"""
+    
+    def __init__(self):
+        self.cpu = {}
+        self.real = {}
+        self.chamadas = {}
+    
+    def envolver(self, estagio, funcao):
+        def envolvida(*args, **kwargs):
+            cpu_inicio = time.thread_time()
+            real_inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self.cpu[estagio] = self.cpu.get(estagio, 0.0) + time.thread_time() - cpu_inicio
+                self.real[estagio] = self.real.get(estagio, 0.0) + time.perf_counter() - real_inicio
+                self.chamadas[estagio] = self.chamadas.get(estagio, 0) + 1
+        return envolvida
+
+@contextmanager
+def _substituir(alvo, nome, valor):
+    original = getattr(alvo, nome)
+    setattr(alvo, nome, valor)
+    try:
+        yield
+    finally:
+        setattr(alvo, nome, original)
+
+def medir_execucao(nome, funcao_scraping, db_path, escala_pausas):
+    """Executa um scraper contra o replay e coleta as métricas por estágio"""
+    import cache_jobspy
+    
+    medidor = MedidorEstagios()
+    db = DatabaseManager(db_path)
+    pipeline = PipelineIngestao(db)
+    
+    with _substituir(scraper, "time", _TempoEscalado(escala_pausas)), \
+         _substituir(scraper_jobspy, "time", _TempoEscalado(escala_pausas)), \
+         _substituir(cache_jobspy, "scrape_jobs", medidor.envolver("coleta", cache_jobspy.scrape_jobs)), \
+         _substituir(scraper_jobspy.JobSpyScraper, "limpar_e_validar_dados",
+                     medidor.envolver("normalizacao", scraper_jobspy.JobSpyScraper.limpar_e_validar_dados)), \
+         _substituir(scraper.LinkedInScraper, "processar_vaga_jobspy",
+                     medidor.envolver("normalizacao", scraper.LinkedInScraper.processar_vaga_jobspy)), \
+         _substituir(scraper.LinkedInScraper, "extrair_vagas_pagina",
+                     medidor.envolver("extracao_html", scraper.LinkedInScraper.extrair_vagas_pagina)), \
+         _substituir(pipeline, "_gravar", medidor.envolver("escrita_db", pipeline._gravar)):
+        
+        cpu_inicio = time.process_time()
+        inicio = time.perf_counter()
+        pipeline.iniciar()
+        novas = funcao_scraping(pipeline, db)
+        pipeline.finalizar()
+        duracao = time.perf_counter() - inicio
+        cpu_total = time.process_time() - cpu_inicio
+    
+    recebidas = pipeline.recebidas
+    return {
+        'cenario': nome,
+        'vagas_processadas': recebidas,
+        'novas_vagas': novas,
+        'duracao_s': round(duracao, 4),
+        'vagas_por_segundo': round(recebidas / duracao, 2) if duracao > 0 else None,
+        'tempo_escrita_db_s': round(pipeline.tempo_escrita, 4),
+        'lotes_gravados': pipeline.lotes_gravados,
+        'cpu_total_s': round(cpu_total, 4),
+        'cpu_por_estagio_s': {k: round(v, 4) for k, v in medidor.cpu.items()},
+        'tempo_real_por_estagio_s': {k: round(v, 4) for k, v in medidor.real.items()},
+        'chamadas_por_estagio': medidor.chamadas
+    }
+
+def _jobspy_completo(pipeline, db):
+    scraper_jobspy_instancia = scraper_jobspy.JobSpyScraper(pipeline=pipeline)
+    scraper_jobspy_instancia._db = db
+    scraper_jobspy_instancia.intervalo_minimo_requisicoes = 0
+    return scraper_jobspy_instancia.fazer_scraping_completo()
+
+def _linkedin(usar_jobspy):
+    def executar(pipeline, db):
+        instancia = scraper.LinkedInScraper(usar_jobspy=usar_jobspy, pipeline=pipeline)
+        instancia.db = db
+        return instancia.fazer_scraping()
+    return executar
+
+def executar_benchmark(diretorio_fixtures=DIRETORIO_FIXTURES, latencia=0.0, variacao_latencia=0.0,
+                       taxa_429=0.0, taxa_400=0.0, escala_pausas=0.0, semente=42):
+    """Roda os cenários de scraping contra as fixtures e retorna o relatório"""
+    diretorio_fixtures = os.path.abspath(diretorio_fixtures)
+    injetor = InjetorFalhas(latencia, variacao_latencia, taxa_429, taxa_400, semente)
+    
+    cenarios = [
+        ("JobSpyScraper.fazer_scraping_completo", _jobspy_completo),
+        ("LinkedInScraper.fazer_scraping (JobsPy)", _linkedin(True)),
+    ]
+    
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio_execucao, modo_replay(diretorio_fixtures, injetor) as fixtures:
+        if fixtures.tem_paginas():
+            cenarios.append(("LinkedInScraper.fazer_scraping (Selenium)", _linkedin(False)))
+        
+        diretorio_original = os.getcwd()
+        os.chdir(diretorio_execucao)  # Bancos e caches relativos ficam no diretório temporário
+        try:
+            for indice, (nome, funcao) in enumerate(cenarios):
+                db_path = os.path.join(diretorio_execucao, f"benchmark_{indice}.db")
+                logger.info(f"⏱️ Benchmark: {nome}")
+                resultados.append(medir_execucao(nome, funcao, db_path, escala_pausas))
+        finally:
+            os.chdir(diretorio_original)
+    
+    return {
+        'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'parametros': {
+            'latencia': latencia, 'variacao_latencia': variacao_latencia,
+            'taxa_429': taxa_429, 'taxa_400': taxa_400,
+            'escala_pausas': escala_pausas, 'semente': semente
+        },
+        'erros_injetados': injetor.erros_injetados,
+        'resultados': resultados
+    }
+
+def gravar_fixtures(diretorio_fixtures=DIRETORIO_FIXTURES, selenium=False):
+    """Executa os scrapers reais e grava as respostas"""
+    with modo_gravacao(diretorio_fixtures):
+        scraper_jobspy.JobSpyScraper().fazer_scraping_completo()
+        scraper.LinkedInScraper(usar_jobspy=True).fazer_scraping()
+        if selenium:
+            scraper.LinkedInScraper(usar_jobspy=False).fazer_scraping()
+    logger.info(f"💾 Fixtures gravadas em: {diretorio_fixtures}")
+
+def imprimir_relatorio(relatorio):
+    print("\n📊 BENCHMARK DO PIPELINE DE SCRAPING")
+    print(f"Erros injetados: {relatorio['erros_injetados']}")
+    for r in relatorio['resultados']:
+        print(f"\n▶ {r['cenario']}")
+        print(f"  Vagas processadas: {r['vagas_processadas']} ({r['novas_vagas']} novas)")
+        print(f"  Duração: {r['duracao_s']}s | Vagas/s: {r['vagas_por_segundo']}")
+        print(f"  Escrita no banco: {r['tempo_escrita_db_s']}s em {r['lotes_gravados']} lotes")
+        print(f"  CPU total: {r['cpu_total_s']}s")
+        for estagio, cpu in r['cpu_por_estagio_s'].items():
+            print(f"    {estagio}: CPU {cpu}s | real {r['tempo_real_por_estagio_s'][estagio]}s "
+                  f"| {r['chamadas_por_estagio'][estagio]} chamadas")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gravação/replay e benchmark dos scrapers")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    
+    gravar = sub.add_parser("gravar", help="Executa os scrapers reais e grava fixtures")
+    gravar.add_argument("--fixtures", default=DIRETORIO_FIXTURES)
+    gravar.add_argument("--selenium", action="store_true", help="Também grava páginas do Selenium")
+    
+    bench = sub.add_parser("benchmark", help="Roda os scrapers contra as fixtures gravadas")
+    bench.add_argument("--fixtures", default=DIRETORIO_FIXTURES)
+    bench.add_argument("--latencia", type=float, default=0.0, help="Latência por requisição (s)")
+    bench.add_argument("--variacao-latencia", type=float, default=0.0, help="Variação aleatória da latência (s)")
+    bench.add_argument("--taxa-429", type=float, default=0.0, help="Probabilidade de erro 429")
+    bench.add_argument("--taxa-400", type=float, default=0.0, help="Probabilidade de erro 400")
+    bench.add_argument("--escala-pausas", type=float, default=0.0, help="Fator aplicado às pausas dos scrapers")
+    bench.add_argument("--semente", type=int, default=42)
+    bench.add_argument("--saida", help="Arquivo JSON para o relatório")
+    
+    args = parser.parse_args(argv)
+    
+    if args.comando == "gravar":
+        gravar_fixtures(args.fixtures, args.selenium)
+        return 0
+    
+    if not os.path.isdir(args.fixtures):
+        logger.error(f"❌ Fixtures não encontradas em '{args.fixtures}'. Execute 'gravar' primeiro.")
+        return 1
+    
+    relatorio = executar_benchmark(args.fixtures, args.latencia, args.variacao_latencia,
+                                   args.taxa_429, args.taxa_400, args.escala_pausas, args.semente)
+    imprimir_relatorio(relatorio)
+    if args.saida:
+        with open(args.saida, "w", encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        logger.info(f"💾 Relatório salvo em: {args.saida}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
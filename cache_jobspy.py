@@ -0,0 +1,181 @@
+"""
+Cache em disco para chamadas ao scrape_jobs do JobsPy:
+resultados guardados em Parquet, chaveados pelos parâmetros normalizados da busca,
+com TTL por site e remoção LRU quando o diretório passa do tamanho máximo.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import pandas as pd
+from jobspy import scrape_jobs
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# TTL por site (segundos) - abaixo do intervalo mínimo do scheduler para não mascarar vagas novas
+TTL_POR_SITE = {
+    'linkedin': 20 * 60,
+    'indeed': 20 * 60,
+    'google': 30 * 60,
+    'glassdoor': 30 * 60,
+    'ziprecruiter': 30 * 60
+}
+
+# Parâmetros que não alteram o resultado da busca
+PARAMETROS_IGNORADOS = {'verbose'}
+
+EXTENSAO = ".parquet"
+EXTENSAO_ANTIGA = ".pkl"  # Entradas em pickle de versões anteriores, apenas removidas
+
+class CacheJobSpy:
+    def __init__(self, diretorio=".cache_jobspy", ttl_por_site=None, ttl_padrao=20 * 60,
+                 tamanho_maximo_mb=200):
+        self.diretorio = diretorio
+        self.ttl_por_site = ttl_por_site or TTL_POR_SITE
+        self.ttl_padrao = ttl_padrao
+        self.tamanho_maximo = tamanho_maximo_mb * 1024 * 1024
+        self.acertos = 0
+        self.falhas = 0
+    
+    def normalizar_parametros(self, params):
+        """Normaliza os parâmetros da busca para que buscas equivalentes gerem a mesma chave"""
+        normalizados = {}
+        for nome, valor in params.items():
+            if nome in PARAMETROS_IGNORADOS or valor is None:
+                continue
+            if nome == 'site_name':
+                sites = [valor] if isinstance(valor, str) else list(valor)
+                valor = sorted(str(site).strip().lower() for site in sites)
+            elif isinstance(valor, str):
+                valor = " ".join(valor.split()).lower()
+            normalizados[nome] = valor
+        return normalizados
+    
+    def gerar_chave(self, params):
+        """Gera a chave do cache a partir dos parâmetros normalizados"""
+        texto = json.dumps(self.normalizar_parametros(params), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+    
+    def obter_ttl(self, params):
+        """TTL da busca: o menor entre os sites consultados"""
+        sites = self.normalizar_parametros(params).get('site_name') or []
+        ttls = [self.ttl_por_site.get(site, self.ttl_padrao) for site in sites]
+        return min(ttls) if ttls else self.ttl_padrao
+    
+    def caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}{EXTENSAO}")
+    
+    def ler(self, params):
+        """Retorna o DataFrame em cache (ou None se ausente/expirado)"""
+        caminho = self.caminho(self.gerar_chave(params))
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            return None
+        
+        # mtime = momento da gravação (TTL); atime = último acesso (LRU)
+        if time.time() - info.st_mtime > self.obter_ttl(params):
+            return None
+        
+        try:
+            df = pd.read_parquet(caminho)
+        except Exception as e:
+            logger.warning(f"Entrada de cache inválida ({e}), ignorando")
+            return None
+        
+        os.utime(caminho, (time.time(), info.st_mtime))
+        return df
+    
+    def gravar(self, params, df):
+        """Grava o resultado de forma atômica e aplica o limite de tamanho"""
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = self.caminho(self.gerar_chave(params))
+        
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_parquet(temporario)
+            os.replace(temporario, caminho)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        
+        self.remover_excedente()
+    
+    def remover_excedente(self):
+        """Remove as entradas expiradas há mais de um dia e as menos usadas até caber no limite"""
+        try:
+            entradas = []
+            for nome in os.listdir(self.diretorio):
+                caminho = os.path.join(self.diretorio, nome)
+                if nome.endswith(EXTENSAO):
+                    entradas.append((caminho, os.stat(caminho)))
+                elif nome.endswith(EXTENSAO_ANTIGA):
+                    self._remover(caminho)
+        except FileNotFoundError:
+            return
+        
+        agora = time.time()
+        tamanho_total = 0
+        restantes = []
+        for caminho, info in entradas:
+            if agora - info.st_mtime > 24 * 3600:
+                self._remover(caminho)
+            else:
+                tamanho_total += info.st_size
+                restantes.append((caminho, info))
+        
+        for caminho, info in sorted(restantes, key=lambda item: item[1].st_atime):
+            if tamanho_total <= self.tamanho_maximo:
+                break
+            self._remover(caminho)
+            tamanho_total -= info.st_size
+    
+    def _remover(self, caminho):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+    
+    def limpar(self):
+        """Remove todas as entradas do cache"""
+        if os.path.isdir(self.diretorio):
+            for nome in os.listdir(self.diretorio):
+                if nome.endswith((EXTENSAO, EXTENSAO_ANTIGA)):
+                    self._remover(os.path.join(self.diretorio, nome))
+    
+    def scrape_jobs(self, forcar_atualizacao=False, antes_da_requisicao=None, **params):
+        """Mesma assinatura do jobspy.scrape_jobs, servindo do cache quando possível.
+        antes_da_requisicao é chamado só quando o JobsPy vai de fato ser consultado (ex: orçamento de requisições)"""
+        if not forcar_atualizacao:
+            df = self.ler(params)
+            if df is not None:
+                self.acertos += 1
+                logger.info(f"💾 Cache JobsPy: {len(df)} vagas de {params.get('site_name')} "
+                            f"para '{params.get('search_term')}'")
+                return df
+        
+        self.falhas += 1
+        if antes_da_requisicao:
+            antes_da_requisicao()
+        df = scrape_jobs(**params)
+        
+        if df is not None:
+            try:
+                self.gravar(params, df)
+            except Exception as e:
+                logger.warning(f"Não foi possível gravar no cache do JobsPy: {e}")
+        return df
+
+# Cache compartilhado pelos scrapers
+cache_padrao = CacheJobSpy()
+
+def scrape_jobs_cache(forcar_atualizacao=False, antes_da_requisicao=None, **params):
+    """Atalho para o cache compartilhado"""
+    return cache_padrao.scrape_jobs(forcar_atualizacao=forcar_atualizacao,
+                                    antes_da_requisicao=antes_da_requisicao, **params)
@@ -1,23 +1,101 @@
 import sqlite3
+import zlib
 import pandas as pd
-from datetime import datetime, timedelta
-import hashlib
+from deduplicacao import DetectorDuplicatas
+from empresas import ResolvedorEmpresas
+from url_canonica import canonicalizar_url, gerar_id_vaga
+from datas import parsear_data, agora_epoch
+from salarios import estruturar_salario
+
+# Termos que indicam horário flexível na descrição da vaga
+TERMOS_HORARIO_FLEXIVEL = [
+    'horário flexível', 'horario flexivel', 'flexible schedule',
+    'flexibilidade de horário', 'flexibilidade horário',
+    'horários flexíveis', 'horarios flexiveis'
+]
+
+# Tamanho do resumo da descrição usado nas listagens
+TAMANHO_RESUMO = 300
+
+# Migrações do esquema, na ordem de aplicação: a posição (a partir de 1) é a versão gravada em PRAGMA user_version.
+# Só acrescentar no final; mudanças de esquema entram como um novo passo, nunca editando os já publicados
+MIGRACOES = [
+    '_migracao_tabela_vagas',
+    '_migracao_indices_vagas',
+    '_migracao_descricoes',
+    '_migracao_duplicatas',
+    '_migracao_urls_canonicas',
+    '_migracao_indexar_duplicatas',
+    '_migracao_scheduler',
+    '_migracao_rollup_diario',
+    '_migracao_vagas_ocultas',
+    '_migracao_contador_alteracoes',
+    '_migracao_marcas_leitura',
+    '_migracao_vagas_similares',
+    '_migracao_empresas',
+    '_migracao_sequencia_vagas',
+    '_migracao_parametros_por_site',
+    '_migracao_tombstones_recalculaveis'
+]
 
 class DatabaseManager:
     def __init__(self, db_path="vagas_linkedin.db"):
         self.db_path = db_path
+        self.detector = DetectorDuplicatas()
+        self.empresas = ResolvedorEmpresas()
         self.init_database()
     
     def init_database(self):
-        """Inicializa o banco de dados com a tabela de vagas"""
+        """Aplica as migrações pendentes do esquema.
+        A versão fica em PRAGMA user_version: com o banco em dia, o custo é uma única leitura do pragma."""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        # Verificar se a tabela existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='vagas'")
-        table_exists = cursor.fetchone() is not None
+        cursor.execute("PRAGMA user_version")
+        versao_atual = cursor.fetchone()[0]
+        if versao_atual >= len(MIGRACOES):
+            conn.close()
+            return
         
-        if not table_exists:
+        # Estado do banco antes das migrações (bancos anteriores ao user_version chegam com versão 0)
+        cursor.execute("PRAGMA table_info(vagas)")
+        contexto = {'colunas': {info[1] for info in cursor.fetchall()}}
+        contexto['tabela_existia'] = bool(contexto['colunas'])
+        
+        try:
+            for versao, nome in enumerate(MIGRACOES, start=1):
+                if versao <= versao_atual:
+                    continue
+                # A versão é gravada no mesmo commit das alterações do passo; DDL fora de transação
+                # (ALTER TABLE) é confirmado na hora, por isso os passos também precisam ser reexecutáveis
+                getattr(self, nome)(cursor, contexto)
+                cursor.execute(f"PRAGMA user_version = {versao}")
+                conn.commit()
+                print(f"Migração {versao} aplicada: {nome}")
+        finally:
+            conn.close()
+    
+    def _adicionar_coluna(self, cursor, tabela, coluna, definicao):
+        """ALTER TABLE ADD COLUMN só se a coluna ainda não existir (passo interrompido e reexecutado)"""
+        cursor.execute(f"PRAGMA table_info({tabela})")
+        if coluna in {info[1] for info in cursor.fetchall()}:
+            return False
+        cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+        return True
+    
+    def _migracao_tabela_vagas(self, cursor, contexto):
+        """Tabela vagas com todas as colunas, datas em epoch e salários estruturados.
+        Também normaliza bancos criados antes das migrações versionadas (colunas adicionadas aos poucos)."""
+        # auto_vacuum incremental permite devolver ao disco as páginas liberadas pela retenção.
+        # Em bancos novos basta o PRAGMA antes de criar as tabelas; nos existentes exige um VACUUM (uma única vez)
+        cursor.execute("PRAGMA auto_vacuum")
+        if cursor.fetchone()[0] != 2:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if contexto['tabela_existia']:
+                print("🔄 Ativando auto_vacuum incremental (VACUUM único)...")
+                cursor.execute("VACUUM")
+        
+        if not contexto['tabela_existia']:
             # Criar tabela com todos os campos necessários
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS vagas (
@@ -26,53 +104,482 @@ class DatabaseManager:
                     empresa TEXT NOT NULL,
                     localizacao TEXT,
                     area_vaga TEXT,
-                    descricao TEXT,
+                    descricao_resumo TEXT,
+                    horario_flexivel INTEGER DEFAULT 0,
+                    cluster_id TEXT,
                     link TEXT NOT NULL,
+                    site_job_id TEXT,
+                    canonical_url TEXT,
                     data_postagem TEXT,
                     data_coleta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    postada_em INTEGER,
+                    coletada_em INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
                     numero_candidatos TEXT,
                     site_origem TEXT,
                     job_type TEXT,
                     is_remote TEXT,
                     salary_info TEXT,
+                    salary_min REAL,
+                    salary_max REAL,
+                    salary_interval TEXT,
+                    salario_mensal_brl REAL,
                     keyword_busca TEXT,
                     estado TEXT,
                     local_busca TEXT
                 )
             ''')
-        else:
-            # Verificar e adicionar colunas que possam estar faltando
-            cursor.execute("PRAGMA table_info(vagas)")
-            colunas_existentes = [info[1] for info in cursor.fetchall()]
-            
-            # Lista de colunas que devem existir
-            colunas_necessarias = {
-                'area_vaga': 'TEXT',
-                'numero_candidatos': 'TEXT',
-                'site_origem': 'TEXT',
-                'job_type': 'TEXT',
-                'is_remote': 'TEXT',
-                'salary_info': 'TEXT',
-                'estado': 'TEXT',
-                'local_busca': 'TEXT'
-            }
-            
-            # Adicionar colunas faltantes
-            for coluna, tipo in colunas_necessarias.items():
-                if coluna not in colunas_existentes:
-                    try:
-                        cursor.execute(f"ALTER TABLE vagas ADD COLUMN {coluna} {tipo}")
+            return
+        
+        colunas_existentes = contexto['colunas']
+        
+        # Lista de colunas que devem existir
+        colunas_necessarias = {
+            'area_vaga': 'TEXT',
+            'numero_candidatos': 'TEXT',
+            'site_origem': 'TEXT',
+            'job_type': 'TEXT',
+            'is_remote': 'TEXT',
+            'salary_info': 'TEXT',
+            'estado': 'TEXT',
+            'local_busca': 'TEXT',
+            'descricao_resumo': 'TEXT',
+            'horario_flexivel': 'INTEGER DEFAULT 0',
+            'cluster_id': 'TEXT',
+            'site_job_id': 'TEXT',
+            'canonical_url': 'TEXT',
+            'postada_em': 'INTEGER',
+            'coletada_em': 'INTEGER',
+            'salary_min': 'REAL',
+            'salary_max': 'REAL',
+            'salary_interval': 'TEXT',
+            'salario_mensal_brl': 'REAL'
+        }
+        
+        # Adicionar colunas faltantes
+        for coluna, tipo in colunas_necessarias.items():
+            if coluna not in colunas_existentes:
+                try:
+                    if self._adicionar_coluna(cursor, 'vagas', coluna, tipo):
                         print(f"Adicionada coluna '{coluna}' à tabela vagas")
-                    except sqlite3.Error as e:
-                        print(f"Erro ao adicionar coluna {coluna}: {e}")
+                except sqlite3.Error as e:
+                    print(f"Erro ao adicionar coluna {coluna}: {e}")
         
-        conn.commit()
-        conn.close()
+        if 'coletada_em' not in colunas_existentes:
+            self.migrar_datas(cursor)
+        
+        if 'salario_mensal_brl' not in colunas_existentes:
+            self.migrar_salarios(cursor)
+    
+    def _migracao_indices_vagas(self, cursor, contexto):
+        # Datas em epoch (UTC) indexadas para os filtros por período
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_coletada_em ON vagas (coletada_em)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_postada_em ON vagas (postada_em)")
+        
+        # Salário mensal normalizado para o filtro por faixa e o histograma
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_salario ON vagas (salario_mensal_brl)")
+    
+    def _migracao_descricoes(self, cursor, contexto):
+        # Descrições completas, comprimidas, fora da tabela principal
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS descricoes (
+                vaga_id TEXT PRIMARY KEY,
+                conteudo BLOB NOT NULL
+            )
+        ''')
+        
+        if 'descricao' in contexto['colunas']:
+            self.migrar_descricoes(cursor)
+    
+    def _migracao_duplicatas(self, cursor, contexto):
+        # Índice LSH e agrupamento de vagas quase duplicadas entre sites
+        self.detector.criar_tabelas(cursor)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_cluster ON vagas (cluster_id)")
+    
+    def _migracao_urls_canonicas(self, cursor, contexto):
+        # IDs derivados da URL canônica: bancos antigos são recalculados e as duplicatas, mescladas
+        if contexto['tabela_existia'] and 'site_job_id' not in contexto['colunas']:
+            self.migrar_urls_canonicas(cursor)
+    
+    def _migracao_tombstones_recalculaveis(self, cursor, contexto):
+        # Título, empresa e link da vaga excluída permitem recalcular o ID do tombstone quando a
+        # canonicalização das URLs mudar (tombstones antigos não têm esses dados)
+        for coluna in ('titulo', 'empresa', 'link'):
+            self._adicionar_coluna(cursor, 'vagas_removidas', coluna, "TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_site_job_id ON vagas (site_job_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_canonical_url ON vagas (canonical_url)")
+    
+    def _migracao_indexar_duplicatas(self, cursor, contexto):
+        # Vagas gravadas antes do detector (ou inseridas fora do DatabaseManager) recebem cluster_id
+        cursor.connection.commit()
+        self.indexar_duplicatas()
+    
+    def _migracao_scheduler(self, cursor, contexto):
+        # Próximas execuções do scheduler (persistidas entre reinícios)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS agendamentos (
+                nome TEXT PRIMARY KEY,
+                proxima_execucao REAL,
+                ultima_execucao REAL
+            )
+        ''')
+        
+        # Histórico de execuções de scraping por (termo, site)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS execucoes_scraping (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                termo TEXT NOT NULL,
+                site TEXT NOT NULL,
+                inicio REAL NOT NULL,
+                fim REAL,
+                total_encontradas INTEGER DEFAULT 0,
+                novas_vagas INTEGER DEFAULT 0,
+                erro TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_execucoes_termo_site
+            ON execucoes_scraping (termo, site, inicio)
+        ''')
+    
+    def _migracao_rollup_diario(self, cursor, contexto):
+        # Novas vagas por dia e dimensão (site, keyword, estado, tipo), mantidas pelo scheduler após cada scraping
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_diario (
+                dia TEXT NOT NULL,
+                dimensao TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                novas INTEGER NOT NULL,
+                PRIMARY KEY (dimensao, dia, valor)
+            ) WITHOUT ROWID
+        ''')
+        cursor.connection.commit()
+        self.atualizar_rollups()  # Carga inicial com o histórico existente
+    
+    def _migracao_vagas_ocultas(self, cursor, contexto):
+        # Vagas ocultadas continuam no banco, fora das listagens; o índice atende o filtro e a ordenação juntos
+        self._adicionar_coluna(cursor, 'vagas', 'oculta', "INTEGER NOT NULL DEFAULT 0")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_visiveis ON vagas (oculta, coletada_em)")
+        
+        # Tombstones das vagas excluídas, para que novos scrapings não as tragam de volta
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vagas_removidas (
+                vaga_id TEXT PRIMARY KEY,
+                removida_em INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+    
+    def _migracao_contador_alteracoes(self, cursor, contexto):
+        # Contador incrementado por triggers a cada alteração em vagas: o dashboard consulta só esta linha
+        # para saber se precisa recarregar a lista
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contador_alteracoes (
+                tabela TEXT PRIMARY KEY,
+                versao INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO contador_alteracoes (tabela, versao) VALUES ('vagas', 0)")
+        for evento in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_vagas_{evento.lower()}_contador AFTER {evento} ON vagas
+                BEGIN
+                    UPDATE contador_alteracoes SET versao = versao + 1 WHERE tabela = 'vagas';
+                END
+            ''')
+    
+    def _migracao_marcas_leitura(self, cursor, contexto):
+        # Última vaga (rowid) vista por usuário, para destacar as novas desde a visita anterior
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS marcas_leitura (
+                usuario TEXT PRIMARY KEY,
+                ultima_vaga INTEGER NOT NULL,
+                atualizada_em INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
+        # Contador só de exclusões e ocultações: sem elas, o dashboard busca apenas as vagas novas
+        cursor.execute("INSERT OR IGNORE INTO contador_alteracoes (tabela, versao) VALUES ('vagas_remocoes', 0)")
+        for nome, evento in (('delete', 'DELETE'), ('ocultar', 'UPDATE OF oculta')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_vagas_{nome}_remocoes AFTER {evento} ON vagas
+                BEGIN
+                    UPDATE contador_alteracoes SET versao = versao + 1 WHERE tabela = 'vagas_remocoes';
+                END
+            ''')
+    
+    def _migracao_vagas_similares(self, cursor, contexto):
+        # Vizinhas mais próximas (cosseno TF-IDF) de cada vaga, pré-calculadas pelo índice de relevância
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vagas_similares (
+                vaga_id TEXT NOT NULL,
+                posicao INTEGER NOT NULL,
+                similar_id TEXT NOT NULL,
+                similaridade REAL NOT NULL,
+                PRIMARY KEY (vaga_id, posicao)
+            ) WITHOUT ROWID
+        ''')
+    
+    def _migracao_empresas(self, cursor, contexto):
+        # Empresa canônica de cada vaga: agrupamentos e contagens por inteiro, não pelo nome como veio do site
+        self.empresas.criar_tabelas(cursor)
+        self._adicionar_coluna(cursor, 'vagas', 'empresa_id', "INTEGER")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vagas_empresa_id ON vagas (empresa_id)")
+        cursor.connection.commit()
+        self.indexar_empresas()
+    
+    def _migracao_sequencia_vagas(self, cursor, contexto):
+        # Número de sequência nunca reaproveitado: o rowid de vagas (chave TEXT, sem AUTOINCREMENT) volta a ser
+        # usado quando a vaga mais recente é excluída, e a marca de leitura deixaria de ver a vaga que o herdou
+        self._adicionar_coluna(cursor, 'vagas', 'seq', "INTEGER")
+        cursor.execute("UPDATE vagas SET seq = rowid WHERE seq IS NULL")
+        cursor.execute('''
+            INSERT OR IGNORE INTO contador_alteracoes (tabela, versao)
+            SELECT 'vagas_seq', COALESCE(MAX(seq), 0) FROM vagas
+        ''')
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_vagas_seq ON vagas (seq)")
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_vagas_insert_seq AFTER INSERT ON vagas
+            BEGIN
+                UPDATE contador_alteracoes SET versao = versao + 1 WHERE tabela = 'vagas_seq';
+                UPDATE vagas SET seq = (SELECT versao FROM contador_alteracoes WHERE tabela = 'vagas_seq')
+                WHERE rowid = NEW.rowid;
+            END
+        ''')
+    
+    def _migracao_parametros_por_site(self, cursor, contexto):
+        # ref, src, position e from só são rastreamento nos sites que os usam assim: URLs de outros sites
+        # voltam a mantê-los, e os IDs sem ID nativo são recalculados
+        if contexto['tabela_existia']:
+            self.migrar_urls_canonicas(cursor)
     
     def gerar_id_vaga(self, titulo, empresa, link):
-        """Gera um ID único para a vaga baseado no título, empresa e link"""
-        texto_hash = f"{titulo}{empresa}{link}"
-        return hashlib.md5(texto_hash.encode()).hexdigest()
+        """Gera um ID único para a vaga (ID nativo do site ou título, empresa e URL canônica)"""
+        return gerar_id_vaga(titulo, empresa, link)
+    
+    def migrar_datas(self, cursor, tamanho_lote=5000):
+        """Preenche coletada_em/postada_em (epoch UTC) a partir das colunas de texto antigas"""
+        # data_coleta vem do CURRENT_TIMESTAMP do SQLite, que já é UTC
+        cursor.execute(
+            "UPDATE vagas SET coletada_em = CAST(strftime('%s', data_coleta) AS INTEGER) WHERE coletada_em IS NULL"
+        )
+        cursor.execute(f"UPDATE vagas SET coletada_em = {agora_epoch()} WHERE coletada_em IS NULL")
+        
+        # data_postagem é texto livre: datas relativas são contadas a partir da coleta
+        cursor.execute("SELECT id, data_postagem, coletada_em FROM vagas WHERE data_postagem IS NOT NULL")
+        linhas = cursor.fetchall()
+        for inicio in range(0, len(linhas), tamanho_lote):
+            valores = [(parsear_data(data_postagem, coletada_em), vaga_id)
+                       for vaga_id, data_postagem, coletada_em in linhas[inicio:inicio + tamanho_lote]]
+            cursor.executemany("UPDATE vagas SET postada_em = ? WHERE id = ?", valores)
+        
+        print("Datas de coleta e postagem convertidas para epoch")
+    
+    def migrar_salarios(self, cursor):
+        """Preenche as colunas numéricas de salário a partir do texto salary_info"""
+        cursor.execute("SELECT id, salary_info FROM vagas WHERE salary_info IS NOT NULL AND salary_info != 'Não informado'")
+        valores = []
+        for vaga_id, salary_info in cursor.fetchall():
+            salario = estruturar_salario({'salary_info': salary_info})
+            if salario['salary_min'] is not None or salario['salary_max'] is not None:
+                valores.append((salario['salary_min'], salario['salary_max'], salario['salary_interval'],
+                                salario['salario_mensal_brl'], vaga_id))
+        
+        cursor.executemany('''
+            UPDATE vagas SET salary_min = ?, salary_max = ?, salary_interval = ?, salario_mensal_brl = ?
+            WHERE id = ?
+        ''', valores)
+        print(f"Salários estruturados: {len(valores)} vagas")
+    
+    def migrar_urls_canonicas(self, cursor):
+        """Recalcula os IDs pelas URLs canônicas e mescla as vagas que passam a ter o mesmo ID
+        (fica a coleta mais antiga)"""
+        cursor.execute("""
+            SELECT id, titulo, empresa, link, site_job_id, canonical_url FROM vagas ORDER BY coletada_em, id
+        """)
+        
+        novos_ids = {}  # id antigo -> id novo
+        urls = []
+        sobreviventes = set()
+        removidas = []
+        for vaga_id, titulo, empresa, link, site_job_id_atual, canonical_url_atual in cursor.fetchall():
+            site_job_id, canonical_url = canonicalizar_url(link)
+            novo_id = gerar_id_vaga(titulo, empresa, link)
+            novos_ids[vaga_id] = novo_id
+            if novo_id in sobreviventes:
+                removidas.append(vaga_id)
+            else:
+                sobreviventes.add(novo_id)
+                if (site_job_id, canonical_url) != (site_job_id_atual, canonical_url_atual):
+                    urls.append((site_job_id, canonical_url, vaga_id))
+        
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vagas_similares'")
+        tem_similares = cursor.fetchone() is not None
+        
+        parametros_removidas = [(vaga_id,) for vaga_id in removidas]
+        cursor.executemany("DELETE FROM vagas WHERE id = ?", parametros_removidas)
+        cursor.executemany("DELETE FROM descricoes WHERE vaga_id = ?", parametros_removidas)
+        if tem_similares:
+            cursor.executemany("DELETE FROM vagas_similares WHERE vaga_id = ? OR similar_id = ?",
+                               [(vaga_id, vaga_id) for vaga_id in removidas])
+        self.detector.remover(cursor, removidas)
+        
+        cursor.executemany("UPDATE vagas SET site_job_id = ?, canonical_url = ? WHERE id = ?", urls)
+        
+        alterados = [(novo, antigo) for antigo, novo in novos_ids.items() if novo != antigo]
+        cursor.executemany("UPDATE vagas SET cluster_id = ? WHERE cluster_id = ?", alterados)
+        removidas = set(removidas)
+        alterados = [(novo, antigo) for novo, antigo in alterados if antigo not in removidas]
+        cursor.executemany("UPDATE vagas SET id = ? WHERE id = ?", alterados)
+        cursor.executemany("UPDATE descricoes SET vaga_id = ? WHERE vaga_id = ?", alterados)
+        cursor.executemany("UPDATE minhash_vagas SET vaga_id = ? WHERE vaga_id = ?", alterados)
+        cursor.executemany("UPDATE lsh_buckets SET vaga_id = ? WHERE vaga_id = ?", alterados)
+        if tem_similares:
+            cursor.executemany("UPDATE vagas_similares SET vaga_id = ? WHERE vaga_id = ?", alterados)
+            cursor.executemany("UPDATE vagas_similares SET similar_id = ? WHERE similar_id = ?", alterados)
+        
+        # Tombstones acompanham o ID novo: sem isso as vagas excluídas voltariam no próximo scraping
+        cursor.execute("PRAGMA table_info(vagas_removidas)")
+        colunas_removidas = {info[1] for info in cursor.fetchall()}
+        if colunas_removidas:
+            cursor.executemany("UPDATE OR REPLACE vagas_removidas SET vaga_id = ? WHERE vaga_id = ?", alterados)
+            if 'link' in colunas_removidas:
+                cursor.execute("SELECT vaga_id, titulo, empresa, link FROM vagas_removidas WHERE link IS NOT NULL")
+                tombstones = [(gerar_id_vaga(titulo, empresa, link), vaga_id)
+                              for vaga_id, titulo, empresa, link in cursor.fetchall()]
+                cursor.executemany("UPDATE OR REPLACE vagas_removidas SET vaga_id = ? WHERE vaga_id = ?",
+                                   [(novo, antigo) for novo, antigo in tombstones if novo != antigo])
+        
+        print(f"IDs recalculados pela URL canônica: {len(alterados)} alterados, {len(removidas)} duplicatas mescladas")
+    
+    def comprimir_descricao(self, texto):
+        """Comprime a descrição completa para a tabela descricoes"""
+        return zlib.compress(str(texto).encode('utf-8'), 6)
+    
+    def descomprimir_descricao(self, conteudo):
+        """Descomprime uma descrição da tabela descricoes"""
+        return zlib.decompress(conteudo).decode('utf-8')
+    
+    def gerar_resumo(self, texto):
+        """Gera o resumo curto da descrição exibido nas listagens"""
+        texto = " ".join(str(texto).split())
+        if len(texto) <= TAMANHO_RESUMO:
+            return texto
+        return texto[:TAMANHO_RESUMO].rsplit(" ", 1)[0] + "..."
+    
+    def tem_horario_flexivel(self, texto):
+        """Verifica se a descrição menciona horário flexível"""
+        texto = str(texto).lower()
+        return any(termo in texto for termo in TERMOS_HORARIO_FLEXIVEL)
+    
+    def migrar_descricoes(self, cursor, tamanho_lote=1000):
+        """Move as descrições da coluna antiga vagas.descricao para a tabela descricoes"""
+        total = 0
+        while True:
+            cursor.execute(
+                "SELECT id, descricao FROM vagas WHERE descricao IS NOT NULL LIMIT ?", (tamanho_lote,)
+            )
+            linhas = cursor.fetchall()
+            if not linhas:
+                break
+            
+            cursor.executemany(
+                "INSERT OR REPLACE INTO descricoes (vaga_id, conteudo) VALUES (?, ?)",
+                [(vaga_id, self.comprimir_descricao(descricao)) for vaga_id, descricao in linhas]
+            )
+            cursor.executemany(
+                "UPDATE vagas SET descricao = NULL, descricao_resumo = ?, horario_flexivel = ? WHERE id = ?",
+                [(self.gerar_resumo(descricao), int(self.tem_horario_flexivel(descricao)), vaga_id)
+                 for vaga_id, descricao in linhas]
+            )
+            total += len(linhas)
+        
+        if total:
+            print(f"Migradas {total} descrições para a tabela descricoes")
+        
+        # A coluna antiga só pode ser removida a partir do SQLite 3.35
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            cursor.execute("ALTER TABLE vagas DROP COLUMN descricao")
+    
+    def indexar_duplicatas(self, tamanho_lote=500):
+        """Atribui cluster_id às vagas que ainda não passaram pelo detector de duplicatas"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        total = 0
+        
+        try:
+            while True:
+                cursor.execute('''
+                    SELECT v.id, v.titulo, v.empresa, d.conteudo
+                    FROM vagas v LEFT JOIN descricoes d ON d.vaga_id = v.id
+                    WHERE v.cluster_id IS NULL
+                    ORDER BY v.coletada_em
+                    LIMIT ?
+                ''', (tamanho_lote,))
+                linhas = cursor.fetchall()
+                if not linhas:
+                    break
+                
+                for vaga_id, titulo, empresa, conteudo in linhas:
+                    descricao = self.descomprimir_descricao(conteudo) if conteudo else None
+                    self.detector.atribuir_cluster(cursor, vaga_id, titulo, empresa, descricao)
+                conn.commit()
+                total += len(linhas)
+        finally:
+            conn.close()
+        
+        if total:
+            print(f"Indexadas {total} vagas no detector de duplicatas")
+        return total
+    
+    def indexar_empresas(self):
+        """Atribui empresa_id às vagas que ainda não têm (cada nome distinto é resolvido uma vez)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        try:
+            # A grafia mais frequente chega primeiro e vira o nome canônico da empresa
+            cursor.execute("SELECT empresa FROM vagas WHERE empresa_id IS NULL GROUP BY empresa ORDER BY COUNT(*) DESC")
+            nomes = [linha[0] for linha in cursor.fetchall()]
+            for nome in nomes:
+                self.empresas.resolver(cursor, nome)
+            # Os nomes resolvidos estão todos na tabela de aliases: uma única passada pelas vagas
+            cursor.execute('''
+                UPDATE vagas SET empresa_id = (
+                    SELECT empresa_id FROM empresas_aliases WHERE alias = COALESCE(NULLIF(vagas.empresa, ''), 'Não informado')
+                )
+                WHERE empresa_id IS NULL
+            ''')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            self.empresas.invalidar()
+            raise
+        finally:
+            conn.close()
+        
+        if nomes:
+            print(f"Resolvidos {len(nomes)} nomes de empresa")
+        return len(nomes)
+    
+    def identificar_empresa(self, nome):
+        """empresa_id correspondente ao nome (None se nenhuma empresa cadastrada equivale a ele)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        empresa_id = self.empresas.identificar(cursor, nome)
+        
+        conn.close()
+        return empresa_id
+    
+    def obter_empresas(self):
+        """Nome canônico de cada empresa ({empresa_id: nome})"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id, nome FROM empresas")
+        empresas = dict(cursor.fetchall())
+        
+        conn.close()
+        return empresas
     
     def vaga_existe(self, vaga_id):
         """Verifica se a vaga já existe no banco"""
@@ -85,19 +592,13 @@ class DatabaseManager:
         conn.close()
         return existe
     
-    def inserir_vaga(self, vaga_data):
-        """Insere uma nova vaga no banco de dados"""
+    def preparar_insercao(self, vaga_data):
+        """Monta o ID, a query de inserção de uma vaga e a descrição comprimida"""
         vaga_id = self.gerar_id_vaga(vaga_data['titulo'], vaga_data['empresa'], vaga_data['link'])
         
-        if self.vaga_existe(vaga_id):
-            return False  # Vaga já existe
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Campos que devem estar presentes
         campos = [
-            'titulo', 'empresa', 'localizacao', 'descricao', 'link', 'data_postagem', 
+            'titulo', 'empresa', 'localizacao', 'link', 'data_postagem', 
             'keyword_busca', 'area_vaga', 'numero_candidatos', 'site_origem', 
             'job_type', 'is_remote', 'salary_info', 'estado', 'local_busca'
         ]
@@ -110,28 +611,150 @@ class DatabaseManager:
             placeholders.append("?")
             valores.append(vaga_data.get(campo, 'Não informado'))
         
+        # Datas em epoch UTC (datas relativas como "há 2 horas" são resolvidas agora)
+        coletada_em = agora_epoch()
+        campos = campos + ['coletada_em', 'postada_em']
+        placeholders.extend(["?", "?"])
+        valores.extend([coletada_em, parsear_data(vaga_data.get('data_postagem'), coletada_em)])
+        
+        # Salário numérico (do JobsPy ou extraído do texto) e valor mensal em reais
+        salario = estruturar_salario(vaga_data)
+        campos = campos + list(salario)
+        placeholders.extend("?" for _ in salario)
+        valores.extend(salario.values())
+        
+        # ID nativo do site e URL sem parâmetros de rastreamento
+        site_job_id, canonical_url = canonicalizar_url(vaga_data['link'])
+        campos = campos + ['site_job_id', 'canonical_url']
+        placeholders.extend(["?", "?"])
+        valores.extend([site_job_id, canonical_url])
+        
+        # Descrição: resumo e indicador de horário flexível na tabela principal, texto completo à parte
+        descricao = vaga_data.get('descricao', 'Não informado')
+        campos = campos + ['descricao_resumo', 'horario_flexivel']
+        placeholders.extend(["?", "?"])
+        valores.extend([self.gerar_resumo(descricao), int(self.tem_horario_flexivel(descricao))])
+        
         # Construir a query dinamicamente
-        query = f"INSERT INTO vagas (id, {', '.join(campos)}) VALUES ({', '.join(placeholders)})"
+        query = f"INSERT OR IGNORE INTO vagas (id, {', '.join(campos)}) VALUES ({', '.join(placeholders)})"
+        return vaga_id, query, valores, self.comprimir_descricao(descricao)
+    
+    def _gravar_complementos(self, cursor, vaga_id, vaga_data, descricao):
+        """Grava a descrição comprimida e agrupa a vaga com suas duplicatas de outros sites"""
+        cursor.execute(
+            "INSERT OR REPLACE INTO descricoes (vaga_id, conteudo) VALUES (?, ?)", (vaga_id, descricao)
+        )
+        self.detector.atribuir_cluster(
+            cursor, vaga_id, vaga_data['titulo'], vaga_data['empresa'], vaga_data.get('descricao')
+        )
+        self.empresas.atribuir_empresa(cursor, vaga_id, vaga_data['empresa'])
+    
+    def vagas_conhecidas(self, vaga_ids):
+        """IDs já gravados ou excluídos (tombstone): os scrapers pulam essas vagas antes de buscar a descrição"""
+        vaga_ids = list(set(vaga_ids))
+        conhecidas = set()
+        if not vaga_ids:
+            return conhecidas
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for inicio in range(0, len(vaga_ids), 500):
+            lote = vaga_ids[inicio:inicio + 500]
+            marcadores = ", ".join("?" * len(lote))
+            cursor.execute(f'''
+                SELECT id FROM vagas WHERE id IN ({marcadores})
+                UNION
+                SELECT vaga_id FROM vagas_removidas WHERE vaga_id IN ({marcadores})
+            ''', lote + lote)
+            conhecidas.update(linha[0] for linha in cursor.fetchall())
+        
+        conn.close()
+        return conhecidas
+    
+    def _vagas_removidas(self, cursor, vaga_ids):
+        """Subconjunto de vaga_ids com tombstone"""
+        removidas = set()
+        vaga_ids = list(vaga_ids)
+        for inicio in range(0, len(vaga_ids), 500):
+            lote = vaga_ids[inicio:inicio + 500]
+            cursor.execute(f"SELECT vaga_id FROM vagas_removidas WHERE vaga_id IN ({', '.join('?' * len(lote))})", lote)
+            removidas.update(linha[0] for linha in cursor.fetchall())
+        return removidas
+    
+    def inserir_vaga(self, vaga_data):
+        """Insere uma nova vaga no banco de dados"""
+        vaga_id, query, valores, descricao = self.preparar_insercao(vaga_data)
+        
+        if self.vaga_existe(vaga_id):
+            return False  # Vaga já existe
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        if self._vagas_removidas(cursor, [vaga_id]):
+            conn.close()
+            return False  # Vaga excluída pelo usuário
         
         cursor.execute(query, valores)
+        if cursor.rowcount > 0:
+            self._gravar_complementos(cursor, vaga_id, vaga_data, descricao)
         
         conn.commit()
         conn.close()
         return True  # Vaga inserida com sucesso
     
-    def obter_vagas(self, limit=None, horas_recentes=None, estados=None, horario_flexivel=None):
+    def inserir_vagas_lote(self, vagas, detalhado=False):
+        """Insere um lote de vagas em uma única transação; retorna quantas eram novas
+        (ou, com detalhado=True, uma lista indicando se cada vaga foi inserida)"""
+        if not vagas:
+            return [] if detalhado else 0
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        inseridas = []
+        
+        try:
+            preparadas = []
+            for vaga_data in vagas:
+                try:
+                    preparadas.append(self.preparar_insercao(vaga_data))
+                except KeyError as e:
+                    print(f"Vaga ignorada no lote (campo ausente: {e})")
+                    preparadas.append(None)
+            removidas = self._vagas_removidas(cursor, [p[0] for p in preparadas if p])
+            
+            for vaga_data, preparada in zip(vagas, preparadas):
+                if preparada is None or preparada[0] in removidas:
+                    inseridas.append(False)
+                    continue
+                vaga_id, query, valores, descricao = preparada
+                cursor.execute(query, valores)
+                inserida = cursor.rowcount > 0
+                if inserida:
+                    self._gravar_complementos(cursor, vaga_id, vaga_data, descricao)
+                inseridas.append(inserida)
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            self.empresas.invalidar()
+            raise
+        finally:
+            conn.close()
+        
+        return inseridas if detalhado else sum(inseridas)
+    
+    def obter_vagas(self, limit=None, horas_recentes=None, estados=None, horario_flexivel=None, faixa_salarial=None):
         """Obtém vagas do banco de dados com filtros diversos"""
         conn = sqlite3.connect(self.db_path)
         
         query = "SELECT * FROM vagas"
         params = []
-        conditions = []
+        conditions = ["oculta = 0"]
         
         # Filtro por data de coleta
         if horas_recentes:
-            data_limite = datetime.now() - timedelta(hours=horas_recentes)
-            conditions.append("data_coleta >= ?")
-            params.append(data_limite.strftime('%Y-%m-%d %H:%M:%S'))
+            conditions.append("coletada_em >= ?")
+            params.append(agora_epoch() - int(horas_recentes * 3600))
         
         # Filtro por estado(s)
         if estados and isinstance(estados, list) and len(estados) > 0:
@@ -140,25 +763,22 @@ class DatabaseManager:
             conditions.append(f"estado IN ({estados_placeholders})")
             params.extend(estados)
         
-        # Filtro por horário flexível na descrição
+        # Filtro por horário flexível (calculado a partir da descrição na inserção)
         if horario_flexivel is not None:
-            if horario_flexivel:
-                # Se True, buscar vagas com "horário flexível" na descrição
-                conditions.append("(descricao LIKE ? OR descricao LIKE ?)")
-                params.append('%horário flexível%')
-                params.append('%horario flexivel%')
-            else:
-                # Se False, buscar vagas sem "horário flexível" na descrição
-                conditions.append("(descricao NOT LIKE ? AND descricao NOT LIKE ?)")
-                params.append('%horário flexível%')
-                params.append('%horario flexivel%')
+            conditions.append("horario_flexivel = ?")
+            params.append(1 if horario_flexivel else 0)
+        
+        # Filtro por salário mensal em reais (mínimo, máximo)
+        if faixa_salarial:
+            conditions.append("salario_mensal_brl BETWEEN ? AND ?")
+            params.extend(faixa_salarial)
         
         # Adicionar condições à query
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
         # Ordenação e limite
-        query += " ORDER BY data_coleta DESC"
+        query += " ORDER BY coletada_em DESC"
         
         if limit:
             query += f" LIMIT {limit}"
@@ -168,33 +788,355 @@ class DatabaseManager:
         
         return df
     
+    def montar_filtros(self, horas_recentes=None, filtros=None):
+        """Condições WHERE e parâmetros dos filtros do dashboard (usados na listagem e na exportação)"""
+        conditions = []
+        params = []
+        
+        # Vagas ocultas ficam fora, salvo pedido explícito (índice idx_vagas_visiveis)
+        if not (filtros and filtros.get('mostrar_ocultas')):
+            conditions.append("oculta = 0")
+        
+        if horas_recentes:
+            conditions.append("coletada_em >= ?")
+            params.append(agora_epoch() - int(horas_recentes * 3600))
+        
+        # Aplicar filtros adicionais
+        if filtros:
+            # Qualquer grafia da empresa seleciona todas as vagas dela (índice de empresa_id)
+            if filtros.get('empresa') and filtros['empresa'] != 'Todas':
+                conditions.append("empresa_id = ?")
+                params.append(self.identificar_empresa(filtros['empresa']))
+            
+            if filtros.get('site') and filtros['site'] != 'Todos':
+                conditions.append("site_origem = ?")
+                params.append(filtros['site'])
+            
+            if filtros.get('keyword') and filtros['keyword'] != 'Todas':
+                conditions.append("keyword_busca = ?")
+                params.append(filtros['keyword'])
+            
+            if filtros.get('job_type') and filtros['job_type'] != 'Todos':
+                conditions.append("job_type = ?")
+                params.append(filtros['job_type'])
+            
+            if filtros.get('is_remote') and filtros['is_remote'] != 'Todos':
+                conditions.append("is_remote = ?")
+                params.append(filtros['is_remote'])
+            
+            # Filtro por horário flexível (indicador gravado junto com a vaga)
+            if filtros.get('horario_flexivel') and filtros['horario_flexivel'] != 'Todos':
+                conditions.append("horario_flexivel = ?")
+                params.append(1 if filtros['horario_flexivel'] == 'True' else 0)
+            
+            # Filtro por faixa salarial (usa o índice de salario_mensal_brl)
+            if filtros.get('faixa_salarial'):
+                conditions.append("salario_mensal_brl BETWEEN ? AND ?")
+                params.extend(filtros['faixa_salarial'])
+            
+            # Filtro por estados (múltipla seleção)
+            if filtros.get('estados'):
+                conditions.append(f"({' OR '.join(['localizacao LIKE ?'] * len(filtros['estados']))})")
+                params.extend(f"%{estado}%" for estado in filtros['estados'])
+            
+            # Filtro por cidades (múltipla seleção)
+            if filtros.get('cidades'):
+                conditions.append(f"({' OR '.join(['localizacao LIKE ?'] * len(filtros['cidades']))})")
+                params.extend(f"%{cidade}%" for cidade in filtros['cidades'])
+        
+        return conditions, params
+    
+    def atualizar_rollups(self, tamanho_lote=50000):
+        """Recalcula o rollup diário a partir do último dia consolidado (ou de todo o banco, na primeira vez).
+        O último dia é sempre refeito, então vagas gravadas depois da última atualização entram na contagem."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT MAX(dia) FROM rollup_diario")
+        ultimo_dia = cursor.fetchone()[0]
+        desde = int(pd.Timestamp(ultimo_dia, tz='UTC').timestamp()) if ultimo_dia else 0
+        
+        contagens = {}
+        lotes = pd.read_sql_query('''
+            SELECT coletada_em, site_origem, keyword_busca, job_type, localizacao, estado
+            FROM vagas WHERE coletada_em >= ?
+        ''', conn, params=[desde], chunksize=tamanho_lote)
+        for lote in lotes:
+            dias = pd.to_datetime(lote['coletada_em'], unit='s', utc=True).dt.strftime('%Y-%m-%d')
+            # UF da localização ("São Paulo, SP - Brasil"); senão, o estado da busca
+            uf = lote['localizacao'].str.extract(r",\s*([A-Z]{2})\b", expand=False)
+            dimensoes = {
+                'total': pd.Series('Todas', index=lote.index),
+                'site': lote['site_origem'],
+                'keyword': lote['keyword_busca'],
+                'estado': uf.fillna(lote['estado'].replace('', None)),
+                'job_type': lote['job_type']
+            }
+            for dimensao, valores in dimensoes.items():
+                valores = valores.fillna('Não informado').astype(str)
+                for (dia, valor), novas in lote.groupby([dias, valores]).size().items():
+                    chave = (dia, dimensao, valor)
+                    contagens[chave] = contagens.get(chave, 0) + int(novas)
+        
+        if ultimo_dia:
+            cursor.execute("DELETE FROM rollup_diario WHERE dia >= ?", (ultimo_dia,))
+        cursor.executemany(
+            "INSERT INTO rollup_diario (dia, dimensao, valor, novas) VALUES (?, ?, ?, ?)",
+            [(dia, dimensao, valor, novas) for (dia, dimensao, valor), novas in contagens.items()]
+        )
+        
+        conn.commit()
+        conn.close()
+        return len(contagens)
+    
+    def obter_serie_diaria(self, dimensao='total', dias=90, top=8):
+        """Novas vagas por dia nos últimos `dias` dias, para os `top` valores mais frequentes da dimensão"""
+        conn = sqlite3.connect(self.db_path)
+        
+        inicio = pd.Timestamp(agora_epoch() - dias * 86400, unit='s', tz='UTC').strftime('%Y-%m-%d')
+        df = pd.read_sql_query('''
+            SELECT dia, valor, novas
+            FROM rollup_diario
+            WHERE dimensao = ? AND dia >= ?
+              AND valor IN (
+                  SELECT valor FROM rollup_diario
+                  WHERE dimensao = ? AND dia >= ?
+                  GROUP BY valor ORDER BY SUM(novas) DESC LIMIT ?
+              )
+            ORDER BY dia
+        ''', conn, params=[dimensao, inicio, dimensao, inicio, top])
+        
+        conn.close()
+        return df
+    
+    def versao_vagas(self):
+        """Estado da tabela vagas para atualizações incrementais: contadores de alterações (qualquer uma)
+        e de remoções (exclusões e ocultações), e a última seq atribuída (novas vagas sempre recebem uma maior,
+        mesmo depois de excluída a mais recente)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT (SELECT versao FROM contador_alteracoes WHERE tabela = 'vagas'),
+                   (SELECT versao FROM contador_alteracoes WHERE tabela = 'vagas_remocoes'),
+                   (SELECT versao FROM contador_alteracoes WHERE tabela = 'vagas_seq')
+        """)
+        alteracoes, remocoes, ultima_vaga = cursor.fetchone()
+        
+        conn.close()
+        return {'alteracoes': alteracoes, 'remocoes': remocoes, 'ultima_vaga': ultima_vaga}
+    
+    def obter_marca_leitura(self, usuario):
+        """seq da última vaga vista pelo usuário (None na primeira visita)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT ultima_vaga FROM marcas_leitura WHERE usuario = ?", (usuario,))
+        resultado = cursor.fetchone()
+        
+        conn.close()
+        return resultado[0] if resultado else None
+    
+    def registrar_leitura(self, usuario, ultima_vaga):
+        """Avança a marca de leitura do usuário (nunca volta para uma vaga anterior)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT INTO marcas_leitura (usuario, ultima_vaga, atualizada_em) VALUES (?, ?, ?)
+            ON CONFLICT(usuario) DO UPDATE SET
+                ultima_vaga = MAX(ultima_vaga, excluded.ultima_vaga),
+                atualizada_em = excluded.atualizada_em
+        """, (usuario, ultima_vaga, agora_epoch()))
+        
+        conn.commit()
+        conn.close()
+    
+    def obter_faixa_salarios(self):
+        """Menor e maior salário mensal (R$) cadastrados, ou None se nenhuma vaga tiver salário"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT MIN(salario_mensal_brl), MAX(salario_mensal_brl) FROM vagas")
+        minimo, maximo = cursor.fetchone()
+        
+        conn.close()
+        return (minimo, maximo) if minimo is not None else None
+    
+    def obter_distribuicao_salarios(self, largura_faixa=1000):
+        """Histograma do salário mensal já agregado no SQLite: uma linha por faixa com a quantidade de vagas"""
+        conn = sqlite3.connect(self.db_path)
+        
+        df = pd.read_sql_query('''
+            SELECT CAST(salario_mensal_brl / ? AS INTEGER) * ? AS faixa, COUNT(*) AS quantidade
+            FROM vagas
+            WHERE salario_mensal_brl IS NOT NULL
+            GROUP BY faixa
+            ORDER BY faixa
+        ''', conn, params=[largura_faixa, largura_faixa])
+        
+        conn.close()
+        return df
+    
+    def obter_descricao(self, vaga_id):
+        """Obtém a descrição completa de uma vaga (ou None se não houver)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT conteudo FROM descricoes WHERE vaga_id = ?", (vaga_id,))
+        resultado = cursor.fetchone()
+        
+        conn.close()
+        return self.descomprimir_descricao(resultado[0]) if resultado else None
+    
+    def gravar_vagas_similares(self, similares):
+        """Substitui as vizinhas das vagas: {vaga_id: [(similar_id, similaridade), ...]} em ordem decrescente"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.executemany("DELETE FROM vagas_similares WHERE vaga_id = ?", [(vaga_id,) for vaga_id in similares])
+        cursor.executemany(
+            "INSERT INTO vagas_similares (vaga_id, posicao, similar_id, similaridade) VALUES (?, ?, ?, ?)",
+            [(vaga_id, posicao, similar_id, similaridade)
+             for vaga_id, vizinhas in similares.items()
+             for posicao, (similar_id, similaridade) in enumerate(vizinhas)]
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    def obter_vagas_similares(self, vaga_id, limite=5):
+        """Vagas mais parecidas com a indicada (já calculadas), sem as ocultas e sem as duplicatas dela"""
+        conn = sqlite3.connect(self.db_path)
+        
+        df = pd.read_sql_query('''
+            SELECT v.id, v.titulo, v.empresa, v.localizacao, v.site_origem, v.link, s.similaridade
+            FROM vagas_similares s JOIN vagas v ON v.id = s.similar_id
+            WHERE s.vaga_id = ?
+              AND v.oculta = 0
+              AND COALESCE(v.cluster_id, v.id) != (SELECT COALESCE(cluster_id, id) FROM vagas WHERE id = ?)
+            ORDER BY s.posicao
+            LIMIT ?
+        ''', conn, params=[vaga_id, vaga_id, limite])
+        
+        conn.close()
+        return df
+    
+    def remover_vagas(self, vaga_ids=None):
+        """Remove as vagas indicadas (ou todas) junto com suas descrições"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        self._remover(cursor, vaga_ids)
+        
+        conn.commit()
+        conn.close()
+    
+    def _remover(self, cursor, vaga_ids=None):
+        if vaga_ids is None:
+            cursor.execute("DELETE FROM vagas")
+            cursor.execute("DELETE FROM descricoes")
+            cursor.execute("DELETE FROM vagas_similares")
+            self.detector.remover(cursor)
+        else:
+            vaga_ids = list(vaga_ids)
+            cursor.executemany("DELETE FROM vagas WHERE id = ?", [(vaga_id,) for vaga_id in vaga_ids])
+            cursor.executemany("DELETE FROM descricoes WHERE vaga_id = ?", [(vaga_id,) for vaga_id in vaga_ids])
+            cursor.executemany("DELETE FROM vagas_similares WHERE vaga_id = ?", [(vaga_id,) for vaga_id in vaga_ids])
+            self.detector.remover(cursor, vaga_ids)
+    
+    def excluir_vagas(self, vaga_ids):
+        """Exclui as vagas (uma transação) e grava tombstones para que não voltem nos próximos scrapings"""
+        vaga_ids = list(vaga_ids)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # Título, empresa e link vão para o tombstone para que o ID possa ser recalculado em migrações
+        dados = {}
+        for inicio in range(0, len(vaga_ids), 500):
+            lote = vaga_ids[inicio:inicio + 500]
+            cursor.execute(f"SELECT id, titulo, empresa, link FROM vagas WHERE id IN ({','.join('?' * len(lote))})",
+                           lote)
+            dados.update((linha[0], linha[1:]) for linha in cursor.fetchall())
+        
+        self._remover(cursor, vaga_ids)
+        agora = agora_epoch()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO vagas_removidas (vaga_id, removida_em, titulo, empresa, link)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(vaga_id, agora) + dados.get(vaga_id, (None, None, None)) for vaga_id in vaga_ids])
+        
+        conn.commit()
+        conn.close()
+        return len(vaga_ids)
+    
+    def ocultar_vagas(self, vaga_ids, oculta=True):
+        """Oculta (ou volta a exibir) as vagas nas listagens, em uma transação"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany("UPDATE vagas SET oculta = ? WHERE id = ?",
+                           [(1 if oculta else 0, vaga_id) for vaga_id in vaga_ids])
+        alteradas = cursor.rowcount
+        
+        conn.commit()
+        conn.close()
+        return alteradas
+    
+    def liberar_espaco(self, paginas=None):
+        """Devolve ao disco as páginas livres (todas ou até `paginas`); retorna quantas foram liberadas"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("PRAGMA freelist_count")
+        livres_antes = cursor.fetchone()[0]
+        # executescript roda o PRAGMA até o fim (cada passo libera uma única página)
+        cursor.executescript(f"PRAGMA incremental_vacuum({int(paginas or 0)});")
+        cursor.execute("PRAGMA freelist_count")
+        livres_depois = cursor.fetchone()[0]
+        
+        conn.close()
+        return livres_antes - livres_depois
+    
     def obter_estatisticas(self):
-        """Obtém estatísticas das vagas"""
+        """Obtém estatísticas das vagas (sem as ocultas, como nas listagens)"""
         conn = sqlite3.connect(self.db_path)
         
         # Total de vagas
-        total_vagas = pd.read_sql_query("SELECT COUNT(*) as total FROM vagas", conn).iloc[0]['total']
+        total_vagas = pd.read_sql_query("SELECT COUNT(*) as total FROM vagas WHERE oculta = 0", conn).iloc[0]['total']
+        
+        # Vagas únicas (duplicatas entre sites contam uma vez)
+        vagas_unicas = pd.read_sql_query(
+            "SELECT COUNT(DISTINCT COALESCE(cluster_id, id)) as total FROM vagas WHERE oculta = 0", conn
+        ).iloc[0]['total']
         
         # Vagas por keyword
         vagas_por_keyword = pd.read_sql_query('''
             SELECT keyword_busca, COUNT(*) as quantidade 
             FROM vagas 
+            WHERE oculta = 0
             GROUP BY keyword_busca
         ''', conn)
         
         # Vagas por empresa
         vagas_por_empresa = pd.read_sql_query('''
-            SELECT empresa, COUNT(*) as quantidade 
-            FROM vagas 
-            GROUP BY empresa 
-            ORDER BY quantidade DESC 
-            LIMIT 10
+            SELECT COALESCE(e.nome, 'Não informado') AS empresa, c.quantidade
+            FROM (
+                SELECT empresa_id, COUNT(*) AS quantidade
+                FROM vagas
+                WHERE oculta = 0
+                GROUP BY empresa_id
+                ORDER BY quantidade DESC
+                LIMIT 10
+            ) c LEFT JOIN empresas e ON e.id = c.empresa_id
+            ORDER BY c.quantidade DESC
         ''', conn)
         
         # Vagas por site
         vagas_por_site = pd.read_sql_query('''
             SELECT site_origem, COUNT(*) as quantidade 
             FROM vagas 
+            WHERE oculta = 0
             GROUP BY site_origem 
             ORDER BY quantidade DESC
         ''', conn)
@@ -203,26 +1145,96 @@ class DatabaseManager:
         vagas_por_estado = pd.read_sql_query('''
             SELECT estado, COUNT(*) as quantidade 
             FROM vagas 
-            WHERE estado IS NOT NULL AND estado != 'Não informado'
+            WHERE oculta = 0 AND estado IS NOT NULL AND estado != 'Não informado'
             GROUP BY estado 
             ORDER BY quantidade DESC
         ''', conn)
         
         # Vagas das últimas 24 horas
-        data_limite = datetime.now() - timedelta(hours=24)
         vagas_24h = pd.read_sql_query('''
             SELECT COUNT(*) as total_24h 
             FROM vagas 
-            WHERE data_coleta >= ?
-        ''', conn, params=[data_limite.strftime('%Y-%m-%d %H:%M:%S')]).iloc[0]['total_24h']
+            WHERE oculta = 0 AND coletada_em >= ?
+        ''', conn, params=[agora_epoch() - 24 * 3600]).iloc[0]['total_24h']
         
         conn.close()
         
         return {
             'total_vagas': total_vagas,
+            'vagas_unicas': vagas_unicas,
             'vagas_24h': vagas_24h,
             'vagas_por_keyword': vagas_por_keyword,
             'vagas_por_empresa': vagas_por_empresa,
             'vagas_por_site': vagas_por_site,
             'vagas_por_estado': vagas_por_estado
         }
+    
+    def obter_agendamentos(self):
+        """Obtém as próximas execuções persistidas do scheduler ({nome: (proxima, ultima)})"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT nome, proxima_execucao, ultima_execucao FROM agendamentos")
+        agendamentos = {nome: (proxima, ultima) for nome, proxima, ultima in cursor.fetchall()}
+        
+        conn.close()
+        return agendamentos
+    
+    def salvar_agendamento(self, nome, proxima_execucao, ultima_execucao=None):
+        """Persiste a próxima execução (epoch em segundos) de um job do scheduler"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO agendamentos (nome, proxima_execucao, ultima_execucao)
+            VALUES (?, ?, ?)
+            ON CONFLICT(nome) DO UPDATE SET
+                proxima_execucao = excluded.proxima_execucao,
+                ultima_execucao = COALESCE(excluded.ultima_execucao, agendamentos.ultima_execucao)
+        ''', (nome, proxima_execucao, ultima_execucao))
+        
+        conn.commit()
+        conn.close()
+    
+    def registrar_execucao_scraping(self, termo, site, inicio, fim, total_encontradas, novas_vagas, erro=None):
+        """Registra uma execução de scraping de (termo, site) no histórico"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO execucoes_scraping (termo, site, inicio, fim, total_encontradas, novas_vagas, erro)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (termo, site, inicio, fim, total_encontradas, novas_vagas, erro))
+        
+        conn.commit()
+        conn.close()
+    
+    def obter_historico_execucoes(self, termo, site, limite=20):
+        """Obtém as últimas execuções bem-sucedidas de (termo, site), da mais antiga para a mais recente"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT inicio, novas_vagas FROM execucoes_scraping
+            WHERE termo = ? AND site = ? AND erro IS NULL
+            ORDER BY inicio DESC
+            LIMIT ?
+        ''', (termo, site, limite))
+        historico = cursor.fetchall()[::-1]
+        
+        conn.close()
+        return historico
+    
+    def contar_execucoes_scraping(self, site, desde):
+        """(execuções, execuções com erro) de um site a partir de um instante (epoch)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT COUNT(*), COUNT(erro) FROM execucoes_scraping
+            WHERE site = ? AND inicio >= ?
+        ''', (site, desde))
+        resultado = cursor.fetchone()
+        
+        conn.close()
+        return resultado
@@ -0,0 +1,101 @@
+"""
+Conversão das datas das vagas para epoch em segundos (UTC):
+datas absolutas (ISO, dd/mm/aaaa, datetime/Timestamp) e relativas ("há 2 horas", "3 days ago", "ontem").
+"""
+
+import re
+import time
+import numbers
+from datetime import datetime, date, timezone
+from dateutil import parser as dateutil_parser
+
+# Unidade -> segundos (português e inglês, singular e plural)
+UNIDADES_SEGUNDOS = {
+    'segundo': 1, 'second': 1, 'sec': 1,
+    'minuto': 60, 'minute': 60, 'min': 60,
+    'hora': 3600, 'hour': 3600, 'hr': 3600, 'h': 3600,
+    'dia': 86400, 'day': 86400, 'd': 86400,
+    'semana': 7 * 86400, 'week': 7 * 86400, 'sem': 7 * 86400, 'w': 7 * 86400,
+    'mes': 30 * 86400, 'mês': 30 * 86400, 'meses': 30 * 86400, 'month': 30 * 86400, 'mo': 30 * 86400,
+    'ano': 365 * 86400, 'year': 365 * 86400, 'yr': 365 * 86400
+}
+
+EXPRESSOES_FIXAS = {
+    'agora': 0, 'agora mesmo': 0, 'just now': 0, 'now': 0,
+    'hoje': 0, 'today': 0,
+    'ontem': 86400, 'yesterday': 86400
+}
+
+VALORES_VAZIOS = {'', 'nan', 'nat', 'none', 'null', 'não informado', 'nao informado', 'n/a'}
+
+_PADRAO_RELATIVO = re.compile(r"(\d+)\+?\s*([a-zêç]+)")
+# "posted today", "publicada ontem": a expressão fixa dentro de um texto maior (as mais longas primeiro)
+_PADRAO_FIXO = re.compile(r"\b(" + "|".join(sorted(map(re.escape, EXPRESSOES_FIXAS), key=len, reverse=True)) + r")\b")
+
+def agora_epoch():
+    """Epoch atual em segundos inteiros"""
+    return int(time.time())
+
+def _para_epoch(valor):
+    """datetime/date -> epoch; datas sem fuso são tratadas como UTC"""
+    if isinstance(valor, datetime):
+        if valor.tzinfo is None:
+            valor = valor.replace(tzinfo=timezone.utc)
+        return int(valor.timestamp())
+    return int(datetime(valor.year, valor.month, valor.day, tzinfo=timezone.utc).timestamp())
+
+def _parsear_relativa(texto, referencia):
+    if texto in EXPRESSOES_FIXAS:
+        return referencia - EXPRESSOES_FIXAS[texto]
+    
+    busca = _PADRAO_RELATIVO.search(texto)
+    if not busca:
+        fixa = _PADRAO_FIXO.search(texto)
+        return referencia - EXPRESSOES_FIXAS[fixa.group(1)] if fixa else None
+    quantidade, unidade = int(busca.group(1)), busca.group(2)
+    for nome in (unidade, unidade.rstrip('s'), unidade[:-2] if unidade.endswith('es') else unidade):
+        if nome in UNIDADES_SEGUNDOS:
+            return referencia - quantidade * UNIDADES_SEGUNDOS[nome]
+    return None
+
+def parsear_data(valor, referencia=None):
+    """Converte uma data absoluta ou relativa em epoch (UTC); None se não for reconhecida.
+    `referencia` é o epoch usado como "agora" para datas relativas."""
+    if valor is None:
+        return None
+    if hasattr(valor, 'to_pydatetime'):  # pandas.Timestamp
+        if valor != valor:  # NaT
+            return None
+        valor = valor.to_pydatetime()
+    if isinstance(valor, (datetime, date)):
+        return _para_epoch(valor)
+    if isinstance(valor, numbers.Real):  # Inclui os inteiros e floats do NumPy
+        return int(valor) if valor == valor else None
+    
+    texto = " ".join(str(valor).strip().lower().split())
+    if texto in VALORES_VAZIOS:
+        return None
+    referencia = agora_epoch() if referencia is None else int(referencia)
+    
+    # Relativas: "há 2 horas", "publicada há 3 dias", "reposted 2 weeks ago", "30+ days ago"
+    if texto.startswith(('há ', 'ha ', 'publicad', 'anunciad', 'reposted', 'posted')) or texto.endswith(' ago') \
+            or texto in EXPRESSOES_FIXAS:
+        return _parsear_relativa(texto, referencia)
+    
+    # Absolutas: ISO primeiro, depois formatos brasileiros (dia primeiro)
+    try:
+        return _para_epoch(datetime.fromisoformat(texto.upper().replace('Z', '+00:00')))
+    except ValueError:
+        pass
+    try:
+        return _para_epoch(dateutil_parser.parse(texto, dayfirst=True))
+    except (ValueError, OverflowError):
+        return None
+
+def formatar_epoch(epoch, formato='%Y-%m-%d %H:%M:%S', utc=False):
+    """Epoch -> texto no fuso local (ou em UTC, para datas sem horário)"""
+    if epoch is None or epoch != epoch:
+        return 'Não informado'
+    if utc:
+        return datetime.fromtimestamp(int(epoch), timezone.utc).strftime(formato)
+    return datetime.fromtimestamp(int(epoch)).strftime(formato)
@@ -0,0 +1,130 @@
+"""
+Detecção de vagas quase duplicadas entre sites (LinkedIn, Indeed, Google...):
+assinaturas MinHash sobre shingles de título + empresa + descrição normalizados,
+com índice LSH persistido no SQLite para buscar candidatas sem comparar todos os pares.
+"""
+
+import re
+import zlib
+import unicodedata
+import numpy as np
+
+# 128 permutações em 16 bandas de 8 linhas: similaridade de corte do LSH ~0.71
+NUM_PERMUTACOES = 128
+NUM_BANDAS = 16
+LIMIAR_SIMILARIDADE = 0.8
+LIMIAR_TITULO = 0.6  # Evita agrupar vagas diferentes que só compartilham o texto institucional da empresa
+TAMANHO_SHINGLE = 3
+
+_PRIMO = (1 << 31) - 1  # (a * x + b) cabe em int64 com hashes de 32 bits
+
+def normalizar_texto(texto):
+    """Minúsculas, sem acentos e sem pontuação"""
+    texto = unicodedata.normalize('NFKD', str(texto).lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", texto))
+
+def gerar_shingles(titulo, empresa, descricao=None):
+    """Shingles de palavras do texto normalizado da vaga"""
+    palavras = normalizar_texto(f"{titulo} {empresa} {descricao or ''}").split()
+    if len(palavras) < TAMANHO_SHINGLE:
+        return {" ".join(palavras)} if palavras else set()
+    return {" ".join(palavras[i:i + TAMANHO_SHINGLE]) for i in range(len(palavras) - TAMANHO_SHINGLE + 1)}
+
+def similaridade_titulos(titulo_a, titulo_b):
+    """Jaccard entre as palavras dos títulos normalizados"""
+    palavras_a = set(normalizar_texto(titulo_a).split())
+    palavras_b = set(normalizar_texto(titulo_b).split())
+    if not palavras_a or not palavras_b:
+        return 0.0
+    return len(palavras_a & palavras_b) / len(palavras_a | palavras_b)
+
+class DetectorDuplicatas:
+    def __init__(self, num_permutacoes=NUM_PERMUTACOES, num_bandas=NUM_BANDAS,
+                 limiar=LIMIAR_SIMILARIDADE, limiar_titulo=LIMIAR_TITULO, semente=1):
+        if num_permutacoes % num_bandas:
+            raise ValueError("num_permutacoes deve ser múltiplo de num_bandas")
+        self.num_permutacoes = num_permutacoes
+        self.num_bandas = num_bandas
+        self.linhas_por_banda = num_permutacoes // num_bandas
+        self.limiar = limiar
+        self.limiar_titulo = limiar_titulo
+        
+        # Coeficientes fixos: assinaturas gravadas no banco continuam comparáveis
+        gerador = np.random.RandomState(semente)
+        self.a = gerador.randint(1, _PRIMO, size=num_permutacoes, dtype=np.int64)
+        self.b = gerador.randint(0, _PRIMO, size=num_permutacoes, dtype=np.int64)
+    
+    def criar_tabelas(self, cursor):
+        """Tabelas do índice LSH"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS minhash_vagas (
+                vaga_id TEXT PRIMARY KEY,
+                assinatura BLOB NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                chave INTEGER NOT NULL,
+                vaga_id TEXT NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_chave ON lsh_buckets (chave)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_vaga ON lsh_buckets (vaga_id)")
+    
+    def calcular_assinatura(self, shingles):
+        """Assinatura MinHash (vetor int64) de um conjunto de shingles"""
+        if not shingles:
+            return np.full(self.num_permutacoes, _PRIMO, dtype=np.int64)
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) & 0x7FFFFFFF for s in shingles),
+                             dtype=np.int64, count=len(shingles))
+        return ((np.outer(hashes, self.a) + self.b) % _PRIMO).min(axis=0)
+    
+    def chaves_bandas(self, assinatura):
+        """Uma chave inteira por banda (banda + valores da banda)"""
+        chaves = []
+        for banda in range(self.num_bandas):
+            trecho = assinatura[banda * self.linhas_por_banda:(banda + 1) * self.linhas_por_banda]
+            digest = zlib.crc32(trecho.tobytes(), banda)
+            chaves.append((banda << 32) | digest)
+        return chaves
+    
+    def similaridade(self, assinatura_a, assinatura_b):
+        """Similaridade de Jaccard estimada entre duas assinaturas"""
+        return float(np.mean(assinatura_a == assinatura_b))
+    
+    def atribuir_cluster(self, cursor, vaga_id, titulo, empresa, descricao=None):
+        """Indexa uma vaga recém-inserida e retorna o cluster_id (o da duplicata mais parecida, ou o próprio ID)"""
+        assinatura = self.calcular_assinatura(gerar_shingles(titulo, empresa, descricao))
+        chaves = self.chaves_bandas(assinatura)
+        
+        placeholders = ", ".join("?" for _ in chaves)
+        cursor.execute(f'''
+            SELECT m.vaga_id, m.assinatura, v.cluster_id, v.titulo
+            FROM minhash_vagas m JOIN vagas v ON v.id = m.vaga_id
+            WHERE m.vaga_id IN (SELECT vaga_id FROM lsh_buckets WHERE chave IN ({placeholders}))
+              AND m.vaga_id != ?
+        ''', chaves + [vaga_id])
+        
+        cluster_id, melhor = vaga_id, self.limiar
+        for candidata_id, assinatura_candidata, cluster_candidata, titulo_candidata in cursor.fetchall():
+            similaridade = self.similaridade(assinatura, np.frombuffer(assinatura_candidata, dtype=np.int64))
+            if similaridade >= melhor and similaridade_titulos(titulo, titulo_candidata) >= self.limiar_titulo:
+                cluster_id, melhor = cluster_candidata or candidata_id, similaridade
+        
+        cursor.execute("INSERT OR REPLACE INTO minhash_vagas (vaga_id, assinatura) VALUES (?, ?)",
+                       (vaga_id, assinatura.tobytes()))
+        cursor.executemany("INSERT INTO lsh_buckets (chave, vaga_id) VALUES (?, ?)",
+                           [(chave, vaga_id) for chave in chaves])
+        cursor.execute("UPDATE vagas SET cluster_id = ? WHERE id = ?", (cluster_id, vaga_id))
+        return cluster_id
+    
+    def remover(self, cursor, vaga_ids=None):
+        """Remove vagas do índice (todas, se vaga_ids for None)"""
+        if vaga_ids is None:
+            cursor.execute("DELETE FROM minhash_vagas")
+            cursor.execute("DELETE FROM lsh_buckets")
+            return
+        parametros = [(vaga_id,) for vaga_id in vaga_ids]
+        cursor.executemany("DELETE FROM minhash_vagas WHERE vaga_id = ?", parametros)
+        cursor.executemany("DELETE FROM lsh_buckets WHERE vaga_id = ?", parametros)
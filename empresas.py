@@ -0,0 +1,159 @@
+"""
+Resolução de entidades das empresas: "Itaú Unibanco", "Itau Unibanco S.A." e "ITAÚ" viram o mesmo empresa_id.
+O nome é reduzido a uma chave (minúsculas, sem acentos, sem sufixos societários) e comparado com as chaves
+conhecidas por prefixo de palavras (só quando uma única empresa é compatível com todas as suas grafias) e por
+semelhança de texto palavra a palavra; cada nome já visto fica na tabela de aliases e num cache em memória,
+então só nomes inéditos passam pela comparação.
+"""
+
+import re
+import difflib
+import threading
+from deduplicacao import normalizar_texto
+
+# Sufixos societários removidos do fim da chave (já sem pontuação: "S.A." e "S/A" viram "s a")
+_PADRAO_SUFIXOS = re.compile(
+    r"(?:\s+(?:s a s|s a|sa|sas|ltda|limitada|me|epp|eireli|cia|inc|llc|ltd|corp|corporation|co|gmbh|plc))+$"
+)
+
+# Nomes genéricos demais para absorver outras empresas pelo prefixo ("Banco" não é "Banco Inter")
+PALAVRAS_GENERICAS = frozenset({
+    'banco', 'grupo', 'instituto', 'universidade', 'faculdade', 'escola', 'hospital', 'consultoria',
+    'agencia', 'companhia', 'empresa', 'industria', 'prefeitura', 'governo', 'nao informado', 'confidencial'
+})
+
+TAMANHO_MINIMO_PREFIXO = 4  # Chaves menores que isso só casam por igualdade
+LIMIAR_SEMELHANCA = 0.9  # Razão do difflib para aceitar variações de grafia ("Itau Unibaco")
+LIMIAR_SEMELHANCA_PALAVRA = 0.8  # Mínimo em cada palavra: "Tech Solutions A" e "Tech Solutions B" são outras empresas
+TAMANHO_BLOCO = 3  # Só são comparadas as chaves que começam com as mesmas letras
+
+def chave_empresa(nome):
+    """Chave de comparação: minúsculas, sem acentos, sem pontuação e sem sufixos societários"""
+    chave = normalizar_texto(nome or "")
+    sem_sufixos = _PADRAO_SUFIXOS.sub("", chave)
+    return sem_sufixos or chave
+
+def _compativeis(chave_a, chave_b):
+    """Uma chave é igual ou o começo (em palavras inteiras) da outra: "itau" e "itau unibanco" """
+    curta, longa = sorted((chave_a.split(), chave_b.split()), key=len)
+    return longa[:len(curta)] == curta
+
+def _casa_por_prefixo(chave_a, chave_b):
+    """Prefixo em palavras inteiras com uma parte comum que identifica a empresa (não "banco" nem "grupo")"""
+    texto_curto = min(chave_a, chave_b, key=lambda chave: len(chave.split()))
+    return (len(texto_curto) >= TAMANHO_MINIMO_PREFIXO and texto_curto not in PALAVRAS_GENERICAS
+            and _compativeis(chave_a, chave_b))
+
+def _grafias_parecidas(chave_a, chave_b):
+    """Variação de grafia, não outra empresa: as palavras se correspondem uma a uma ("itau unibaco"),
+    ou só mudam os espaços ("mercadolivre" e "mercado livre")"""
+    palavras_a, palavras_b = chave_a.split(), chave_b.split()
+    if len(palavras_a) != len(palavras_b):
+        return "".join(palavras_a) == "".join(palavras_b)
+    return all(palavra_a == palavra_b
+               or difflib.SequenceMatcher(None, palavra_a, palavra_b).ratio() >= LIMIAR_SEMELHANCA_PALAVRA
+               for palavra_a, palavra_b in zip(palavras_a, palavras_b))
+
+class ResolvedorEmpresas:
+    def __init__(self, limiar=LIMIAR_SEMELHANCA):
+        self.limiar = limiar
+        self._lock = threading.Lock()
+        self._carregado = False
+        self._por_alias = {}  # nome como veio do site -> empresa_id
+        self._por_chave = {}  # chave -> empresa_id
+        self._blocos = {}  # primeiras letras da chave -> chaves conhecidas
+        self._chaves_por_empresa = {}  # empresa_id -> chaves conhecidas da empresa
+    
+    def criar_tabelas(self, cursor):
+        """Empresas canônicas e os nomes (aliases) já resolvidos para cada uma"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS empresas (
+                id INTEGER PRIMARY KEY,
+                nome TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS empresas_aliases (
+                alias TEXT PRIMARY KEY,
+                empresa_id INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+    
+    def invalidar(self):
+        """Descarta o cache (após um rollback, as empresas criadas na transação deixam de existir)"""
+        with self._lock:
+            self._carregado = False
+            self._por_alias, self._por_chave, self._blocos, self._chaves_por_empresa = {}, {}, {}, {}
+    
+    def _registrar_chave(self, chave, empresa_id):
+        if chave not in self._por_chave:
+            self._por_chave[chave] = empresa_id
+            self._blocos.setdefault(chave[:TAMANHO_BLOCO], []).append(chave)
+            self._chaves_por_empresa.setdefault(empresa_id, []).append(chave)
+    
+    def _carregar(self, cursor):
+        cursor.execute("SELECT alias, empresa_id FROM empresas_aliases")
+        for alias, empresa_id in cursor.fetchall():
+            self._por_alias[alias] = empresa_id
+            self._registrar_chave(chave_empresa(alias), empresa_id)
+        self._carregado = True
+    
+    def _buscar_semelhante(self, chave):
+        """empresa_id da chave conhecida equivalente (prefixo sem ambiguidade, depois grafia parecida) ou None"""
+        candidatas = self._blocos.get(chave[:TAMANHO_BLOCO], [])
+        
+        # Pelo prefixo só entra numa empresa compatível com todas as grafias dela, e se for a única:
+        # com "porto" e "porto seguro" já juntos, "porto digital" não casa; "caixa" não escolhe entre
+        # "caixa seguradora" e "caixa economica federal"
+        por_prefixo = {self._por_chave[candidata] for candidata in candidatas if _casa_por_prefixo(chave, candidata)}
+        compativeis = [empresa_id for empresa_id in por_prefixo
+                       if all(_compativeis(chave, outra) for outra in self._chaves_por_empresa[empresa_id])]
+        if len(compativeis) == 1:
+            return compativeis[0]
+        
+        parecidas = [candidata for candidata in difflib.get_close_matches(chave, candidatas, n=3, cutoff=self.limiar)
+                     if _grafias_parecidas(chave, candidata)]
+        return self._por_chave[parecidas[0]] if parecidas else None
+    
+    def _identificar(self, cursor, nome):
+        if not self._carregado:
+            self._carregar(cursor)
+        if nome in self._por_alias:
+            return self._por_alias[nome]
+        
+        # Outro processo (dashboard ou scheduler) pode ter resolvido o nome depois da carga do cache
+        cursor.execute("SELECT empresa_id FROM empresas_aliases WHERE alias = ?", (nome,))
+        linha = cursor.fetchone()
+        if linha:
+            return linha[0]
+        chave = chave_empresa(nome)
+        return self._por_chave.get(chave) or self._buscar_semelhante(chave)
+    
+    def identificar(self, cursor, nome):
+        """empresa_id de qualquer grafia do nome, sem criar empresas (None se nenhuma empresa equivale)"""
+        with self._lock:
+            return self._identificar(cursor, nome or "Não informado")
+    
+    def resolver(self, cursor, nome):
+        """empresa_id do nome, criando a empresa se ela ainda não existir"""
+        nome = nome or "Não informado"  # O alias é o texto exato gravado em vagas.empresa
+        with self._lock:
+            empresa_id = self._identificar(cursor, nome)
+            if nome in self._por_alias:
+                return empresa_id
+            
+            if empresa_id is None:
+                cursor.execute("INSERT INTO empresas (nome) VALUES (?)", (nome.strip() or nome,))
+                empresa_id = cursor.lastrowid
+            cursor.execute("INSERT OR IGNORE INTO empresas_aliases (alias, empresa_id) VALUES (?, ?)",
+                           (nome, empresa_id))
+            
+            self._por_alias[nome] = empresa_id
+            self._registrar_chave(chave_empresa(nome), empresa_id)
+            return empresa_id
+    
+    def atribuir_empresa(self, cursor, vaga_id, nome):
+        """Resolve a empresa de uma vaga recém-inserida e grava o empresa_id"""
+        empresa_id = self.resolver(cursor, nome)
+        cursor.execute("UPDATE vagas SET empresa_id = ? WHERE id = ?", (empresa_id, vaga_id))
+        return empresa_id
@@ -0,0 +1,210 @@
+"""
+Exportação das vagas em streaming:
+o resultado dos filtros (ou o banco inteiro) é lido em lotes com read_sql_query(chunksize=...) e gravado
+direto em disco como CSV, JSON Lines ou Parquet, sem montar o resultado completo em memória.
+
+Uso: python exportacao.py vagas.parquet --formato parquet --horas 24 --site linkedin
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import logging
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from database import DatabaseManager
+from datas import formatar_epoch
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# formato -> (extensão, tipo MIME)
+FORMATOS = {
+    'csv': ('.csv', 'text/csv'),
+    'jsonl': ('.jsonl', 'application/x-ndjson'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet')
+}
+
+# Exportações do dashboard ficam em um diretório próprio; arquivos antigos são apagados a cada nova exportação
+DIRETORIO_EXPORTACOES = os.path.join(tempfile.gettempdir(), "searchvagas_exportacoes")
+IDADE_MAXIMA_EXPORTACAO = 3600  # Segundos (exportações mais novas podem ser de outra sessão ainda baixando)
+
+# Colunas exportadas e seus tipos no Parquet (fixos, para todos os lotes terem o mesmo esquema)
+COLUNAS_EXPORTACAO = {
+    'id': pa.string(),
+    'titulo': pa.string(),
+    'empresa': pa.string(),
+    'localizacao': pa.string(),
+    'area_vaga': pa.string(),
+    'descricao_resumo': pa.string(),
+    'horario_flexivel': pa.int64(),
+    'link': pa.string(),
+    'site_job_id': pa.string(),
+    'canonical_url': pa.string(),
+    'data_postagem': pa.string(),
+    'postada_em': pa.int64(),
+    'coletada_em': pa.int64(),
+    'numero_candidatos': pa.string(),
+    'site_origem': pa.string(),
+    'job_type': pa.string(),
+    'is_remote': pa.string(),
+    'salary_info': pa.string(),
+    'salary_min': pa.float64(),
+    'salary_max': pa.float64(),
+    'salary_interval': pa.string(),
+    'salario_mensal_brl': pa.float64(),
+    'keyword_busca': pa.string(),
+    'estado': pa.string(),
+    'local_busca': pa.string()
+}
+
+class _EscritorCSV:
+    def __init__(self, destino):
+        self.arquivo = open(destino, 'w', encoding='utf-8', newline='')
+        self.cabecalho = True
+    
+    def gravar(self, lote):
+        lote.to_csv(self.arquivo, index=False, header=self.cabecalho)
+        self.cabecalho = False
+    
+    def fechar(self):
+        self.arquivo.close()
+
+class _EscritorJSONL:
+    def __init__(self, destino):
+        self.arquivo = open(destino, 'w', encoding='utf-8')
+    
+    def gravar(self, lote):
+        self.arquivo.write(lote.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n')
+    
+    def fechar(self):
+        self.arquivo.close()
+
+class _EscritorParquet:
+    def __init__(self, destino, esquema):
+        self.esquema = esquema
+        self.escritor = pq.ParquetWriter(destino, esquema, compression='zstd')
+    
+    def gravar(self, lote):
+        # Cada lote vira um row group
+        self.escritor.write_table(pa.Table.from_pandas(lote, schema=self.esquema, preserve_index=False))
+    
+    def fechar(self):
+        self.escritor.close()
+
+def _criar_escritor(formato, destino, incluir_descricao):
+    if formato == 'csv':
+        return _EscritorCSV(destino)
+    if formato == 'jsonl':
+        return _EscritorJSONL(destino)
+    if formato == 'parquet':
+        campos = list(COLUNAS_EXPORTACAO.items()) + [('data_coleta', pa.string())]
+        if incluir_descricao:
+            campos.append(('descricao', pa.string()))
+        return _EscritorParquet(destino, pa.schema(campos))
+    raise ValueError(f"Formato de exportação desconhecido: {formato} (use {', '.join(FORMATOS)})")
+
+def exportar_vagas(db, destino, formato='csv', horas_recentes=None, filtros=None,
+                   incluir_descricao=False, tamanho_lote=10000):
+    """Grava em `destino` as vagas que atendem aos filtros (todas, sem filtros); retorna o total exportado"""
+    conditions, params = db.montar_filtros(horas_recentes, filtros)
+    colunas = ", ".join(f"v.{coluna}" for coluna in COLUNAS_EXPORTACAO)
+    query = f"SELECT {colunas}"
+    if incluir_descricao:
+        query += ", d.conteudo AS descricao_comprimida FROM vagas v LEFT JOIN descricoes d ON d.vaga_id = v.id"
+    else:
+        query += " FROM vagas v"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY v.coletada_em DESC"
+    
+    escritor = _criar_escritor(formato, destino, incluir_descricao)
+    conn = sqlite3.connect(db.db_path)
+    total = 0
+    try:
+        for lote in pd.read_sql_query(query, conn, params=params, chunksize=tamanho_lote):
+            lote['data_coleta'] = [formatar_epoch(epoch, '%Y-%m-%dT%H:%M:%SZ', utc=True) for epoch in lote['coletada_em']]
+            if incluir_descricao:
+                lote['descricao'] = [db.descomprimir_descricao(c) if c is not None else None
+                                     for c in lote.pop('descricao_comprimida')]
+            escritor.gravar(lote)
+            total += len(lote)
+    finally:
+        escritor.fechar()
+        conn.close()
+    
+    logger.info(f"💾 {total} vagas exportadas em {formato.upper()} para {destino}")
+    return total
+
+def limpar_exportacoes(diretorio=DIRETORIO_EXPORTACOES, idade_maxima=IDADE_MAXIMA_EXPORTACAO):
+    """Remove as exportações (vagas_*) do diretório com mais de idade_maxima segundos; retorna quantas"""
+    limite = time.time() - idade_maxima
+    removidas = 0
+    for nome in os.listdir(diretorio):
+        caminho = os.path.join(diretorio, nome)
+        try:
+            if nome.startswith("vagas_") and os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+                removidas += 1
+        except OSError:
+            continue  # Removido por outra sessão
+    return removidas
+
+def exportar_para_temporario(db, formato='csv', diretorio=DIRETORIO_EXPORTACOES, **kwargs):
+    """Exporta para um arquivo temporário no diretório de exportações (o chamador remove depois;
+    os esquecidos saem na próxima exportação); retorna (caminho, total)"""
+    extensao, _ = FORMATOS[formato]
+    os.makedirs(diretorio, exist_ok=True)
+    limpar_exportacoes(diretorio)
+    descritor, caminho = tempfile.mkstemp(prefix="vagas_", suffix=extensao, dir=diretorio)
+    os.close(descritor)
+    try:
+        return caminho, exportar_vagas(db, caminho, formato, **kwargs)
+    except Exception:
+        os.remove(caminho)
+        raise
+
+def ler_exportacao(caminho):
+    """Conteúdo de uma exportação, lido só quando o download é pedido"""
+    with open(caminho, 'rb') as arquivo:
+        return arquivo.read()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta as vagas do banco em CSV, JSON Lines ou Parquet")
+    parser.add_argument("destino", help="Arquivo de saída")
+    parser.add_argument("--formato", choices=list(FORMATOS),
+                        help="Formato da saída (padrão: pela extensão do destino, ou csv)")
+    parser.add_argument("--db", default="vagas_linkedin.db")
+    parser.add_argument("--horas", type=float, help="Somente vagas coletadas nas últimas N horas")
+    parser.add_argument("--empresa")
+    parser.add_argument("--site")
+    parser.add_argument("--keyword")
+    parser.add_argument("--estados", nargs="+", help="Siglas dos estados (ex.: SP RJ)")
+    parser.add_argument("--salario", type=float, nargs=2, metavar=("MIN", "MAX"),
+                        help="Faixa de salário mensal em R$")
+    parser.add_argument("--descricoes", action="store_true", help="Inclui a descrição completa de cada vaga")
+    parser.add_argument("--tamanho-lote", type=int, default=10000)
+    args = parser.parse_args(argv)
+    
+    formato = args.formato or os.path.splitext(args.destino)[1].lstrip('.').lower()
+    if formato not in FORMATOS:
+        formato = 'csv'
+    
+    filtros = {
+        'empresa': args.empresa,
+        'site': args.site,
+        'keyword': args.keyword,
+        'estados': args.estados,
+        'faixa_salarial': tuple(args.salario) if args.salario else None
+    }
+    exportar_vagas(DatabaseManager(args.db), args.destino, formato, horas_recentes=args.horas,
+                   filtros=filtros, incluir_descricao=args.descricoes, tamanho_lote=args.tamanho_lote)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Orçamento de tempo de importação dos pontos de entrada (dashboard e scheduler), medido com python -X importtime:
+falha se algum módulo proibido (backends de scraping, DuckDB, SciPy) for carregado na inicialização
+ou se o tempo total de importação passar do limite.
+
+Uso: python orcamento_importacao.py [--limite-ms 2000] [--top 10]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+# ponto de entrada -> (módulos que não podem ser carregados na importação, limite padrão em ms)
+ORCAMENTOS = {
+    'app_streamlit_pro': ({'scraper', 'scraper_jobspy', 'cache_jobspy', 'jobspy', 'selenium', 'bs4', 'duckdb',
+                           'scipy'}, 2000),
+    'scheduler': ({'scraper', 'scraper_jobspy', 'cache_jobspy', 'jobspy', 'selenium', 'bs4', 'duckdb', 'streamlit',
+                   'scipy'}, 1200)
+}
+
+def medir_importacao(modulo):
+    """Executa `import modulo` num processo novo; retorna [(módulo, próprio_us, acumulado_us, nível)]"""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}:\n{resultado.stderr[-2000:]}")
+    
+    medicoes = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        nivel = (len(nome) - len(nome.lstrip())) // 2
+        medicoes.append((nome.strip(), int(proprio), int(acumulado), nivel))
+    return medicoes
+
+def verificar(modulo, proibidos, limite_ms, top=10):
+    """Imprime o relatório do ponto de entrada; retorna a lista de violações"""
+    medicoes = medir_importacao(modulo)
+    total_ms = next(acumulado for nome, _, acumulado, _ in medicoes if nome == modulo) / 1000
+    carregados = {nome for nome, _, _, _ in medicoes}
+    proibidos_carregados = sorted({nome.split('.')[0] for nome in carregados} & proibidos)
+    
+    print(f"\n📦 {modulo}: {total_ms:.0f} ms (limite {limite_ms} ms), {len(carregados)} módulos")
+    # Importações diretas do ponto de entrada: nível 1 logo antes da linha dele (o importtime lista os filhos primeiro)
+    diretos, pendentes = [], []
+    for medicao in medicoes:
+        if medicao[3] == 0:
+            if medicao[0] == modulo:
+                diretos = pendentes
+            pendentes = []
+        elif medicao[3] == 1:
+            pendentes.append(medicao)
+    diretos.sort(key=lambda m: m[2], reverse=True)
+    for nome, _, acumulado, _ in diretos[:top]:
+        print(f"  {acumulado / 1000:8.1f} ms  {nome}")
+    
+    violacoes = []
+    if proibidos_carregados:
+        violacoes.append(f"{modulo} carrega módulos proibidos: {', '.join(proibidos_carregados)}")
+    if total_ms > limite_ms:
+        violacoes.append(f"{modulo} levou {total_ms:.0f} ms para importar (limite {limite_ms} ms)")
+    return violacoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica o orçamento de importação do dashboard e do scheduler")
+    parser.add_argument("modulos", nargs="*", help=f"Pontos de entrada (padrão: {', '.join(ORCAMENTOS)})")
+    parser.add_argument("--limite-ms", type=int, help="Substitui o limite padrão de cada ponto de entrada")
+    parser.add_argument("--top", type=int, default=10, help="Quantas importações diretas listar")
+    args = parser.parse_args(argv)
+    
+    violacoes = []
+    for modulo in args.modulos or list(ORCAMENTOS):
+        proibidos, limite_padrao = ORCAMENTOS[modulo]
+        violacoes += verificar(modulo, proibidos, args.limite_ms or limite_padrao, args.top)
+    
+    if violacoes:
+        print()
+        for violacao in violacoes:
+            print(f"❌ {violacao}")
+        return 1
+    print("\n✅ Orçamento de importação respeitado")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
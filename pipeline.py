@@ -0,0 +1,176 @@
+"""
+Pipeline de ingestão com escritor único:
+os scrapers (produtores) enviam vagas normalizadas para uma fila limitada e uma
+thread escritora grava em micro-lotes (por tamanho ou tempo), uma transação por lote.
+"""
+
+import queue
+import threading
+import time
+import logging
+from database import DatabaseManager
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_FIM = object()  # Sentinela para encerrar a thread escritora
+
+class PipelineEncerrado(RuntimeError):
+    """Vaga enviada depois de finalizar(): o escritor não é reiniciado implicitamente"""
+
+class LoteEnviado:
+    """Acompanha um grupo de vagas enviado ao pipeline até que todas sejam gravadas"""
+    
+    def __init__(self, total=0):
+        self.total = total
+        self.processadas = 0
+        self.novas = 0
+        self._lock = threading.Lock()
+        self._concluido = threading.Event()
+        if total == 0:
+            self._concluido.set()
+    
+    def _adicionar(self):
+        """Conta mais uma vaga no grupo (envio incremental)"""
+        with self._lock:
+            self.total += 1
+            self._concluido.clear()
+    
+    def _registrar(self, nova):
+        with self._lock:
+            self.processadas += 1
+            if nova:
+                self.novas += 1
+            if self.processadas >= self.total:
+                self._concluido.set()
+    
+    def aguardar(self, timeout=None):
+        """Bloqueia até o grupo ser gravado e retorna quantas vagas eram novas"""
+        self._concluido.wait(timeout)
+        return self.novas
+
+class PipelineIngestao:
+    def __init__(self, db=None, tamanho_fila=500, tamanho_lote=50, intervalo_lote=2.0):
+        self.db = db or DatabaseManager()
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_lote = intervalo_lote  # Segundos máximos que uma vaga espera na fila
+        self.fila = queue.Queue(maxsize=tamanho_fila)  # Fila cheia bloqueia os produtores
+        self.thread = None
+        self._lock = threading.Lock()
+        self._encerrado = False
+        
+        # Estatísticas
+        self.recebidas = 0
+        self.novas_vagas = 0
+        self.lotes_gravados = 0
+        self.erros = 0
+        self.tempo_escrita = 0.0
+    
+    def iniciar(self):
+        """Inicia a thread escritora (e reabre o pipeline depois de finalizar)"""
+        with self._lock:
+            self._encerrado = False
+            self._iniciar_escritor()
+        return self
+    
+    def _iniciar_escritor(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._executar_escritor, daemon=True,
+                                           name="pipeline-escritor")
+            self.thread.start()
+    
+    def _enfileirar(self, vaga, lote, timeout):
+        # A verificação e o put ficam sob o lock: nada entra na fila depois da sentinela de finalizar()
+        with self._lock:
+            if self._encerrado:
+                raise PipelineEncerrado("Pipeline finalizado: vaga recusada")
+            self._iniciar_escritor()
+            if lote is not None:
+                lote._adicionar()
+            self.fila.put((vaga, lote), timeout=timeout)
+    
+    def enviar(self, vaga, timeout=None, lote=None):
+        """Enfileira uma vaga (bloqueia enquanto a fila estiver cheia), opcionalmente
+        contabilizando-a em um LoteEnviado criado pelo produtor"""
+        self._enfileirar(vaga, lote, timeout)
+    
+    def enviar_lote(self, vagas, timeout=None):
+        """Enfileira várias vagas e retorna um LoteEnviado para acompanhar a gravação"""
+        lote = LoteEnviado()
+        for vaga in vagas:
+            self._enfileirar(vaga, lote, timeout)
+        return lote
+    
+    def finalizar(self):
+        """Grava o que restar na fila, encerra o escritor e retorna o total de vagas novas.
+        Envios posteriores levantam PipelineEncerrado até um novo iniciar()"""
+        with self._lock:
+            self._encerrado = True
+        if self.thread is not None and self.thread.is_alive():
+            self.fila.put(_FIM)
+            self.thread.join()
+        self.thread = None
+        return self.novas_vagas
+    
+    def __enter__(self):
+        return self.iniciar()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.finalizar()
+    
+    def estatisticas(self):
+        """Resumo do pipeline"""
+        return {
+            'recebidas': self.recebidas,
+            'novas_vagas': self.novas_vagas,
+            'lotes_gravados': self.lotes_gravados,
+            'erros': self.erros,
+            'tempo_escrita': self.tempo_escrita,
+            'pendentes': self.fila.qsize()
+        }
+    
+    def _executar_escritor(self):
+        """Loop da thread escritora: acumula um micro-lote e grava"""
+        encerrar = False
+        while not encerrar:
+            itens = []
+            prazo = None
+            
+            while len(itens) < self.tamanho_lote:
+                espera = None if prazo is None else max(0, prazo - time.time())
+                try:
+                    item = self.fila.get(timeout=espera)
+                except queue.Empty:
+                    break  # Prazo do lote atingido
+                
+                if item is _FIM:
+                    encerrar = True
+                    break
+                
+                itens.append(item)
+                if prazo is None:
+                    prazo = time.time() + self.intervalo_lote
+            
+            if itens:
+                self._gravar(itens)
+    
+    def _gravar(self, itens):
+        """Grava um micro-lote em uma transação e notifica os grupos enviados"""
+        vagas = [vaga for vaga, _ in itens]
+        inicio = time.time()
+        try:
+            inseridas = self.db.inserir_vagas_lote(vagas, detalhado=True)
+        except Exception as e:
+            logger.error(f"Erro ao gravar lote de {len(vagas)} vagas: {e}")
+            self.erros += 1
+            inseridas = [False] * len(vagas)
+        self.tempo_escrita += time.time() - inicio
+        
+        self.recebidas += len(vagas)
+        self.novas_vagas += sum(inseridas)
+        self.lotes_gravados += 1
+        
+        for (_, lote), nova in zip(itens, inseridas):
+            if lote is not None:
+                lote._registrar(nova)
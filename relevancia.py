@@ -0,0 +1,300 @@
+"""
+Ranking de relevância das vagas em relação a um perfil (texto livre ou palavras-chave):
+vetores TF-IDF esparsos (SciPy) de título + descrição, com stop-words em português e sem acentos,
+atualizados de forma incremental a partir da seq das vagas novas e persistidos ao lado do banco
+(<banco>_relevancia.npz). A pontuação de todas as vagas é um único produto matriz-vetor.
+O mesmo índice calcula, em blocos de produtos matriciais, as vagas mais parecidas com cada vaga nova
+(tabela vagas_similares), exibidas nos detalhes do dashboard sem nenhum cálculo no clique.
+
+Uso: python relevancia.py [--db vagas_linkedin.db] [--reconstruir] [--similares] [--perfil "engenheiro de dados python"]
+"""
+
+import os
+import sys
+import math
+import sqlite3
+import argparse
+import logging
+import tempfile
+import threading
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from database import DatabaseManager
+from deduplicacao import normalizar_texto
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SUFIXO_ARQUIVO = "_relevancia.npz"
+PESO_TITULO = 3  # Cada palavra do título conta como 3 ocorrências na descrição
+TOTAL_SIMILARES = 10  # Vizinhas gravadas por vaga (o dashboard descarta ocultas e duplicatas ao exibir)
+
+# Já sem acentos, como os termos depois de normalizar_texto
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em entre era essa esse esta
+este eu foi for ha isso isto ja la lhe mais mas me mesmo meu minha muito na nas nao nem no nos nossa nosso
+o os ou para pela pelas pelo pelos por qual quando que quem se sem ser seu seus sua suas so tambem te tem
+ter todo todos tu um uma umas uns voce voces vai sao sera serao seja estar esta estao estamos sobre apos
+bem cada onde assim ainda pode podem sua seus nossa nossas nossos nosso nos vaga vagas empresa atuar
+buscamos procuramos oferecemos
+""".split())
+
+def tokenizar(texto):
+    """Termos do texto: minúsculas, sem acentos, sem stop-words e sem termos de uma letra"""
+    return [termo for termo in normalizar_texto(texto or "").split()
+            if len(termo) > 1 and termo not in STOPWORDS]
+
+class IndiceRelevancia:
+    def __init__(self, db=None, caminho=None):
+        self.db = db or DatabaseManager()
+        self.caminho = caminho or os.path.splitext(self.db.db_path)[0] + SUFIXO_ARQUIVO
+        self._lock = threading.RLock()
+        self.ultima_vaga_similares = 0  # Vagas até esta seq já têm vizinhas gravadas (sobrevive à reconstrução)
+        self._zerar()
+        self.carregar()
+    
+    def _zerar(self):
+        self.vocabulario = {}  # termo -> coluna
+        self.ids = np.array([], dtype=str)
+        self.seqs = np.array([], dtype=np.int64)  # Busca direta das candidatas no SQLite (idx_vagas_seq)
+        self.coletada_em = np.array([], dtype=np.int64)
+        self.matriz = sparse.csr_matrix((0, 0), dtype=np.float32)  # 1 + log(tf) por vaga e termo
+        self.frequencia_documentos = np.zeros(0, dtype=np.int64)
+        self.ultima_vaga = 0
+        self._desatualizado = False  # ids do índice divergem do banco: reconstruir na próxima atualização
+        self._normas = None  # Normas dos vetores TF-IDF, recalculadas quando o IDF muda
+        self._ordem_recentes = None  # Linhas da coleta mais recente para a mais antiga (desempate)
+    
+    def carregar(self):
+        """Lê o índice persistido (se existir)"""
+        if not os.path.exists(self.caminho):
+            return False
+        with np.load(self.caminho) as dados:
+            if 'ultima_vaga_similares' in dados:
+                self.ultima_vaga_similares = int(dados['ultima_vaga_similares'])
+            if 'seqs' not in dados:
+                return False  # Índice antigo, indexado pelo rowid: reconstruído na próxima atualização
+            termos = dados['termos']
+            self.vocabulario = {termo: coluna for coluna, termo in enumerate(termos.tolist())}
+            self.ids = dados['ids']
+            self.seqs = dados['seqs']
+            self.coletada_em = dados['coletada_em']
+            self.matriz = sparse.csr_matrix(
+                (dados['dados'], dados['indices'], dados['indptr']), shape=(len(self.ids), len(termos))
+            )
+            self.frequencia_documentos = dados['frequencia_documentos']
+            self.ultima_vaga = int(dados['ultima_vaga'])
+        self._normas = None
+        self._ordem_recentes = None
+        return True
+    
+    def salvar(self):
+        """Grava o índice (arquivo temporário + os.replace: leitores nunca veem um arquivo pela metade)"""
+        termos = np.empty(len(self.vocabulario), dtype=object)
+        for termo, coluna in self.vocabulario.items():
+            termos[coluna] = termo
+        # Temporário com nome único: gravações concorrentes não escrevem no mesmo arquivo
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(self.caminho) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                np.savez(
+                    arquivo,
+                    termos=termos.astype(str), ids=self.ids, seqs=self.seqs, coletada_em=self.coletada_em,
+                    dados=self.matriz.data, indices=self.matriz.indices, indptr=self.matriz.indptr,
+                    frequencia_documentos=self.frequencia_documentos, ultima_vaga=self.ultima_vaga,
+                    ultima_vaga_similares=self.ultima_vaga_similares
+                )
+            os.replace(temporario, self.caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+    
+    def _vetorizar(self, linhas):
+        """Matriz CSR (1 + log tf) das linhas (titulo, descricao); termos novos entram no vocabulário"""
+        dados, indices, indptr = [], [], [0]
+        for titulo, descricao in linhas:
+            contagem = Counter(tokenizar(titulo))
+            for termo in contagem:
+                contagem[termo] *= PESO_TITULO
+            contagem.update(tokenizar(descricao))
+            for termo, frequencia in contagem.items():
+                indices.append(self.vocabulario.setdefault(termo, len(self.vocabulario)))
+                dados.append(1.0 + math.log(frequencia))
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.array(dados, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(linhas), len(self.vocabulario))
+        )
+    
+    def atualizar(self, tamanho_lote=5000, salvar=True):
+        """Indexa as vagas inseridas depois da última atualização; retorna quantas entraram"""
+        with self._lock:
+            ultima_vaga = self.db.versao_vagas()['ultima_vaga']
+            if ultima_vaga < self.ultima_vaga or self._desatualizado:
+                # seq menor que a marca (banco recriado) ou ids renomeados: começar do zero
+                logger.info("🔄 Banco mudou desde a última indexação, reconstruindo o índice de relevância")
+                self._zerar()
+                self.ultima_vaga_similares = 0
+            if ultima_vaga == self.ultima_vaga:
+                return 0
+            
+            conn = sqlite3.connect(self.db.db_path)
+            total = 0
+            try:
+                while True:
+                    linhas = conn.execute('''
+                        SELECT v.seq, v.id, v.coletada_em, v.titulo, d.conteudo
+                        FROM vagas v LEFT JOIN descricoes d ON d.vaga_id = v.id
+                        WHERE v.seq > ?
+                        ORDER BY v.seq
+                        LIMIT ?
+                    ''', (self.ultima_vaga, tamanho_lote)).fetchall()
+                    if not linhas:
+                        break
+                    
+                    novas = self._vetorizar([
+                        (titulo, self.db.descomprimir_descricao(conteudo) if conteudo is not None else "")
+                        for _, _, _, titulo, conteudo in linhas
+                    ])
+                    colunas = novas.shape[1]
+                    self.matriz.resize((self.matriz.shape[0], colunas))
+                    self.matriz = sparse.vstack([self.matriz, novas], format='csr')
+                    
+                    self.frequencia_documentos = np.concatenate([
+                        self.frequencia_documentos,
+                        np.zeros(colunas - len(self.frequencia_documentos), dtype=np.int64)
+                    ]) + np.bincount(novas.indices, minlength=colunas)
+                    
+                    self.ids = np.concatenate([self.ids, [linha[1] for linha in linhas]])
+                    self.seqs = np.concatenate([self.seqs, np.array([linha[0] for linha in linhas], dtype=np.int64)])
+                    self.coletada_em = np.concatenate([
+                        self.coletada_em, np.array([linha[2] or 0 for linha in linhas], dtype=np.int64)
+                    ])
+                    self.ultima_vaga = linhas[-1][0]
+                    total += len(linhas)
+            finally:
+                conn.close()
+            
+            self._normas = None
+            self._ordem_recentes = None
+            if salvar:
+                self.salvar()
+            return total
+    
+    def invalidar(self):
+        """Marca o índice para reconstrução (vaga do banco com outro id na mesma seq)"""
+        with self._lock:
+            self._desatualizado = True
+    
+    def reconstruir(self):
+        """Descarta o índice e indexa todas as vagas de novo (remove do IDF as vagas já excluídas)"""
+        with self._lock:
+            self._zerar()
+        return self.atualizar()
+    
+    def _idf(self):
+        total = len(self.ids)
+        return (np.log((1 + total) / (1 + self.frequencia_documentos)) + 1).astype(np.float32)
+    
+    def _obter_normas(self, idf):
+        """Normas dos vetores TF-IDF das vagas (cache até a próxima atualização do índice)"""
+        if self._normas is None:
+            quadrados = self.matriz.multiply(self.matriz).tocsr()
+            self._normas = np.sqrt(quadrados @ (idf * idf))
+            self._normas[self._normas == 0] = 1
+        return self._normas
+    
+    def pontuar(self, perfil):
+        """Similaridade de cosseno TF-IDF de cada vaga indexada com o perfil (alinhada com self.ids)"""
+        with self._lock:
+            contagem = Counter(termo for termo in tokenizar(perfil) if termo in self.vocabulario)
+            if not contagem:
+                return np.zeros(len(self.ids), dtype=np.float32)
+            
+            idf = self._idf()
+            normas = self._obter_normas(idf)
+            
+            colunas = np.array([self.vocabulario[termo] for termo in contagem])
+            consulta = (1 + np.log(np.fromiter(contagem.values(), dtype=np.float32))) * idf[colunas]
+            consulta /= np.linalg.norm(consulta)
+            
+            # Pesos do perfil já multiplicados pelo IDF do lado das vagas: um único produto matriz-vetor
+            pesos = np.zeros(self.matriz.shape[1], dtype=np.float32)
+            pesos[colunas] = consulta * idf[colunas]
+            return (self.matriz @ pesos) / normas
+    
+    def _matriz_normalizada(self):
+        """Vetores TF-IDF de norma 1: o produto entre duas linhas é a similaridade de cosseno"""
+        idf = self._idf()
+        normas = self._obter_normas(idf)
+        return sparse.diags((1 / normas).astype(np.float32)) @ self.matriz @ sparse.diags(idf)
+    
+    def atualizar_similares(self, k=TOTAL_SIMILARES, tamanho_bloco=128):
+        """Calcula e grava as k vizinhas das vagas indexadas depois da última execução; retorna quantas.
+        Cada bloco de vagas novas é comparado com todo o índice num único produto matricial
+        (só nas colunas dos termos do bloco); as vizinhas das vagas antigas não são recalculadas."""
+        with self._lock:
+            inicio = int(np.searchsorted(self.seqs, self.ultima_vaga_similares, side='right'))
+            if inicio >= len(self.ids):
+                return 0
+            
+            normalizada = self._matriz_normalizada().tocsr()
+            for bloco_inicio in range(inicio, len(self.ids), tamanho_bloco):
+                bloco = normalizada[bloco_inicio:bloco_inicio + tamanho_bloco]
+                colunas = np.unique(bloco.indices)
+                # (vagas do bloco x todas as vagas) em float32: ~tamanho_bloco * 4 bytes por vaga indexada
+                similaridades = np.ascontiguousarray((normalizada[:, colunas] @ bloco[:, colunas].T.toarray()).T)
+                linhas_bloco = np.arange(similaridades.shape[0])
+                similaridades[linhas_bloco, bloco_inicio + linhas_bloco] = -1  # A própria vaga
+                
+                quantidade = min(k, len(self.ids) - 1)
+                melhores = np.argpartition(similaridades, -quantidade, axis=1)[:, -quantidade:] if quantidade else \
+                    np.empty((len(linhas_bloco), 0), dtype=np.int64)
+                similares = {}
+                for linha, candidatas in enumerate(melhores):
+                    valores = similaridades[linha, candidatas]
+                    ordem = np.argsort(-valores, kind='stable')
+                    similares[self.ids[bloco_inicio + linha]] = [
+                        (self.ids[candidata], float(valor))
+                        for candidata, valor in zip(candidatas[ordem], valores[ordem]) if valor > 0
+                    ]
+                self.db.gravar_vagas_similares(similares)
+                self.ultima_vaga_similares = int(self.seqs[bloco_inicio + len(linhas_bloco) - 1])
+            
+            self.salvar()
+            return len(self.ids) - inicio
+    
+    def ranquear(self, perfil):
+        """(ids, seqs, pontuações) da mais relevante para a menos; empates ficam com as mais recentes"""
+        with self._lock:
+            pontuacoes = self.pontuar(perfil)
+            if self._ordem_recentes is None:
+                self._ordem_recentes = np.argsort(-self.coletada_em, kind='stable')
+            # Ordenação estável sobre as linhas já em ordem de coleta: bem mais barata que um lexsort
+            ordem = self._ordem_recentes[np.argsort(-pontuacoes[self._ordem_recentes], kind='stable')]
+            return self.ids[ordem], self.seqs[ordem], pontuacoes[ordem]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Atualiza o índice de relevância das vagas")
+    parser.add_argument("--db", default="vagas_linkedin.db", help="Banco SQLite das vagas")
+    parser.add_argument("--reconstruir", action="store_true", help="Indexa todas as vagas do zero")
+    parser.add_argument("--similares", action="store_true", help="Calcula as vagas similares das vagas novas")
+    parser.add_argument("--perfil", help="Mostra as 10 vagas mais relevantes para este perfil")
+    args = parser.parse_args(argv)
+    
+    indice = IndiceRelevancia(DatabaseManager(args.db))
+    novas = indice.reconstruir() if args.reconstruir else indice.atualizar()
+    print(f"✅ {novas} vaga(s) indexada(s); índice com {len(indice.ids)} vagas e {len(indice.vocabulario)} termos")
+    if args.similares:
+        print(f"🔗 Vagas similares calculadas para {indice.atualizar_similares()} vaga(s)")
+    
+    if args.perfil:
+        ids, _, pontuacoes = indice.ranquear(args.perfil)
+        for vaga_id, pontuacao in zip(ids[:10], pontuacoes[:10]):
+            print(f"  {pontuacao:.3f}  {vaga_id}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
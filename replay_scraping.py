@@ -0,0 +1,258 @@
+"""
+Gravação e replay das respostas dos scrapers:
+- Gravação: salva as saídas do scrape_jobs (JobsPy) e o HTML das páginas do Selenium em fixtures
+- Replay: substitui as chamadas reais pelas fixtures, com latência artificial e injeção de erros (429, 400)
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+import pandas as pd
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException
+import cache_jobspy
+import scraper
+from cache_jobspy import CacheJobSpy
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DIRETORIO_FIXTURES = "fixtures_scraping"
+
+def _chave_url(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+
+class RepositorioFixtures:
+    """Fixtures em disco: jobspy/<chave>.pkl e selenium/<chave>.html, cada um com um indice.json"""
+    
+    def __init__(self, diretorio=DIRETORIO_FIXTURES):
+        self.diretorio = diretorio
+        self.dir_jobspy = os.path.join(diretorio, "jobspy")
+        self.dir_selenium = os.path.join(diretorio, "selenium")
+        self._chaves = CacheJobSpy()  # Reaproveita a normalização de parâmetros do cache
+    
+    def _ler_indice(self, pasta):
+        caminho = os.path.join(pasta, "indice.json")
+        if not os.path.exists(caminho):
+            return {}
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _gravar_indice(self, pasta, indice):
+        with open(os.path.join(pasta, "indice.json"), "w", encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False, indent=2, default=str)
+    
+    def gravar_jobspy(self, params, df):
+        os.makedirs(self.dir_jobspy, exist_ok=True)
+        chave = self._chaves.gerar_chave(params)
+        df.to_pickle(os.path.join(self.dir_jobspy, f"{chave}.pkl"))
+        indice = self._ler_indice(self.dir_jobspy)
+        indice[chave] = self._chaves.normalizar_parametros(params)
+        self._gravar_indice(self.dir_jobspy, indice)
+    
+    def ler_jobspy(self, params):
+        """Fixture da busca; sem correspondência exata, usa outra fixture do mesmo site"""
+        chave = self._chaves.gerar_chave(params)
+        caminho = os.path.join(self.dir_jobspy, f"{chave}.pkl")
+        if not os.path.exists(caminho):
+            sites = self._chaves.normalizar_parametros(params).get('site_name')
+            candidatas = [c for c, p in self._ler_indice(self.dir_jobspy).items() if p.get('site_name') == sites]
+            if not candidatas:
+                return pd.DataFrame()
+            caminho = os.path.join(self.dir_jobspy, f"{random.choice(candidatas)}.pkl")
+        return pd.read_pickle(caminho)
+    
+    def gravar_pagina(self, url, html):
+        os.makedirs(self.dir_selenium, exist_ok=True)
+        chave = _chave_url(url)
+        with open(os.path.join(self.dir_selenium, f"{chave}.html"), "w", encoding='utf-8') as f:
+            f.write(html)
+        indice = self._ler_indice(self.dir_selenium)
+        indice[chave] = url
+        self._gravar_indice(self.dir_selenium, indice)
+    
+    def ler_pagina(self, url):
+        caminho = os.path.join(self.dir_selenium, f"{_chave_url(url)}.html")
+        if not os.path.exists(caminho):
+            return "<html><body></body></html>"
+        with open(caminho, encoding='utf-8') as f:
+            return f.read()
+    
+    def tem_paginas(self):
+        return bool(self._ler_indice(self.dir_selenium))
+
+class InjetorFalhas:
+    """Latência artificial e erros simulados para o replay"""
+    
+    def __init__(self, latencia=0.0, variacao_latencia=0.0, taxa_429=0.0, taxa_400=0.0, semente=None):
+        self.latencia = latencia
+        self.variacao_latencia = variacao_latencia
+        self.taxa_429 = taxa_429
+        self.taxa_400 = taxa_400
+        self.random = random.Random(semente)
+        self.erros_injetados = {'429': 0, '400': 0}
+    
+    def aplicar(self):
+        espera = self.latencia + self.random.uniform(0, self.variacao_latencia)
+        if espera > 0:
+            time.sleep(espera)
+        
+        sorteio = self.random.random()
+        if sorteio < self.taxa_429:
+            self.erros_injetados['429'] += 1
+            raise Exception("429 Client Error: Too Many Requests (replay)")
+        if sorteio < self.taxa_429 + self.taxa_400:
+            self.erros_injetados['400'] += 1
+            raise Exception("400 Client Error: Bad Request - location not parsed (replay)")
+
+class ElementoReplay:
+    """Subconjunto da API de WebElement sobre uma tag do BeautifulSoup"""
+    
+    def __init__(self, tag):
+        self.tag = tag
+    
+    @property
+    def text(self):
+        return self.tag.get_text(" ", strip=True)
+    
+    def get_attribute(self, nome):
+        valor = self.tag.get(nome)
+        return " ".join(valor) if isinstance(valor, list) else valor
+    
+    def find_elements(self, by, valor):
+        if by != By.CSS_SELECTOR:
+            return []  # Replay estático: apenas seletores CSS
+        return [ElementoReplay(tag) for tag in self.tag.select(valor)]
+    
+    def find_element(self, by, valor):
+        elementos = self.find_elements(by, valor)
+        if not elementos:
+            raise NoSuchElementException(f"{by}={valor} (replay)")
+        return elementos[0]
+    
+    def is_displayed(self):
+        return True
+    
+    def is_enabled(self):
+        return True
+    
+    def click(self):
+        pass
+
+class DriverReplay(ElementoReplay):
+    """WebDriver falso que serve o HTML gravado de cada URL"""
+    
+    def __init__(self, fixtures, injetor=None):
+        super().__init__(BeautifulSoup("", "html.parser"))
+        self.fixtures = fixtures
+        self.injetor = injetor
+        self.page_source = ""
+    
+    def get(self, url):
+        if self.injetor:
+            self.injetor.aplicar()
+        self.page_source = self.fixtures.ler_pagina(url)
+        self.tag = BeautifulSoup(self.page_source, "html.parser")
+    
+    def execute_script(self, script, *args):
+        return None
+    
+    def quit(self):
+        pass
+
+class DriverGravador:
+    """Proxy do WebDriver real que grava o HTML de cada página carregada"""
+    
+    def __init__(self, driver, fixtures):
+        self._driver = driver
+        self._fixtures = fixtures
+    
+    def get(self, url):
+        self._driver.get(url)
+        try:
+            self._fixtures.gravar_pagina(url, self._driver.page_source)
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar a página {url}: {e}")
+    
+    def __getattr__(self, nome):
+        return getattr(self._driver, nome)
+
+class _WebDriverWaitReplay(WebDriverWait):
+    """Página estática: não há o que esperar carregar"""
+    
+    def __init__(self, driver, timeout, *args, **kwargs):
+        super().__init__(driver, 0, poll_frequency=0.01)
+
+@contextmanager
+def _cache_isolado():
+    """Cache do JobsPy vazio e temporário, para não mascarar gravação/replay"""
+    original = cache_jobspy.cache_padrao.diretorio
+    with tempfile.TemporaryDirectory() as diretorio:
+        cache_jobspy.cache_padrao.diretorio = diretorio
+        try:
+            yield
+        finally:
+            cache_jobspy.cache_padrao.diretorio = original
+
+@contextmanager
+def modo_gravacao(diretorio=DIRETORIO_FIXTURES):
+    """Executa os scrapers reais gravando as respostas em fixtures"""
+    fixtures = RepositorioFixtures(diretorio)
+    scrape_jobs_original = cache_jobspy.scrape_jobs
+    configurar_driver_original = scraper.LinkedInScraper.configurar_driver
+    
+    def scrape_jobs_gravando(**params):
+        df = scrape_jobs_original(**params)
+        if df is not None:
+            fixtures.gravar_jobspy(params, df)
+        return df
+    
+    def configurar_driver_gravando(self):
+        configurar_driver_original(self)
+        self.driver = DriverGravador(self.driver, fixtures)
+        return self.driver
+    
+    cache_jobspy.scrape_jobs = scrape_jobs_gravando
+    scraper.LinkedInScraper.configurar_driver = configurar_driver_gravando
+    try:
+        with _cache_isolado():
+            yield fixtures
+    finally:
+        cache_jobspy.scrape_jobs = scrape_jobs_original
+        scraper.LinkedInScraper.configurar_driver = configurar_driver_original
+
+@contextmanager
+def modo_replay(diretorio=DIRETORIO_FIXTURES, injetor=None):
+    """Substitui JobsPy e Selenium pelas fixtures gravadas"""
+    fixtures = RepositorioFixtures(diretorio)
+    injetor = injetor or InjetorFalhas()
+    scrape_jobs_original = cache_jobspy.scrape_jobs
+    configurar_driver_original = scraper.LinkedInScraper.configurar_driver
+    web_driver_wait_original = scraper.WebDriverWait
+    
+    def scrape_jobs_replay(**params):
+        injetor.aplicar()
+        return fixtures.ler_jobspy(params).copy()
+    
+    def configurar_driver_replay(self):
+        self.driver = DriverReplay(fixtures, injetor)
+        return self.driver
+    
+    cache_jobspy.scrape_jobs = scrape_jobs_replay
+    scraper.LinkedInScraper.configurar_driver = configurar_driver_replay
+    scraper.WebDriverWait = _WebDriverWaitReplay
+    try:
+        with _cache_isolado():
+            yield fixtures
+    finally:
+        cache_jobspy.scrape_jobs = scrape_jobs_original
+        scraper.LinkedInScraper.configurar_driver = configurar_driver_original
+        scraper.WebDriverWait = web_driver_wait_original
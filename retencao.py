@@ -0,0 +1,91 @@
+"""
+Política de retenção do banco de vagas:
+vagas mais antigas que o limite são arquivadas em Parquet particionado por data de coleta
+(arquivo_vagas/data=AAAA-MM-DD/*.parquet), removidas da tabela em lotes e o espaço é devolvido
+com PRAGMA incremental_vacuum.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import pandas as pd
+from datetime import datetime, timezone
+from database import DatabaseManager
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DIRETORIO_ARQUIVO = "arquivo_vagas"
+
+class PoliticaRetencao:
+    def __init__(self, db=None, dias_retencao=90, diretorio=DIRETORIO_ARQUIVO, tamanho_lote=5000):
+        self.db = db or DatabaseManager()
+        self.dias_retencao = dias_retencao
+        self.diretorio = diretorio
+        self.tamanho_lote = tamanho_lote
+    
+    def _ler_lote(self, limite):
+        """Próximo lote de vagas coletadas antes do limite, com a descrição completa"""
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            df = pd.read_sql_query('''
+                SELECT v.*, d.conteudo AS descricao_comprimida
+                FROM vagas v LEFT JOIN descricoes d ON d.vaga_id = v.id
+                WHERE v.coletada_em < ?
+                ORDER BY v.coletada_em
+                LIMIT ?
+            ''', conn, params=[limite, self.tamanho_lote])
+        finally:
+            conn.close()
+        
+        df['descricao'] = [self.db.descomprimir_descricao(c) if c is not None else None
+                           for c in df.pop('descricao_comprimida')]
+        return df
+    
+    def _arquivar(self, df):
+        """Grava o lote em Parquet, um arquivo por dia de coleta.
+        O nome deriva dos IDs: se a remoção falhar, a próxima execução sobrescreve o mesmo arquivo."""
+        dias = pd.to_datetime(df['coletada_em'], unit='s', utc=True).dt.strftime('%Y-%m-%d')
+        arquivos = []
+        for dia, parte in df.groupby(dias):
+            pasta = os.path.join(self.diretorio, f"data={dia}")
+            os.makedirs(pasta, exist_ok=True)
+            chave = hashlib.md5("".join(parte['id']).encode()).hexdigest()[:16]
+            caminho = os.path.join(pasta, f"vagas-{chave}.parquet")
+            temporario = caminho + ".tmp"
+            parte.to_parquet(temporario, index=False, compression='zstd')
+            os.replace(temporario, caminho)  # Só aparece no arquivo depois de gravado por completo
+            arquivos.append(caminho)
+        return arquivos
+    
+    def executar(self, agora=None):
+        """Arquiva e remove as vagas antigas; retorna um resumo da execução"""
+        limite = int(agora if agora is not None else time.time()) - self.dias_retencao * 86400
+        resumo = {'arquivadas': 0, 'arquivos': 0, 'paginas_liberadas': 0}
+        inicio = time.time()
+        
+        logger.info(f"🗄️ Retenção: arquivando vagas coletadas antes de "
+                    f"{datetime.fromtimestamp(limite, timezone.utc):%Y-%m-%d} ({self.dias_retencao} dias)")
+        
+        while True:
+            df = self._ler_lote(limite)
+            if df.empty:
+                break
+            
+            # Arquiva antes de remover: uma falha na gravação não perde vagas
+            resumo['arquivos'] += len(self._arquivar(df))
+            self.db.remover_vagas(df['id'].tolist())
+            resumo['arquivadas'] += len(df)
+            
+            if len(df) < self.tamanho_lote:
+                break
+        
+        if resumo['arquivadas']:
+            resumo['paginas_liberadas'] = self.db.liberar_espaco()
+        
+        logger.info(f"✅ Retenção concluída em {time.time() - inicio:.1f}s: {resumo['arquivadas']} vagas em "
+                    f"{resumo['arquivos']} arquivos, {resumo['paginas_liberadas']} páginas liberadas")
+        return resumo
@@ -0,0 +1,118 @@
+"""
+Salários estruturados: mínimo, máximo e periodicidade numéricos, mais o valor mensal em reais
+usado nos filtros e gráficos do dashboard.
+"""
+
+import re
+
+# Multiplicador para converter cada periodicidade do JobsPy em valor mensal
+MESES_POR_INTERVALO = {
+    'yearly': 1 / 12,
+    'monthly': 1,
+    'weekly': 52 / 12,
+    'daily': 22,     # Dias úteis no mês
+    'hourly': 220    # Jornada mensal CLT
+}
+
+# Sinônimos encontrados nos textos antigos de salary_info
+SINONIMOS_INTERVALO = {
+    'year': 'yearly', 'ano': 'yearly', 'anual': 'yearly',
+    'month': 'monthly', 'mes': 'monthly', 'mês': 'monthly', 'mensal': 'monthly',
+    'week': 'weekly', 'semana': 'weekly', 'semanal': 'weekly',
+    'day': 'daily', 'dia': 'daily', 'diario': 'daily', 'diário': 'daily',
+    'hour': 'hourly', 'hora': 'hourly'
+}
+
+# Cotação aproximada para comparar vagas em outras moedas (atualizar quando necessário)
+COTACOES_BRL = {'BRL': 1.0, 'USD': 5.5, 'EUR': 6.0, 'GBP': 7.0}
+
+# Limites de sanidade para o valor mensal (descarta erros de parsing)
+SALARIO_MENSAL_MINIMO = 300
+SALARIO_MENSAL_MAXIMO = 200000
+
+_PADRAO_NUMERO = re.compile(r"\d[\d.,]*")
+
+def _numero(valor):
+    """Converte para float; None para vazio/NaN/não positivo"""
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if numero == numero and numero > 0 else None
+
+def _normalizar_intervalo(intervalo):
+    intervalo = str(intervalo or '').strip().lower().lstrip('/')
+    if intervalo in MESES_POR_INTERVALO:
+        return intervalo
+    return SINONIMOS_INTERVALO.get(intervalo)
+
+def _parsear_numero_texto(texto):
+    """'10.000' (milhar) -> 10000; '10000.0' -> 10000; '8.500,50' -> 8500.5"""
+    if ',' in texto and '.' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    elif ',' in texto:
+        partes = texto.split(',')
+        texto = texto.replace(',', '') if len(partes[-1]) == 3 else texto.replace(',', '.')
+    elif re.fullmatch(r"\d{1,3}(\.\d{3})+", texto):
+        texto = texto.replace('.', '')
+    return _numero(texto.rstrip('.'))
+
+def parsear_salary_info(texto):
+    """Extrai (mínimo, máximo, intervalo) dos textos de salary_info gravados antes das colunas numéricas:
+    'R$ 8000.0 - R$ 12000.0 - /monthly', '8000.0-12000.0 monthly', 'R$ 10.000 - R$ 15.000'"""
+    texto = str(texto or '').strip().lower()
+    if not texto or texto in ('não informado', 'nan'):
+        return None, None, None
+    
+    numeros = [n for n in (_parsear_numero_texto(m) for m in _PADRAO_NUMERO.findall(texto)) if n]
+    if not numeros:
+        return None, None, None
+    
+    intervalo = None
+    for palavra in re.findall(r"[a-zêáçí]+", texto):
+        intervalo = _normalizar_intervalo(palavra)
+        if intervalo:
+            break
+    return numeros[0], numeros[1] if len(numeros) > 1 else None, intervalo
+
+def salario_mensal_brl(minimo, maximo, intervalo=None, moeda='BRL'):
+    """Valor mensal em reais (média entre mínimo e máximo); None se não for possível calcular"""
+    valores = [v for v in (_numero(minimo), _numero(maximo)) if v]
+    if not valores:
+        return None
+    
+    valor = sum(valores) / len(valores)
+    valor *= COTACOES_BRL.get(str(moeda or 'BRL').upper(), 1.0)
+    valor *= MESES_POR_INTERVALO.get(_normalizar_intervalo(intervalo) or 'monthly')
+    
+    if not SALARIO_MENSAL_MINIMO <= valor <= SALARIO_MENSAL_MAXIMO:
+        return None
+    return round(valor, 2)
+
+def estruturar_salario(vaga_data):
+    """Campos salary_min, salary_max, salary_interval e salario_mensal_brl de uma vaga
+    (dos valores do JobsPy quando presentes; senão, do texto salary_info)"""
+    minimo = _numero(vaga_data.get('salary_min'))
+    maximo = _numero(vaga_data.get('salary_max'))
+    intervalo = _normalizar_intervalo(vaga_data.get('salary_interval'))
+    
+    if minimo is None and maximo is None:
+        minimo, maximo, intervalo_texto = parsear_salary_info(vaga_data.get('salary_info'))
+        intervalo = intervalo or intervalo_texto
+    
+    return {
+        'salary_min': minimo,
+        'salary_max': maximo,
+        'salary_interval': intervalo,
+        'salario_mensal_brl': salario_mensal_brl(minimo, maximo, intervalo, vaga_data.get('salary_currency'))
+    }
+
+def formatar_salario(minimo, maximo, intervalo=None, moeda='BRL'):
+    """Texto de exibição único para os dois scrapers: 'R$ 8.000 - R$ 12.000 /monthly'"""
+    valores = [v for v in (_numero(minimo), _numero(maximo)) if v]
+    if not valores:
+        return "Não informado"
+    simbolo = "R$" if str(moeda or 'BRL').upper() == 'BRL' else str(moeda).upper()
+    texto = " - ".join(f"{simbolo} {valor:,.0f}".replace(",", ".") for valor in valores)
+    intervalo = _normalizar_intervalo(intervalo)
+    return f"{texto} /{intervalo}" if intervalo else texto
@@ -1,42 +1,238 @@
-import schedule
 import time
+import math
+import random
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
-from scraper import executar_scraping
+from database import DatabaseManager
+from pipeline import PipelineIngestao
+from retencao import PoliticaRetencao
+from backends_scraping import TERMOS_BUSCA, SITES_JOBSPY, obter_backend, executar_backend
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Políticas para execuções perdidas (scheduler parado ou job atrasado)
+POLITICA_PULAR = "pular"                    # Descarta as execuções perdidas
+POLITICA_EXECUTAR_UMA = "executar_uma"      # Executa uma vez e segue a cadência
+POLITICA_EXECUTAR_TODAS = "executar_todas"  # Executa uma vez por período perdido
+
+class TarefaAgendada:
+    """Job periódico do scheduler"""
+    
+    def __init__(self, nome, funcao, intervalo_segundos, jitter_segundos=0,
+                 politica_atraso=POLITICA_EXECUTAR_UMA, max_recuperacoes=3,
+                 intervalo_dinamico=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.intervalo_segundos = intervalo_segundos
+        self.jitter_segundos = jitter_segundos
+        self.politica_atraso = politica_atraso
+        self.max_recuperacoes = max_recuperacoes
+        self.intervalo_dinamico = intervalo_dinamico  # Callable que recalcula o intervalo após cada execução
+        self.proxima_execucao = None
+        self.ultima_execucao = None
+        self.em_execucao = False
+    
+    def calcular_proxima(self, base):
+        """Calcula a próxima execução a partir de um instante base (epoch)"""
+        jitter = random.uniform(0, self.jitter_segundos) if self.jitter_segundos else 0
+        return base + self.intervalo_segundos + jitter
+    
+    def execucoes_pendentes(self, agora):
+        """Quantas execuções devem ser disparadas agora, segundo a política de atraso"""
+        if self.proxima_execucao is None or self.proxima_execucao > agora:
+            return 0
+        
+        atraso = agora - self.proxima_execucao
+        if atraso < self.intervalo_segundos:
+            return 1  # No horário (ou com atraso menor que um período)
+        
+        if self.politica_atraso == POLITICA_PULAR:
+            return 0
+        if self.politica_atraso == POLITICA_EXECUTAR_TODAS:
+            perdidas = int(math.floor(atraso / self.intervalo_segundos)) + 1
+            return min(perdidas, self.max_recuperacoes)
+        return 1
+
 class SchedulerManager:
-    def __init__(self):
+    def __init__(self, max_workers=2, db=None, dias_retencao=90):
         self.running = False
+        
+        # Cadência adaptativa por (termo, site), baseada no histórico de novas vagas
+        self.intervalo_base = 2 * 3600
+        self.intervalo_minimo = 30 * 60
+        self.intervalo_maximo = 12 * 3600
+        self.alvo_novas_por_execucao = 3  # Novas vagas esperadas por execução no intervalo base
+        self.alfa_ema = 0.3
+        
+        # Vagas coletadas há mais de `dias_retencao` dias vão para o arquivo Parquet
+        self.dias_retencao = dias_retencao
+        
         self.thread = None
+        self.max_workers = max_workers
+        self.db = db or DatabaseManager()
+        self.pipeline = PipelineIngestao(self.db)  # Escritor único compartilhado pelos jobs de scraping
+        self.tarefas = {}
+        self._agendamentos_persistidos = {}
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._executor = None
+        self._indice_relevancia = None
+        self._ingestao_pendente = threading.Event()  # Vagas novas ainda fora dos rollups e do índice
+    
+    def adicionar_tarefa(self, nome, funcao, intervalo_segundos, jitter_segundos=0,
+                         politica_atraso=POLITICA_EXECUTAR_UMA, max_recuperacoes=3,
+                         intervalo_dinamico=None):
+        """Registra um job periódico, retomando a cadência persistida no banco"""
+        tarefa = TarefaAgendada(nome, funcao, intervalo_segundos, jitter_segundos,
+                                politica_atraso, max_recuperacoes, intervalo_dinamico)
+        
+        agora = time.time()
+        persistido = self._agendamentos_persistidos.get(nome)
+        if persistido and persistido[0]:
+            tarefa.proxima_execucao, tarefa.ultima_execucao = persistido
+        else:
+            tarefa.proxima_execucao = tarefa.calcular_proxima(agora)
+            self._persistir(tarefa)
+        
+        with self._lock:
+            self.tarefas[nome] = tarefa
+        self._acordar.set()  # Recalcular o próximo despertar
+        return tarefa
     
     def configurar_agendamentos(self):
         """Configura todos os agendamentos"""
         # Limpeza de agendamentos anteriores
-        schedule.clear()
+        with self._lock:
+            self.tarefas.clear()
         
-        # Scraping completo a cada 2 horas
-        schedule.every(2).hours.do(self.executar_scraping_completo)
+        try:
+            self._agendamentos_persistidos = self.db.obter_agendamentos()
+        except Exception as e:
+            logger.error(f"Erro ao carregar agendamentos persistidos: {e}")
+            self._agendamentos_persistidos = {}
+        
+        # Scraping por (termo, site), com intervalo adaptado ao rendimento histórico
+        for termo in TERMOS_BUSCA:
+            for site in SITES_JOBSPY:
+                self.adicionar_tarefa(
+                    f"scraping:{site}:{termo}",
+                    lambda termo=termo, site=site: self.executar_scraping_termo_site(termo, site),
+                    self.calcular_intervalo_adaptativo(termo, site),
+                    jitter_segundos=600,
+                    politica_atraso=POLITICA_EXECUTAR_UMA,
+                    intervalo_dinamico=lambda termo=termo, site=site: self.calcular_intervalo_adaptativo(termo, site)
+                )
+        
+        # Selenium no LinkedIn como reserva: só coleta quando as buscas do JobsPy no LinkedIn estão falhando
+        self.adicionar_tarefa("scraping_selenium", self.executar_scraping_selenium,
+                              self.intervalo_base, jitter_segundos=600, politica_atraso=POLITICA_PULAR)
+        
+        # Rollups e índice de relevância atualizados uma vez para todos os scrapings que gravaram vagas
+        self.adicionar_tarefa("pos_ingestao", self.processar_pos_ingestao,
+                              5 * 60, politica_atraso=POLITICA_PULAR)
         
         # Verificação rápida a cada 10 minutos (estatísticas)
-        schedule.every(10).minutes.do(self.verificacao_rapida)
+        self.adicionar_tarefa("verificacao_rapida", self.verificacao_rapida,
+                              10 * 60, politica_atraso=POLITICA_PULAR)
+        
+        # Retenção diária (arquivamento + incremental_vacuum)
+        self.adicionar_tarefa("retencao", self.executar_retencao,
+                              24 * 3600, jitter_segundos=3600, politica_atraso=POLITICA_PULAR)
         
         logger.info("Agendamentos configurados:")
-        logger.info("- Scraping completo: a cada 2 horas")
+        logger.info(f"- Scraping por termo/site: {len(TERMOS_BUSCA) * len(SITES_JOBSPY)} jobs, "
+                    f"a cada {self.intervalo_minimo // 60}min-{self.intervalo_maximo // 3600}h conforme rendimento")
+        logger.info(f"- Selenium (LinkedIn): a cada {self.intervalo_base // 3600}h, se o JobsPy estiver falhando")
+        logger.info("- Rollups e índice de relevância: a cada 5 minutos, se houver vagas novas")
         logger.info("- Verificação rápida: a cada 10 minutos")
+        logger.info(f"- Retenção: diária, arquiva vagas com mais de {self.dias_retencao} dias")
+    
+    def calcular_ema_novas(self, termo, site):
+        """Média móvel exponencial de novas vagas por execução (None sem histórico)"""
+        ema = None
+        for _, novas_vagas in self.db.obter_historico_execucoes(termo, site):
+            ema = novas_vagas if ema is None else self.alfa_ema * novas_vagas + (1 - self.alfa_ema) * ema
+        return ema
     
-    def executar_scraping_completo(self):
-        """Executa o scraping completo"""
-        logger.info("🔄 Iniciando scraping completo agendado...")
+    def calcular_intervalo_adaptativo(self, termo, site):
+        """Intervalo de scraping de (termo, site): menor onde surgem mais vagas novas"""
         try:
-            novas_vagas = executar_scraping()
-            logger.info(f"✅ Scraping completo concluído! {novas_vagas} novas vagas encontradas.")
+            ema = self.calcular_ema_novas(termo, site)
         except Exception as e:
-            logger.error(f"❌ Erro no scraping completo: {e}")
+            logger.error(f"Erro ao ler histórico de '{termo}' em {site}: {e}")
+            ema = None
+        
+        if ema is None:
+            return self.intervalo_base
+        
+        intervalo = self.intervalo_base * self.alvo_novas_por_execucao / max(ema, 0.1)
+        return min(self.intervalo_maximo, max(self.intervalo_minimo, intervalo))
+    
+    def executar_scraping_termo_site(self, termo, site):
+        """Executa o scraping agendado de um (termo, site)"""
+        logger.info(f"🔄 Scraping agendado: '{termo}' em {site}")
+        try:
+            novas_vagas = obter_backend('jobspy_scraper')(pipeline=self.pipeline).executar_termo_site(termo, site)
+            if novas_vagas:
+                self._ingestao_pendente.set()
+        except Exception as e:
+            logger.error(f"❌ Erro no scraping de '{termo}' em {site}: {e}")
+    
+    def executar_scraping_selenium(self):
+        """Coleta pelo Selenium no LinkedIn quando todas as buscas recentes do JobsPy no LinkedIn falharam"""
+        execucoes, falhas = self.db.contar_execucoes_scraping('linkedin', time.time() - self.intervalo_base)
+        if not execucoes or falhas < execucoes:
+            logger.info("⏭️ Selenium dispensado: o JobsPy está coletando do LinkedIn")
+            return
+        
+        logger.info(f"🔄 JobsPy falhou nas {execucoes} buscas recentes no LinkedIn, coletando pelo Selenium...")
+        try:
+            novas_vagas = executar_backend('selenium', pipeline=self.pipeline)
+            logger.info(f"✅ Scraping pelo Selenium concluído! {novas_vagas} novas vagas encontradas.")
+            if novas_vagas:
+                self._ingestao_pendente.set()
+        except Exception as e:
+            logger.error(f"❌ Erro no scraping pelo Selenium: {e}")
+    
+    def processar_pos_ingestao(self):
+        """Atualiza rollups e índice de relevância se algum scraping gravou vagas desde a última execução"""
+        if not self._ingestao_pendente.is_set():
+            return
+        self._ingestao_pendente.clear()  # Antes de processar: vagas gravadas durante a atualização ficam para a próxima
+        self.atualizar_rollups()
+        self.atualizar_indice_relevancia()
+    
+    def atualizar_rollups(self):
+        """Consolida no rollup diário as vagas gravadas pelo último scraping"""
+        try:
+            self.db.atualizar_rollups()
+        except Exception as e:
+            logger.error(f"❌ Erro ao atualizar rollups diários: {e}")
+    
+    def obter_indice_relevancia(self):
+        """Índice TF-IDF mantido em memória entre os jobs (SciPy só é importado no primeiro uso)"""
+        with self._lock:
+            if self._indice_relevancia is None:
+                from relevancia import IndiceRelevancia
+                self._indice_relevancia = IndiceRelevancia(self.db)
+            return self._indice_relevancia
+    
+    def atualizar_indice_relevancia(self, reconstruir=False):
+        """Indexa (e persiste) as vagas novas para o ranking por relevância e calcula as similares delas"""
+        try:
+            indice = self.obter_indice_relevancia()
+            novas = indice.reconstruir() if reconstruir else indice.atualizar()
+            if novas:
+                logger.info(f"🎯 Índice de relevância: {novas} vaga(s) indexada(s)")
+            calculadas = indice.atualizar_similares()
+            if calculadas:
+                logger.info(f"🔗 Vagas similares calculadas para {calculadas} vaga(s)")
+        except Exception as e:
+            logger.error(f"❌ Erro ao atualizar o índice de relevância: {e}")
     
     def verificacao_rapida(self):
         """Verificação rápida do sistema"""
@@ -44,52 +240,129 @@ class SchedulerManager:
         # Aqui podemos adicionar verificações de saúde do sistema
         # Por exemplo, verificar se o banco está acessível
         try:
-            from database import DatabaseManager
-            db = DatabaseManager()
-            stats = db.obter_estatisticas()
+            stats = self.db.obter_estatisticas()
             logger.info(f"📊 Sistema ativo - Total de vagas: {stats['total_vagas']}")
         except Exception as e:
             logger.error(f"❌ Erro na verificação rápida: {e}")
     
+    def executar_retencao(self):
+        """Arquiva em Parquet e remove do banco as vagas antigas"""
+        try:
+            resumo = PoliticaRetencao(self.db, dias_retencao=self.dias_retencao).executar()
+        except Exception as e:
+            logger.error(f"❌ Erro na retenção: {e}")
+            return
+        
+        # As vagas arquivadas saem também do índice (e da frequência dos termos no IDF)
+        if resumo['arquivadas']:
+            self.atualizar_indice_relevancia(reconstruir=True)
+    
     def iniciar(self):
         """Inicia o scheduler em thread separada"""
         if not self.running:
             self.configurar_agendamentos()
             self.running = True
+            self._acordar.clear()
+            self._ingestao_pendente.set()  # Vagas gravadas antes de um reinício entram na primeira atualização
+            self.pipeline.iniciar()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="scheduler-job")
             self.thread = threading.Thread(target=self._executar_loop, daemon=True)
             self.thread.start()
             logger.info("🚀 Scheduler iniciado com sucesso!")
     
-    def parar(self):
-        """Para o scheduler"""
+    def parar(self, aguardar_jobs=False):
+        """Para o scheduler (o loop acorda imediatamente pelo Event). Jobs ainda em execução não
+        reabrem o pipeline: seus envios depois de finalizar() levantam PipelineEncerrado"""
         self.running = False
+        self._acordar.set()
         if self.thread:
             self.thread.join()
+        if self._executor:
+            self._executor.shutdown(wait=aguardar_jobs, cancel_futures=True)
+            self._executor = None
+        self.pipeline.finalizar()
         logger.info("⏹️ Scheduler parado.")
     
+    def _persistir(self, tarefa):
+        """Grava a próxima execução da tarefa no banco"""
+        try:
+            self.db.salvar_agendamento(tarefa.nome, tarefa.proxima_execucao, tarefa.ultima_execucao)
+        except Exception as e:
+            logger.error(f"Erro ao persistir agendamento '{tarefa.nome}': {e}")
+    
+    def _despachar_vencidas(self):
+        """Envia ao pool as tarefas vencidas e retorna o próximo instante de despertar"""
+        agora = time.time()
+        proximo_despertar = None
+        
+        with self._lock:
+            tarefas = list(self.tarefas.values())
+        
+        for tarefa in tarefas:
+            if not tarefa.em_execucao:
+                execucoes = tarefa.execucoes_pendentes(agora)
+                if tarefa.proxima_execucao <= agora:
+                    if execucoes == 0:
+                        logger.info(f"⏭️ Execuções perdidas de '{tarefa.nome}' descartadas")
+                    else:
+                        tarefa.em_execucao = True
+                        self._executor.submit(self._executar_tarefa, tarefa, execucoes)
+                    tarefa.proxima_execucao = tarefa.calcular_proxima(agora)
+                    self._persistir(tarefa)
+            
+            if not tarefa.em_execucao:
+                if proximo_despertar is None or tarefa.proxima_execucao < proximo_despertar:
+                    proximo_despertar = tarefa.proxima_execucao
+        
+        return proximo_despertar
+    
+    def _executar_tarefa(self, tarefa, execucoes):
+        """Executa uma tarefa no pool de workers"""
+        try:
+            for _ in range(execucoes):
+                if not self.running:
+                    break
+                tarefa.funcao()
+        except Exception as e:
+            logger.error(f"Erro na tarefa '{tarefa.nome}': {e}")
+        finally:
+            tarefa.ultima_execucao = time.time()
+            if tarefa.intervalo_dinamico:
+                tarefa.intervalo_segundos = tarefa.intervalo_dinamico()
+                tarefa.proxima_execucao = tarefa.calcular_proxima(tarefa.ultima_execucao)
+            tarefa.em_execucao = False
+            self._persistir(tarefa)
+            self._acordar.set()  # A tarefa volta a contar para o próximo despertar
+    
     def _executar_loop(self):
-        """Loop principal do scheduler"""
+        """Loop principal: dorme exatamente até o próximo job vencer"""
         while self.running:
             try:
-                schedule.run_pending()
-                time.sleep(60)  # Verificar a cada minuto
+                proximo_despertar = self._despachar_vencidas()
+                espera = None if proximo_despertar is None else max(0, proximo_despertar - time.time())
+                self._acordar.wait(espera)
+                self._acordar.clear()
             except Exception as e:
                 logger.error(f"Erro no loop do scheduler: {e}")
-                time.sleep(60)
+                self._acordar.wait(60)
+                self._acordar.clear()
     
     def status(self):
         """Retorna o status atual do scheduler"""
+        with self._lock:
+            proximas = [t.proxima_execucao for t in self.tarefas.values() if t.proxima_execucao]
         return {
             'running': self.running,
-            'jobs': len(schedule.jobs),
-            'next_run': str(schedule.next_run()) if schedule.jobs else "Nenhum job agendado"
+            'jobs': len(self.tarefas),
+            'next_run': str(datetime.fromtimestamp(min(proximas))) if proximas else "Nenhum job agendado"
         }
 
 def executar_scraping_inicial():
     """Executa uma primeira coleta de vagas"""
     logger.info("🎯 Executando scraping inicial...")
     try:
-        novas_vagas = executar_scraping()
+        novas_vagas = executar_backend('completo')
         logger.info(f"✅ Scraping inicial concluído! {novas_vagas} vagas coletadas.")
         return novas_vagas
     except Exception as e:
@@ -3,7 +3,7 @@ Scraper de vagas do LinkedIn usando JobsPy (Novo) + Selenium (Backup)
 JobsPy suporta: LinkedIn, Indeed, Glassdoor, Google, ZipRecruiter
 """
 
-from jobspy import scrape_jobs
+from cache_jobspy import scrape_jobs_cache
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -15,6 +15,10 @@ import time
 import random
 from datetime import datetime
 from database import DatabaseManager
+from pipeline import PipelineIngestao
+from salarios import formatar_salario
+from url_canonica import gerar_id_vaga
+from backends_scraping import TERMOS_BUSCA
 import logging
 
 # Configurar logging
@@ -22,20 +26,14 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 class LinkedInScraper:
-    def __init__(self, usar_jobspy=True):
+    def __init__(self, usar_jobspy=True, pipeline=None):
         self.db = DatabaseManager()
         self.driver = None
         self.usar_jobspy = usar_jobspy
+        self.pipeline = pipeline  # Pipeline compartilhado (ex: scheduler); se None, cada execução cria o seu
         
         # Configurações JobsPy
-        self.termos_busca = [
-            "Dados",
-            "BI", 
-            "Estágio em Dados",
-            "Estágio em Engenheiro de Dados",
-            "Estágio em Ciência de Dados",
-            "Estágio em BI"
-        ]
+        self.termos_busca = list(TERMOS_BUSCA)
         
         self.sites_jobspy = ["linkedin", "indeed", "google"]  # glassdoor, ziprecruiter, google pode dar problema
         
@@ -53,7 +51,8 @@ class LinkedInScraper:
         logger.info("Sites: LinkedIn, Indeed, ZipRecruiter, Google")
         logger.info("=" * 50)
         
-        total_novas_vagas = 0
+        pipeline = self.pipeline or PipelineIngestao(self.db)
+        lotes = []
         
         for termo in self.termos_busca:
             logger.info(f"\n🔍 Buscando vagas para: '{termo}'")
@@ -63,7 +62,7 @@ class LinkedInScraper:
                 google_search_term = f"{termo} empregos São Paulo últimos dias"
                 
                 # Fazer scraping
-                jobs_df = scrape_jobs(
+                jobs_df = scrape_jobs_cache(
                     site_name=self.sites_jobspy,
                     search_term=termo,
                     google_search_term=google_search_term,
@@ -81,25 +80,29 @@ class LinkedInScraper:
                 
                 logger.info(f"✅ {len(jobs_df)} vagas encontradas para '{termo}'")
                 
-                # Processar e salvar vagas
-                novas_vagas = 0
+                # Processar vagas e enviar para gravação (sem esperar o banco)
+                vagas_termo = []
                 for _, job_row in jobs_df.iterrows():
                     vaga_data = self.processar_vaga_jobspy(job_row, termo)
                     
-                    if vaga_data and self.db.inserir_vaga(vaga_data):
-                        novas_vagas += 1
-                        logger.info(f"  💾 {vaga_data['titulo']} - {vaga_data['empresa']} ({vaga_data['site_origem']})")
+                    if vaga_data:
+                        vagas_termo.append(vaga_data)
+                        logger.info(f"  📝 {vaga_data['titulo']} - {vaga_data['empresa']} ({vaga_data['site_origem']})")
                 
-                total_novas_vagas += novas_vagas
-                logger.info(f"✅ '{termo}': {novas_vagas} novas vagas salvas")
+                lotes.append(pipeline.enviar_lote(vagas_termo))
+                logger.info(f"✅ '{termo}': {len(vagas_termo)} vagas enviadas para gravação")
                 
                 # Pausa entre termos
                 time.sleep(random.uniform(3, 6))
-                
+            
             except Exception as e:
                 logger.error(f"❌ Erro para termo '{termo}': {e}")
                 continue
         
+        if pipeline is not self.pipeline:
+            pipeline.finalizar()
+        total_novas_vagas = sum(lote.aguardar() for lote in lotes)
+        
         logger.info(f"\n🎉 Scraping JobsPy concluído: {total_novas_vagas} novas vagas")
         return total_novas_vagas
     
@@ -123,7 +126,7 @@ class LinkedInScraper:
             
             # Outros campos
             localizacao = str(job_data.get('location', 'São Paulo, SP')).strip()
-            descricao = str(job_data.get('description', 'Descrição não disponível')).strip()[:1200]
+            descricao = str(job_data.get('description', 'Descrição não disponível')).strip()
             site_origem = str(job_data.get('site', 'Desconhecido'))
             data_postagem = str(job_data.get('date_posted', 'Não informado'))
             
@@ -131,21 +134,12 @@ class LinkedInScraper:
             job_type = str(job_data.get('job_type', 'Não informado'))
             is_remote = str(job_data.get('is_remote', 'Não informado'))
             
-            # Salário
-            salary_info = "Não informado"
+            # Salário (numérico para filtros, texto para exibição)
             min_amount = job_data.get('min_amount')
             max_amount = job_data.get('max_amount')
-            interval = job_data.get('interval', '')
-            
-            if min_amount or max_amount:
-                parts = []
-                if min_amount:
-                    parts.append(f"R$ {min_amount}")
-                if max_amount:
-                    parts.append(f"R$ {max_amount}")
-                if interval:
-                    parts.append(f"/{interval}")
-                salary_info = " - ".join(parts)
+            interval = job_data.get('interval')
+            currency = job_data.get('currency')
+            salary_info = formatar_salario(min_amount, max_amount, interval, currency)
             
             return {
                 'titulo': titulo,
@@ -160,9 +154,13 @@ class LinkedInScraper:
                 'job_type': job_type,
                 'is_remote': is_remote,
                 'salary_info': salary_info,
+                'salary_min': min_amount,
+                'salary_max': max_amount,
+                'salary_interval': interval,
+                'salary_currency': currency,
                 'keyword_busca': termo_busca
             }
-            
+        
         except Exception as e:
             logger.error(f"Erro ao processar vaga: {e}")
             return None
@@ -191,7 +189,7 @@ class LinkedInScraper:
             
             # Configurações adicionais para evitar detecção
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
+        
         except Exception as e:
             logger.error(f"❌ Erro ao configurar ChromeDriver: {e}")
             logger.error("Verifique se o Google Chrome está instalado corretamente")
@@ -214,14 +212,7 @@ class LinkedInScraper:
             
             for vaga_elemento in vagas_elementos[:10]:  # Limitar a 10 vagas por página
                 try:
-                    # Obter ID da vaga
-                    job_id = vaga_elemento.get_attribute('data-job-id')
-                    
-                    # Clicar na vaga para carregar detalhes
-                    self.driver.execute_script("arguments[0].click();", vaga_elemento)
-                    time.sleep(random.uniform(1, 3))
-                    
-                    # Extrair informações básicas
+                    # Extrair informações básicas (já presentes no card, sem abrir a vaga)
                     titulo_elemento = vaga_elemento.find_element(By.CSS_SELECTOR, "h3 a")
                     titulo = titulo_elemento.text.strip()
                     link = titulo_elemento.get_attribute('href')
@@ -233,6 +224,15 @@ class LinkedInScraper:
                     except NoSuchElementException:
                         empresa = "Não informado"
                     
+                    # Vagas já gravadas ou excluídas pelo usuário não são abertas de novo
+                    if self.db.vagas_conhecidas([gerar_id_vaga(titulo, empresa, link)]):
+                        logger.info(f"Vaga já conhecida, ignorada: {titulo} - {empresa}")
+                        continue
+                    
+                    # Clicar na vaga para carregar detalhes
+                    self.driver.execute_script("arguments[0].click();", vaga_elemento)
+                    time.sleep(random.uniform(1, 3))
+                    
                     # Localização
                     try:
                         localizacao_elemento = vaga_elemento.find_element(By.CSS_SELECTOR, "[data-test-id='job-search-card-location']")
@@ -264,7 +264,7 @@ class LinkedInScraper:
                     
                     vagas_extraidas.append(vaga_data)
                     logger.info(f"Vaga extraída: {titulo} - {empresa}")
-                    
+                
                 except Exception as e:
                     logger.error(f"Erro ao extrair vaga individual: {e}")
                     continue
@@ -296,13 +296,13 @@ class LinkedInScraper:
             for seletor in seletores_descricao:
                 try:
                     desc_element = descricao_elemento.find_element(By.CSS_SELECTOR, seletor)
-                    return desc_element.text.strip()[:1000]  # Limitar a 1000 caracteres
+                    return desc_element.text.strip()
                 except NoSuchElementException:
                     continue
             
             # Se não encontrar com seletores específicos, pegar texto geral
-            return descricao_elemento.text.strip()[:500]
-            
+            return descricao_elemento.text.strip()
+        
         except (TimeoutException, NoSuchElementException):
             return "Descrição não disponível"
     
@@ -323,7 +323,8 @@ class LinkedInScraper:
     
     def fazer_scraping_selenium(self):
         """Método original usando Selenium (backup)"""
-        total_novas_vagas = 0
+        pipeline = self.pipeline or PipelineIngestao(self.db)
+        lotes = []
         
         try:
             self.configurar_driver()
@@ -348,18 +349,13 @@ class LinkedInScraper:
                     # Extrair vagas
                     vagas = self.extrair_vagas_pagina(busca['keyword'])
                     
-                    # Salvar no banco de dados
-                    novas_vagas = 0
-                    for vaga in vagas:
-                        if self.db.inserir_vaga(vaga):
-                            novas_vagas += 1
-                    
-                    total_novas_vagas += novas_vagas
-                    logger.info(f"Keyword '{busca['keyword']}': {novas_vagas} novas vagas adicionadas")
+                    # Enviar para gravação no banco de dados
+                    lotes.append(pipeline.enviar_lote(vagas))
+                    logger.info(f"Keyword '{busca['keyword']}': {len(vagas)} vagas enviadas para gravação")
                     
                     # Pausa entre URLs
                     time.sleep(random.uniform(5, 10))
-                    
+                
                 except Exception as e:
                     logger.error(f"Erro ao processar URL para keyword '{busca['keyword']}': {e}")
                     continue
@@ -370,22 +366,25 @@ class LinkedInScraper:
         finally:
             if self.driver:
                 self.driver.quit()
+            if pipeline is not self.pipeline:
+                pipeline.finalizar()
         
+        total_novas_vagas = sum(lote.aguardar() for lote in lotes)
         logger.info(f"Scraping Selenium concluído. Total de novas vagas: {total_novas_vagas}")
         return total_novas_vagas
 
-def executar_scraping(usar_jobspy=True):
+def executar_scraping(usar_jobspy=True, pipeline=None):
     """Função para executar o scraping - pode ser chamada pelo scheduler"""
-    scraper = LinkedInScraper(usar_jobspy=usar_jobspy)
+    scraper = LinkedInScraper(usar_jobspy=usar_jobspy, pipeline=pipeline)
     return scraper.fazer_scraping()
 
 def executar_scraping_jobspy():
     """Função específica para JobsPy"""
     return executar_scraping(usar_jobspy=True)
 
-def executar_scraping_selenium():
+def executar_scraping_selenium(pipeline=None):
     """Função específica para Selenium"""
-    return executar_scraping(usar_jobspy=False)
+    return executar_scraping(usar_jobspy=False, pipeline=pipeline)
 
 if __name__ == "__main__":
     # Por padrão, usar JobsPy
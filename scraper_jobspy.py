@@ -5,34 +5,54 @@ LinkedIn, Indeed, Glassdoor, Google e ZipRecruiter
 
 import csv
 import pandas as pd
-from jobspy import scrape_jobs
+from cache_jobspy import scrape_jobs_cache
 from datetime import datetime, timedelta
 import logging
+import os
 import time
 import random
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from database import DatabaseManager
-import hashlib
+from pipeline import PipelineIngestao, LoteEnviado
+from collections import Counter
+from url_canonica import gerar_id_vaga
+from salarios import formatar_salario
+from backends_scraping import TERMOS_BUSCA, SITES_JOBSPY
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Capitais dos 27 estados brasileiros (formato aceito pelo JobsPy)
+CAPITAIS_BRASIL = [
+    "Rio Branco, AC, Brasil", "Maceió, AL, Brasil", "Macapá, AP, Brasil",
+    "Manaus, AM, Brasil", "Salvador, BA, Brasil", "Fortaleza, CE, Brasil",
+    "Brasília, DF, Brasil", "Vitória, ES, Brasil", "Goiânia, GO, Brasil",
+    "São Luís, MA, Brasil", "Cuiabá, MT, Brasil", "Campo Grande, MS, Brasil",
+    "Belo Horizonte, MG, Brasil", "Belém, PA, Brasil", "João Pessoa, PB, Brasil",
+    "Curitiba, PR, Brasil", "Recife, PE, Brasil", "Teresina, PI, Brasil",
+    "Rio de Janeiro, RJ, Brasil", "Natal, RN, Brasil", "Porto Alegre, RS, Brasil",
+    "Porto Velho, RO, Brasil", "Boa Vista, RR, Brasil", "Florianópolis, SC, Brasil",
+    "São Paulo, SP, Brasil", "Aracaju, SE, Brasil", "Palmas, TO, Brasil"
+]
+
+MAX_PROCESSOS_PADRAO = 4  # Processos do scraping multilocal quando max_processos não é informado
+
+class ErroScrapingSite(Exception):
+    """O site não respondeu depois das retentativas (rate limiting, erro 400, bloqueio)"""
+
 class JobSpyScraper:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, pipeline=None):
+        self._db = None
+        self.pipeline = pipeline  # Pipeline compartilhado (ex: scheduler); se None, cada execução cria o seu
         
         # Configurações de busca
-        self.termos_busca = [
-            "Dados",
-            "BI", 
-            "Estágio em Dados",
-            "Estágio em Engenheiro de Dados",
-            "Estágio em Ciência de Dados",
-            "Estágio em BI"
-        ]
+        self.termos_busca = list(TERMOS_BUSCA)
         
         # Sites para buscar (com tratamento específico para cada um)
-        self.sites = ["linkedin", "indeed", "google", "glassdoor", "ziprecruiter"]
+        self.sites = list(SITES_JOBSPY)
         
         # Configurações
         self.location = "São Paulo, SP, Brasil"
@@ -45,6 +65,28 @@ class JobSpyScraper:
         self.glassdoor_delay = 3  # Delay extra para Glassdoor (segundos)
         self.ziprecruiter_enabled = True  # Controle para habilitar/desabilitar ZipRecruiter
         
+        # Orçamento de requisições: por instância ou, no modo multilocal, por site e compartilhado
+        # entre os processos ((Lock, dict site -> próximo horário livre) de um multiprocessing.Manager)
+        self.intervalo_minimo_requisicoes = 2  # Segundos entre chamadas ao JobsPy
+        self.ultima_requisicao = None
+        self.orcamento_compartilhado = None
+    
+    @property
+    def db(self):
+        """Conexão com o banco criada sob demanda (workers do modo multilocal não a usam)"""
+        if self._db is None:
+            self._db = DatabaseManager()
+        return self._db
+    
+    def criar_pipeline(self, **kwargs):
+        """Retorna o pipeline compartilhado ou um novo, exclusivo desta execução"""
+        return self.pipeline or PipelineIngestao(self.db, **kwargs)
+    
+    def liberar_pipeline(self, pipeline):
+        """Finaliza o pipeline se ele foi criado só para esta execução"""
+        if pipeline is not self.pipeline:
+            pipeline.finalizar()
+    
     def gerar_google_search_term(self, search_term):
         """Gera termo de busca específico para Google Jobs"""
         return f"{search_term} jobs near São Paulo, Brazil since yesterday"
@@ -75,13 +117,12 @@ class JobSpyScraper:
             job_type = str(job_data.get('job_type', 'Não informado')).strip()
             is_remote = str(job_data.get('is_remote', 'Não informado')).strip()
             
-            # Salário
-            salary_info = "Não informado"
-            if job_data.get('min_amount') or job_data.get('max_amount'):
-                min_sal = job_data.get('min_amount', '')
-                max_sal = job_data.get('max_amount', '')
-                interval = job_data.get('interval', '')
-                salary_info = f"{min_sal}-{max_sal} {interval}".strip()
+            # Salário (numérico para filtros, texto para exibição)
+            salary_min = job_data.get('min_amount')
+            salary_max = job_data.get('max_amount')
+            salary_interval = job_data.get('interval')
+            salary_currency = job_data.get('currency')
+            salary_info = formatar_salario(salary_min, salary_max, salary_interval, salary_currency)
             
             # Validar campos obrigatórios
             if not titulo or titulo == 'nan':
@@ -96,7 +137,7 @@ class JobSpyScraper:
                 'empresa': empresa,
                 'localizacao': localizacao,
                 'area_vaga': localizacao,  # Usar localização como área por enquanto
-                'descricao': descricao[:1500],  # Limitar descrição
+                'descricao': descricao,  # Texto completo (comprimido no banco)
                 'link': link,
                 'data_postagem': data_postagem,
                 'numero_candidatos': "Não informado",  # JobsPy não retorna esse campo
@@ -104,20 +145,29 @@ class JobSpyScraper:
                 'job_type': job_type,
                 'is_remote': is_remote,
                 'salary_info': salary_info,
+                'salary_min': salary_min,
+                'salary_max': salary_max,
+                'salary_interval': salary_interval,
+                'salary_currency': salary_currency,
                 'keyword_busca': '',  # Será preenchido na função de scraping
                 'estado': '',  # Será preenchido na função de scraping
                 'local_busca': ''  # Será preenchido na função de scraping
             }
-            
+        
         except Exception as e:
             logger.error(f"Erro ao limpar dados da vaga: {e}")
             return None
     
-    def fazer_scraping_termo(self, search_term):
+    def fazer_scraping_termo(self, search_term, location=None):
         """Faz scraping para um termo específico"""
+        vagas_todas = list(self.iterar_vagas_termo(search_term, location))
+        logger.info(f"✅ Total processado para '{search_term}': {len(vagas_todas)} vagas")
+        return vagas_todas
+    
+    def iterar_vagas_termo(self, search_term, location=None):
+        """Gera as vagas de um termo, site a site, conforme cada um responde"""
         logger.info(f"🔍 Iniciando scraping para termo: '{search_term}'")
         
-        vagas_todas = []
         sites_a_tentar = self.sites.copy()
         
         # Verificar se ZipRecruiter está habilitado
@@ -128,111 +178,186 @@ class JobSpyScraper:
         
         # Tentar cada site separadamente para melhor controle de erros
         for site in sites_a_tentar:
-            retry_count = 0
-            site_success = False
+            try:
+                yield from self.fazer_scraping_site(search_term, site, location)
+            except ErroScrapingSite as e:
+                logger.error(f"⛔ {e} - seguindo para o próximo site")
             
-            while retry_count < self.max_retries and not site_success:
+            # Pausa entre sites
+            next_site_delay = random.uniform(3, 8)
+            logger.info(f"⏸️ Pausando {next_site_delay:.1f}s antes do próximo site...")
+            time.sleep(next_site_delay)
+    
+    def location_padrao(self):
+        """Localização usada quando nenhuma é informada explicitamente"""
+        if isinstance(self.location, str):
+            return self.location
+        return "São Paulo, SP, Brasil"
+    
+    def respeitar_orcamento_requisicoes(self, site=None):
+        """Garante o intervalo mínimo entre chamadas ao JobsPy desta instância
+        (ou, com o orçamento compartilhado, entre as chamadas de todos os processos ao mesmo site)"""
+        if self.orcamento_compartilhado is not None:
+            lock, proximas = self.orcamento_compartilhado
+            # Reserva o próximo horário livre do site sob o lock e espera fora dele
+            with lock:
+                agora = time.time()
+                horario = max(agora, proximas.get(site, 0))
+                proximas[site] = horario + self.intervalo_minimo_requisicoes
+            if horario > agora:
+                time.sleep(horario - agora)
+            return
+        
+        if self.ultima_requisicao is not None:
+            espera = self.intervalo_minimo_requisicoes - (time.time() - self.ultima_requisicao)
+            if espera > 0:
+                time.sleep(espera)
+        self.ultima_requisicao = time.time()
+    
+    def fazer_scraping_site(self, search_term, site, location=None):
+        """Faz scraping de um termo em um único site (com retentativas).
+        Levanta ErroScrapingSite se nenhuma tentativa der certo: uma busca bloqueada não é uma busca sem vagas"""
+        vagas_site = []
+        # Cópia local: o ajuste de localização do Glassdoor não afeta outras buscas
+        location_busca = location or self.location_padrao()
+        
+        retry_count = 0
+        site_success = False
+        ultimo_erro = None
+        
+        while retry_count < self.max_retries and not site_success:
+            try:
+                logger.info(f"🌐 Tentando site: {site} (tentativa {retry_count + 1}/{self.max_retries})")
+                
+                # Configurar termo para Google
+                termo_busca = search_term
+                if site == 'google':
+                    termo_busca = self.gerar_google_search_term(search_term)
+                
+                # Ajustes específicos por site
+                site_config = {}
+                
+                if site == 'linkedin':
+                    site_config['linkedin_fetch_description'] = True
+                
+                if site == 'indeed':
+                    site_config['country_indeed'] = self.country_indeed
+                
+                if site == 'glassdoor':
+                    # Reduzir expectations para Glassdoor (menos resultados, menos dados)
+                    site_results = max(3, self.results_wanted // 2)
+                    # Adicionar pausa extra antes do glassdoor
+                    time.sleep(self.glassdoor_delay)
+                else:
+                    site_results = self.results_wanted
+                
+                if site == 'ziprecruiter':
+                    # Reduzir expectations para ZipRecruiter (poucos resultados)
+                    site_results = max(2, self.results_wanted // 3)
+                
+                # Fazer scraping individual com timeout
                 try:
-                    logger.info(f"🌐 Tentando site: {site} (tentativa {retry_count + 1}/{self.max_retries})")
-                    
-                    # Configurar termo para Google
-                    termo_busca = search_term
-                    if site == 'google':
-                        termo_busca = self.gerar_google_search_term(search_term)
-                    
-                    # Ajustes específicos por site
-                    site_config = {}
-                    
-                    if site == 'linkedin':
-                        site_config['linkedin_fetch_description'] = True
-                    
-                    if site == 'indeed':
-                        site_config['country_indeed'] = self.country_indeed
-                    
-                    if site == 'glassdoor':
-                        # Reduzir expectations para Glassdoor (menos resultados, menos dados)
-                        site_results = max(3, self.results_wanted // 2)
-                        # Adicionar pausa extra antes do glassdoor
-                        time.sleep(self.glassdoor_delay)
-                    else:
-                        site_results = self.results_wanted
+                    jobs_df = scrape_jobs_cache(
+                        # Acertos do cache não esperam
+                        antes_da_requisicao=lambda: self.respeitar_orcamento_requisicoes(site),
+                        site_name=[site],  # Um site por vez
+                        search_term=termo_busca,
+                        location=location_busca,
+                        results_wanted=site_results,
+                        hours_old=self.hours_old,
+                        verbose=0,  # Reduzir logs
+                        **site_config
+                    )
                     
-                    if site == 'ziprecruiter':
-                        # Reduzir expectations para ZipRecruiter (poucos resultados)
-                        site_results = max(2, self.results_wanted // 3)
-                    
-                    # Fazer scraping individual com timeout
-                    try:
-                        jobs_df = scrape_jobs(
-                            site_name=[site],  # Um site por vez
-                            search_term=termo_busca,
-                            location=self.location,
-                            results_wanted=site_results,
-                            hours_old=self.hours_old,
-                            verbose=0,  # Reduzir logs
-                            **site_config
-                        )
+                    if jobs_df is not None and not jobs_df.empty:
+                        logger.info(f"✅ {len(jobs_df)} vagas encontradas em {site}")
                         
-                        if jobs_df is not None and not jobs_df.empty:
-                            logger.info(f"✅ {len(jobs_df)} vagas encontradas em {site}")
+                        # Processar vagas deste site
+                        for index, job_row in jobs_df.iterrows():
+                            vaga_limpa = self.limpar_e_validar_dados(job_row)
                             
-                            # Processar vagas deste site
-                            for index, job_row in jobs_df.iterrows():
-                                vaga_limpa = self.limpar_e_validar_dados(job_row)
-                                
-                                if vaga_limpa:
-                                    vaga_limpa['keyword_busca'] = search_term
-                                    vagas_todas.append(vaga_limpa)
-                                    logger.info(f"  📝 {vaga_limpa['titulo']} - {vaga_limpa['empresa']} ({site})")
-                            
-                            site_success = True
-                        else:
-                            logger.warning(f"⚠️ Nenhuma vaga encontrada em {site}")
-                            site_success = True  # Considerar sucesso mesmo sem resultados
-                    
-                    except Exception as site_error:
-                        # Tratar erros específicos por site
-                        if site == 'ziprecruiter' and '429' in str(site_error):
-                            logger.error(f"⛔ ZipRecruiter está bloqueando por rate limiting. Desabilitando temporariamente.")
-                            self.ziprecruiter_enabled = False
-                            break  # Sair do loop de retry para este site
+                            if vaga_limpa:
+                                vaga_limpa['keyword_busca'] = search_term
+                                vagas_site.append(vaga_limpa)
+                                logger.info(f"  📝 {vaga_limpa['titulo']} - {vaga_limpa['empresa']} ({site})")
                         
-                        if site == 'glassdoor' and ('400' in str(site_error) or 'location not parsed' in str(site_error).lower()):
-                            logger.error(f"⛔ Glassdoor erro 400 ou problema de localização. Ajustando parâmetros.")
-                            # Tentar ajustar a localização para próxima tentativa
-                            self.location = "São Paulo, Brasil" if retry_count == 0 else "São Paulo"
-                        
-                        logger.error(f"❌ Erro no site {site} (tentativa {retry_count + 1}): {site_error}")
-                        retry_count += 1
-                        
-                        # Esperar mais tempo entre retentativas
-                        backoff_time = 5 + (retry_count * 3)
-                        logger.info(f"⏱️ Aguardando {backoff_time}s antes de tentar novamente...")
-                        time.sleep(backoff_time)
+                        site_success = True
+                    else:
+                        logger.warning(f"⚠️ Nenhuma vaga encontrada em {site}")
+                        site_success = True  # Considerar sucesso mesmo sem resultados
                 
-                except Exception as e:
-                    logger.error(f"❌ Erro geral no site {site}: {e}")
+                except Exception as site_error:
+                    ultimo_erro = site_error
+                    # Tratar erros específicos por site
+                    if site == 'ziprecruiter' and '429' in str(site_error):
+                        logger.error(f"⛔ ZipRecruiter está bloqueando por rate limiting. Desabilitando temporariamente.")
+                        self.ziprecruiter_enabled = False
+                        break  # Sair do loop de retry para este site
+                    
+                    if site == 'glassdoor' and ('400' in str(site_error) or 'location not parsed' in str(site_error).lower()):
+                        logger.error(f"⛔ Glassdoor erro 400 ou problema de localização. Ajustando parâmetros.")
+                        # Tentar ajustar a localização para próxima tentativa
+                        location_busca = "São Paulo, Brasil" if retry_count == 0 else "São Paulo"
+                    
+                    logger.error(f"❌ Erro no site {site} (tentativa {retry_count + 1}): {site_error}")
                     retry_count += 1
+                    
+                    # Esperar mais tempo entre retentativas
+                    backoff_time = 5 + (retry_count * 3)
+                    logger.info(f"⏱️ Aguardando {backoff_time}s antes de tentar novamente...")
+                    time.sleep(backoff_time)
             
-            # Pausa entre sites
-            next_site_delay = random.uniform(3, 8)
-            logger.info(f"⏸️ Pausando {next_site_delay:.1f}s antes do próximo site...")
-            time.sleep(next_site_delay)
-        
-        # Restaurar configuração de local padrão caso tenha sido alterada
-        self.location = "São Paulo, SP, Brasil"
+            except Exception as e:
+                ultimo_erro = e
+                logger.error(f"❌ Erro geral no site {site}: {e}")
+                retry_count += 1
         
-        logger.info(f"✅ Total processado para '{search_term}': {len(vagas_todas)} vagas")
-        return vagas_todas
+        if not site_success:
+            raise ErroScrapingSite(f"Falha em {site} para '{search_term}': {ultimo_erro}")
+        return vagas_site
     
-    def fazer_scraping(self):
-        """Executa o processo de scraping para todos os termos e todas as localizações"""
-        logger.info("🚀 Iniciando processo de scraping...")
-        start_time = time.time()
+    def extrair_estado(self, location):
+        """Extrai a sigla do estado de uma localização de busca (ex: 'São Paulo, SP, Brasil')"""
+        if "," in location:
+            partes = location.split(",")
+            if len(partes) >= 2:
+                estado_part = partes[1].strip()
+                # Verificar se é um código de estado (SP, RJ, etc)
+                if len(estado_part) <= 3:
+                    return estado_part
+        return None
+    
+    def executar_termo_site(self, search_term, site, location=None):
+        """Faz scraping de um (termo, site), salva as vagas e registra a execução no histórico"""
+        inicio = time.time()
+        location = location or self.location_padrao()
+        total_encontradas = 0
+        novas_vagas = 0
+        erro = None
         
-        # Lista de resultados para todos os termos e localizações
-        resultados_finais = []
+        try:
+            vagas = self.fazer_scraping_site(search_term, site, location)
+            total_encontradas = len(vagas)
+            
+            for vaga in vagas:
+                vaga['local_busca'] = location
+                vaga['estado'] = self.extrair_estado(location)
+            
+            pipeline = self.criar_pipeline()
+            lote = pipeline.enviar_lote(vagas)
+            self.liberar_pipeline(pipeline)
+            novas_vagas = lote.aguardar()
+        except Exception as e:
+            erro = str(e)
+            logger.error(f"❌ Erro ao processar '{search_term}' em {site}: {e}")
         
+        self.db.registrar_execucao_scraping(search_term, site, inicio, time.time(),
+                                            total_encontradas, novas_vagas, erro)
+        logger.info(f"✅ '{search_term}' em {site}: {novas_vagas} novas de {total_encontradas} vagas")
+        return novas_vagas
+    
+    def obter_locations(self):
+        """Normaliza a configuração de localização em uma lista (no máximo 3)"""
         # Tentar com diferentes formatos de localização se múltiplas estiverem configuradas
         locations = []
         if isinstance(self.location, str):
@@ -245,46 +370,48 @@ class JobSpyScraper:
             # Fallback para SP
             locations = ["São Paulo, SP, Brasil"]
             logger.warning("⚠️ Formato de localização inválido, usando São Paulo como padrão")
-
+        
         # Usar no máximo 3 localizações para evitar bloqueios
         if len(locations) > 3:
-            logger.warning(f"⚠️ Muitas localizações ({len(locations)}), limitando a 3 para evitar bloqueios")
+            logger.warning(f"⚠️ Muitas localizações ({len(locations)}), limitando a 3 para evitar bloqueios "
+                           f"(use fazer_scraping_multilocal para buscar em paralelo)")
             locations = locations[:3]
         
+        return locations
+    
+    def iterar_vagas(self, locations=None):
+        """Gera as vagas normalizadas (sem duplicatas) à medida que cada site responde,
+        para todos os termos e localizações"""
+        locations = locations or self.obter_locations()
         logger.info(f"🌎 Buscando em {len(locations)} localização(ões): {locations}")
         
+        vistos = set()  # Apenas os hashes, para a memória não crescer com as vagas
+        
         # Para cada localização
         for loc_index, current_location in enumerate(locations):
             logger.info(f"🌍 Processando localização {loc_index+1}/{len(locations)}: {current_location}")
-            
-            # Atualizar localização atual
-            self.location = current_location
+            estado = self.extrair_estado(current_location)
             
             # Para cada termo de busca
             for term_index, search_term in enumerate(self.termos_busca):
                 logger.info(f"🔍 Termo {term_index+1}/{len(self.termos_busca)}: '{search_term}' em '{current_location}'")
+                encontradas = 0
                 
                 try:
-                    vagas_termo = self.fazer_scraping_termo(search_term)
-                    
-                    # Adicionar informação de localização explícita
-                    for vaga in vagas_termo:
+                    for vaga in self.iterar_vagas_termo(search_term, current_location):
+                        # Adicionar informação de localização explícita
                         vaga['local_busca'] = current_location
+                        vaga['estado'] = estado
                         
-                        # Extrair estado da localização (se possível)
-                        estado = None
-                        if "," in current_location:
-                            partes = current_location.split(",")
-                            if len(partes) >= 2:
-                                estado_part = partes[1].strip()
-                                # Verificar se é um código de estado (SP, RJ, etc)
-                                if len(estado_part) <= 3:
-                                    estado = estado_part
+                        vaga['hash_id'] = gerar_id_vaga(vaga['titulo'], vaga['empresa'], vaga['link'])
+                        if vaga['hash_id'] in vistos:
+                            continue
+                        vistos.add(vaga['hash_id'])
                         
-                        vaga['estado'] = estado
-                        resultados_finais.append(vaga)
+                        encontradas += 1
+                        yield vaga
                     
-                    logger.info(f"✅ Encontradas {len(vagas_termo)} vagas para '{search_term}' em '{current_location}'")
+                    logger.info(f"✅ Encontradas {encontradas} vagas para '{search_term}' em '{current_location}'")
                 
                 except Exception as e:
                     logger.error(f"❌ Erro ao processar termo '{search_term}' em '{current_location}': {e}")
@@ -300,28 +427,16 @@ class JobSpyScraper:
                 pausa = random.uniform(8, 15)
                 logger.info(f"⏸️ Pausando {pausa:.1f}s antes da próxima localização...")
                 time.sleep(pausa)
+    
+    def fazer_scraping(self):
+        """Executa o processo de scraping para todos os termos e todas as localizações"""
+        logger.info("🚀 Iniciando processo de scraping...")
+        start_time = time.time()
         
-        # Converte para DataFrame
-        if resultados_finais:
-            df_final = pd.DataFrame(resultados_finais)
-            
-            # Calcular hash_id para cada vaga
-            if 'hash_id' not in df_final.columns:
-                logger.info("🔑 Gerando hash_id para cada vaga...")
-                
-                # Função para gerar hash único para cada vaga
-                def gerar_hash_id(row):
-                    dados = f"{row['titulo']}{row['empresa']}{row['link']}"
-                    return hashlib.md5(dados.encode('utf-8')).hexdigest()
-                
-                df_final['hash_id'] = df_final.apply(gerar_hash_id, axis=1)
-            
-            # Remove duplicatas com base no hash_id
-            df_antes = len(df_final)
-            df_final = df_final.drop_duplicates(subset=['hash_id'])
-            
-            duplicatas = df_antes - len(df_final)
-            logger.info(f"✅ Removidas {duplicatas} duplicatas")
+        # Converte para DataFrame (duplicatas já removidas pelo gerador)
+        df_final = pd.DataFrame(list(self.iterar_vagas()))
+        
+        if not df_final.empty:
             logger.info(f"✅ Total após remoção de duplicatas: {len(df_final)} vagas")
             
             # Calcular tempo total
@@ -333,46 +448,104 @@ class JobSpyScraper:
             logger.warning("⚠️ Nenhuma vaga encontrada em nenhum site!")
             return pd.DataFrame()
     
+    def fazer_scraping_multilocal(self, locations=None, max_processos=None, tamanho_lote=50):
+        """Busca em várias localizações em paralelo em um pool de processos (por padrão o menor entre
+        localizações, CPUs e MAX_PROCESSOS_PADRAO; max_processos=len(locations) dá um processo por
+        localização), com o orçamento de requisições de cada site dividido entre todos os processos
+        e as vagas gravadas em lotes por um único escritor"""
+        locations = locations or CAPITAIS_BRASIL
+        max_processos = max_processos or min(len(locations), os.cpu_count() or 2, MAX_PROCESSOS_PADRAO)
+        logger.info(f"🚀 Scraping multilocal: {len(locations)} localizações em {max_processos} processos")
+        start_time = time.time()
+        
+        config = {
+            'termos_busca': self.termos_busca,
+            'sites': self.sites,
+            'results_wanted': self.results_wanted,
+            'hours_old': self.hours_old,
+            'country_indeed': self.country_indeed,
+            'max_retries': self.max_retries,
+            'ziprecruiter_enabled': self.ziprecruiter_enabled,
+            'intervalo_minimo_requisicoes': self.intervalo_minimo_requisicoes
+        }
+        
+        total_encontradas = 0
+        pipeline = self.criar_pipeline(tamanho_lote=tamanho_lote)
+        lotes = []
+        
+        contexto = multiprocessing.get_context("spawn")
+        with contexto.Manager() as manager:
+            fila = manager.Queue(maxsize=1000)
+            # Mais processos não aumentam a taxa de requisições a cada site
+            config['orcamento_compartilhado'] = (manager.Lock(), manager.dict())
+            
+            with ProcessPoolExecutor(max_workers=max_processos, mp_context=contexto) as executor:
+                futuros = [executor.submit(_worker_localizacao, location, config, fila) for location in locations]
+                
+                # Repassa as vagas dos workers ao escritor único do pipeline
+                while True:
+                    try:
+                        vagas = fila.get(timeout=1)
+                    except queue.Empty:
+                        if all(f.done() for f in futuros) and fila.empty():
+                            break
+                        continue
+                    
+                    total_encontradas += len(vagas)
+                    lotes.append(pipeline.enviar_lote(vagas))
+                
+                for location, futuro in zip(locations, futuros):
+                    if futuro.exception():
+                        logger.error(f"❌ Worker de '{location}' falhou: {futuro.exception()}")
+        
+        self.liberar_pipeline(pipeline)
+        total_novas = sum(lote.aguardar() for lote in lotes)
+        
+        tempo_total = time.time() - start_time
+        logger.info(f"🎉 Multilocal concluído: {total_encontradas} vagas encontradas, "
+                    f"{total_novas} novas salvas em {tempo_total:.1f}s")
+        return total_novas
+    
     def fazer_scraping_completo(self):
-        """Executa scraping completo para todos os termos"""
+        """Executa scraping completo para todos os termos, gravando cada vaga assim que chega"""
         logger.info("🚀 INICIANDO SCRAPING COMPLETO COM JOBSPY")
         logger.info("=" * 60)
         
-        total_novas_vagas = 0
+        sites_stats = Counter()
+        loc_stats = Counter()
         
-        # Obter DataFrame com todos os resultados
-        df_vagas = self.fazer_scraping()
+        # Salvar vagas no banco à medida que cada site responde
+        pipeline = self.criar_pipeline()
+        lote = LoteEnviado()
+        try:
+            for vaga in self.iterar_vagas():
+                pipeline.enviar(vaga, lote=lote)
+                sites_stats[vaga['site_origem']] += 1
+                loc_stats[vaga['local_busca']] += 1
+        finally:
+            # Mesmo se o scraping for interrompido, o que já foi coletado é gravado
+            self.liberar_pipeline(pipeline)
+        total_novas_vagas = lote.aguardar()
         
-        # Salvar vagas no banco
-        if not df_vagas.empty:
-            for _, vaga in df_vagas.iterrows():
-                try:
-                    vaga_dict = vaga.to_dict()
-                    if self.db.inserir_vaga(vaga_dict):
-                        total_novas_vagas += 1
-                except Exception as e:
-                    logger.error(f"Erro ao inserir vaga no banco: {e}")
-            
+        total_encontradas = sum(sites_stats.values())
+        if total_encontradas:
             # Relatório final
             logger.info("=" * 60)
             logger.info(f"🎉 SCRAPING CONCLUÍDO!")
-            logger.info(f"📊 Total de vagas encontradas: {len(df_vagas)}")
+            logger.info(f"📊 Total de vagas encontradas: {total_encontradas}")
             logger.info(f"💾 Total de novas vagas salvas: {total_novas_vagas}")
             
             # Estatísticas por site
-            sites_stats = df_vagas['site_origem'].value_counts().to_dict()
-            
             logger.info("\n📈 ESTATÍSTICAS POR SITE:")
             for site, count in sorted(sites_stats.items()):
                 logger.info(f"  {site}: {count} vagas")
             
             # Estatísticas por localização
-            if 'local_busca' in df_vagas.columns:
-                loc_stats = df_vagas['local_busca'].value_counts().to_dict()
-                
-                logger.info("\n� ESTATÍSTICAS POR LOCALIZAÇÃO:")
-                for loc, count in sorted(loc_stats.items()):
-                    logger.info(f"  {loc}: {count} vagas")
+            logger.info("\n📍 ESTATÍSTICAS POR LOCALIZAÇÃO:")
+            for loc, count in sorted(loc_stats.items()):
+                logger.info(f"  {loc}: {count} vagas")
+        else:
+            logger.warning("⚠️ Nenhuma vaga encontrada em nenhum site!")
         
         return total_novas_vagas
     
@@ -388,18 +561,46 @@ class JobSpyScraper:
         except Exception as e:
             logger.error(f"❌ Erro ao salvar backup: {e}")
 
+def _worker_localizacao(location, config, fila):
+    """Processo worker do modo multilocal: busca todos os termos em uma localização
+    com sua própria instância de scraper e envia as vagas pela fila"""
+    scraper = JobSpyScraper()
+    for atributo, valor in config.items():
+        setattr(scraper, atributo, valor)
+    
+    total = 0
+    buffer = []
+    for vaga in scraper.iterar_vagas([location]):
+        buffer.append(vaga)
+        if len(buffer) >= 20:
+            fila.put(buffer)
+            total += len(buffer)
+            buffer = []
+    
+    if buffer:
+        fila.put(buffer)
+        total += len(buffer)
+    
+    return total
+
 def executar_scraping_jobspy():
     """Função principal para executar o scraping"""
     scraper = JobSpyScraper()
     return scraper.fazer_scraping_completo()
 
+def executar_scraping_jobspy_multilocal(locations=None, max_processos=None):
+    """Executa o scraping em paralelo nas capitais (ou localizações informadas)"""
+    scraper = JobSpyScraper()
+    return scraper.fazer_scraping_multilocal(locations, max_processos)
+
 def teste_jobspy():
     """Teste rápido do JobsPy"""
     logger.info("🧪 TESTE RÁPIDO DO JOBSPY")
     
     try:
-        # Teste simples com um termo
-        jobs = scrape_jobs(
+        # Teste simples com um termo (sempre consulta o site, sem passar pelo cache)
+        jobs = scrape_jobs_cache(
+            forcar_atualizacao=True,
             site_name=["indeed"],  # Apenas Indeed para teste
             search_term="Dados",
             location="São Paulo",
@@ -418,7 +619,7 @@ def teste_jobspy():
         else:
             logger.warning("❌ Teste falhou: Nenhuma vaga encontrada")
             return False
-            
+    
     except Exception as e:
         logger.error(f"❌ Erro no teste: {e}")
         return False
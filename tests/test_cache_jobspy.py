@@ -0,0 +1,92 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import cache_jobspy
+from cache_jobspy import CacheJobSpy
+
+
+@pytest.fixture
+def chamadas(monkeypatch):
+    chamadas = []
+    
+    def scrape_jobs(**params):
+        chamadas.append(params)
+        return pd.DataFrame([{'title': f"Vaga {len(chamadas)}", 'site': params['site_name'][0]}])
+    
+    monkeypatch.setattr(cache_jobspy, 'scrape_jobs', scrape_jobs)
+    return chamadas
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheJobSpy(diretorio=str(tmp_path / "cache"), ttl_por_site={'linkedin': 60, 'google': 600})
+
+
+def busca(termo="Engenheiro de Dados", sites=('linkedin',)):
+    return {'site_name': list(sites), 'search_term': termo, 'location': "São Paulo, SP", 'verbose': 0}
+
+
+def envelhecer(caminho, segundos):
+    info = os.stat(caminho)
+    os.utime(caminho, (info.st_atime, info.st_mtime - segundos))
+
+
+def test_buscas_equivalentes_usam_a_mesma_entrada(cache, chamadas):
+    cache.scrape_jobs(**busca())
+    df = cache.scrape_jobs(**busca(termo="  engenheiro   de DADOS ") | {'verbose': 2})
+    
+    assert len(chamadas) == 1
+    assert df['title'].tolist() == ["Vaga 1"]
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+
+def test_entrada_expira_pelo_menor_ttl_dos_sites(cache, chamadas):
+    params = busca(sites=('google', 'linkedin'))
+    assert cache.obter_ttl(params) == 60
+    cache.scrape_jobs(**params)
+    
+    envelhecer(cache.caminho(cache.gerar_chave(params)), 61)
+    cache.scrape_jobs(**params)
+    assert len(chamadas) == 2
+
+
+def test_callback_de_requisicao_so_roda_quando_o_cache_falha(cache, chamadas):
+    requisicoes = []
+    for _ in range(3):
+        cache.scrape_jobs(antes_da_requisicao=lambda: requisicoes.append(time.time()), **busca())
+    assert len(requisicoes) == 1
+    
+    cache.scrape_jobs(forcar_atualizacao=True, antes_da_requisicao=lambda: requisicoes.append(time.time()),
+                      **busca())
+    assert len(requisicoes) == 2
+
+
+def test_entradas_menos_usadas_saem_primeiro(cache, chamadas):
+    termos = ["Dados", "Backend", "Frontend"]
+    caminhos = []
+    for termo in termos:
+        cache.scrape_jobs(**busca(termo))
+        caminhos.append(cache.caminho(cache.gerar_chave(busca(termo))))
+    
+    # Último acesso: Backend há mais tempo, depois Dados, e Frontend por último
+    agora = time.time()
+    for caminho, atraso in zip(caminhos, [200, 300, 100]):
+        os.utime(caminho, (agora - atraso, os.stat(caminho).st_mtime))
+    
+    cache.tamanho_maximo = os.stat(caminhos[0]).st_size + os.stat(caminhos[2]).st_size
+    cache.remover_excedente()
+    assert [os.path.exists(caminho) for caminho in caminhos] == [True, False, True]
+
+
+def test_entradas_expiradas_ha_um_dia_e_pickles_antigos_sao_removidos(cache, chamadas):
+    cache.scrape_jobs(**busca())
+    caminho = cache.caminho(cache.gerar_chave(busca()))
+    antigo = os.path.join(cache.diretorio, "entrada" + cache_jobspy.EXTENSAO_ANTIGA)
+    open(antigo, 'wb').close()
+    envelhecer(caminho, 25 * 3600)
+    
+    cache.remover_excedente()
+    assert os.listdir(cache.diretorio) == []
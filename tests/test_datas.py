@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datas import formatar_epoch, parsear_data
+
+REFERENCIA = 1_700_000_000  # 2023-11-14T22:13:20Z
+HORA, DIA = 3600, 86400
+
+
+@pytest.mark.parametrize("texto, atraso", [
+    ("há 2 horas", 2 * HORA),
+    ("Publicada há 3 dias", 3 * DIA),
+    ("reposted 2 weeks ago", 14 * DIA),
+    ("30+ days ago", 30 * DIA),
+    ("1 month ago", 30 * DIA),
+    ("há 5 meses", 150 * DIA),
+    ("agora mesmo", 0),
+    ("Ontem", DIA),
+    ("hoje", 0),
+    ("posted today", 0),
+    ("publicada hoje", 0),
+    ("Posted yesterday", DIA),
+    ("reposted just now", 0),
+])
+def test_datas_relativas_contam_a_partir_da_referencia(texto, atraso):
+    assert parsear_data(texto, REFERENCIA) == REFERENCIA - atraso
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("2024-01-02", "2024-01-02T00:00:00Z"),
+    ("2024-01-02T10:30:00Z", "2024-01-02T10:30:00Z"),
+    ("2024-01-02T10:30:00-03:00", "2024-01-02T13:30:00Z"),
+    ("02/01/2024", "2024-01-02T00:00:00Z"),
+    (date(2024, 1, 2), "2024-01-02T00:00:00Z"),
+    (datetime(2024, 1, 2, 10, 30), "2024-01-02T10:30:00Z"),
+    (datetime(2024, 1, 2, 10, 30, tzinfo=timezone(timedelta(hours=-3))), "2024-01-02T13:30:00Z"),
+    (pd.Timestamp("2024-01-02 10:30"), "2024-01-02T10:30:00Z"),
+])
+def test_datas_absolutas_viram_epoch_utc(valor, esperado):
+    assert formatar_epoch(parsear_data(valor, REFERENCIA), '%Y-%m-%dT%H:%M:%SZ', utc=True) == esperado
+
+
+@pytest.mark.parametrize("valor", [1_704_153_600, 1_704_153_600.0, np.int64(1_704_153_600),
+                                   np.int32(1_704_153_600), np.float64(1_704_153_600.0)])
+def test_epochs_numericos_sao_mantidos(valor):
+    assert parsear_data(valor) == 1_704_153_600
+
+
+@pytest.mark.parametrize("valor", [None, "", "Não informado", "nan", float('nan'), np.nan, pd.NaT,
+                                   "há muito tempo", "data inválida"])
+def test_valores_vazios_ou_desconhecidos_viram_none(valor):
+    assert parsear_data(valor, REFERENCIA) is None
+
+
+def test_formatar_epoch_sem_valor():
+    assert formatar_epoch(None) == 'Não informado'
+    assert formatar_epoch(float('nan')) == 'Não informado'
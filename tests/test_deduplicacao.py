@@ -0,0 +1,84 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from database import DatabaseManager
+from deduplicacao import DetectorDuplicatas, gerar_shingles, normalizar_texto, similaridade_titulos
+
+DESCRICAO = ("Buscamos pessoa engenheira de dados para construir pipelines em Python, Spark e Airflow, "
+             "modelar o data lake na AWS e garantir a qualidade dos dados consumidos pelos times de produto. "
+             "Benefícios: plano de saúde, vale refeição e trabalho remoto.")
+
+
+def vaga(titulo, site, numero, descricao=DESCRICAO):
+    return {'titulo': titulo, 'empresa': "Acme Tecnologia", 'descricao': descricao, 'site_origem': site,
+            'link': f"https://www.{site}.com/jobs/view/{numero}"}
+
+
+def clusters(db):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return dict(conn.execute("SELECT titulo || ' @ ' || site_origem, cluster_id FROM vagas").fetchall())
+    finally:
+        conn.close()
+
+
+def test_normalizacao_ignora_acentos_caixa_e_pontuacao():
+    assert normalizar_texto("Engenheiro(a) de Dados — SÊNIOR!") == "engenheiro a de dados senior"
+    assert gerar_shingles("Dev", "Acme") == {"dev acme"}
+
+
+def test_bandas_iguais_geram_a_mesma_chave_e_bandas_diferentes_nao_colidem():
+    detector = DetectorDuplicatas(num_permutacoes=8, num_bandas=4)
+    assinatura = np.arange(8, dtype=np.int64)
+    outra = assinatura.copy()
+    outra[2:] += 100  # Só a primeira banda é igual
+    
+    chaves, chaves_outra = detector.chaves_bandas(assinatura), detector.chaves_bandas(outra)
+    assert chaves[0] == chaves_outra[0]
+    assert not set(chaves[1:]) & set(chaves_outra[1:])
+    
+    # O número da banda entra na chave: valores iguais em bandas diferentes não colidem
+    repetida = np.zeros(8, dtype=np.int64)
+    assert len(set(detector.chaves_bandas(repetida))) == 4
+
+
+def test_assinaturas_estimam_a_similaridade_de_jaccard():
+    detector = DetectorDuplicatas()
+    base = gerar_shingles("Engenheiro de Dados", "Acme", DESCRICAO)
+    assinatura = detector.calcular_assinatura(base)
+    assert detector.similaridade(assinatura, detector.calcular_assinatura(set(base))) == 1.0
+    
+    metade = set(sorted(base)[:len(base) // 2])
+    estimada = detector.similaridade(assinatura, detector.calcular_assinatura(metade))
+    assert abs(estimada - len(metade) / len(base)) < 0.15
+
+
+def test_bandas_devem_dividir_as_permutacoes():
+    with pytest.raises(ValueError):
+        DetectorDuplicatas(num_permutacoes=100, num_bandas=16)
+
+
+def test_mesma_vaga_em_sites_diferentes_entra_no_mesmo_cluster(tmp_path):
+    db = DatabaseManager(str(tmp_path / "vagas.db"))
+    db.inserir_vaga(vaga("Engenheiro de Dados", 'linkedin', 1))
+    db.inserir_vaga(vaga("Engenheiro(a) de Dados", 'indeed', 2, DESCRICAO + " Inscreva-se já."))
+    
+    grupos = clusters(db)
+    assert grupos["Engenheiro de Dados @ linkedin"] == grupos["Engenheiro(a) de Dados @ indeed"]
+
+
+def test_titulo_diferente_com_o_mesmo_texto_da_empresa_fica_em_outro_cluster(tmp_path):
+    db = DatabaseManager(str(tmp_path / "vagas.db"))
+    db.inserir_vaga(vaga("Engenheiro de Dados", 'linkedin', 1))
+    db.inserir_vaga(vaga("Designer de Produto", 'linkedin', 2))
+    
+    # O texto compartilhado passa do limiar do MinHash: quem separa as vagas é o título
+    detector = DetectorDuplicatas()
+    assinaturas = [detector.calcular_assinatura(gerar_shingles(titulo, "Acme Tecnologia", DESCRICAO))
+                   for titulo in ("Engenheiro de Dados", "Designer de Produto")]
+    assert detector.similaridade(*assinaturas) >= detector.limiar
+    assert similaridade_titulos("Engenheiro de Dados", "Designer de Produto") < detector.limiar_titulo
+    grupos = clusters(db)
+    assert grupos["Engenheiro de Dados @ linkedin"] != grupos["Designer de Produto @ linkedin"]
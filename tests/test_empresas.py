@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+
+from empresas import ResolvedorEmpresas, chave_empresa
+
+
+@pytest.fixture
+def resolver():
+    cursor = sqlite3.connect(":memory:").cursor()
+    resolvedor = ResolvedorEmpresas()
+    resolvedor.criar_tabelas(cursor)
+    return lambda *nomes: [resolvedor.resolver(cursor, nome) for nome in nomes]
+
+
+def test_chave_sem_acentos_e_sufixos():
+    assert chave_empresa("Itaú Unibanco S.A.") == "itau unibanco"
+    assert chave_empresa("ACME Ltda.") == "acme"
+
+
+@pytest.mark.parametrize("nomes", [
+    ["Itaú Unibanco", "Itau Unibanco S.A.", "ITAÚ"],
+    ["Itaú Unibanco", "Itau Unibaco"],
+    ["Mercado Livre", "MercadoLivre"],
+    ["Banco Inter", "Banco Inter S/A"],
+])
+def test_grafias_da_mesma_empresa(resolver, nomes):
+    assert len(set(resolver(*nomes))) == 1
+
+
+@pytest.mark.parametrize("nomes", [
+    ["Banco X", "Banco Y"],
+    ["Banco Inter", "Banco do Brasil"],
+    ["Banco", "Banco Inter"],
+    ["Tech Solutions A", "Tech Solutions B"],
+    ["Grupo Boticário", "Grupo Globo"],
+])
+def test_empresas_com_a_mesma_palavra_inicial_continuam_separadas(resolver, nomes):
+    assert len(set(resolver(*nomes))) == len(nomes)
+
+
+def test_prefixo_nao_une_empresas_por_um_nome_curto(resolver):
+    porto, porto_seguro, porto_digital = resolver("Porto", "Porto Seguro", "Porto Digital")
+    assert porto == porto_seguro
+    assert porto_digital != porto_seguro
+
+
+def test_prefixo_ambiguo_nao_escolhe_empresa(resolver):
+    seguradora, federal, caixa = resolver("Caixa Seguradora", "Caixa Econômica Federal", "Caixa")
+    assert caixa not in (seguradora, federal)
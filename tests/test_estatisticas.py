@@ -0,0 +1,43 @@
+import pytest
+
+from database import DatabaseManager
+
+
+def vaga(numero, site):
+    return {
+        'titulo': f"Analista {numero}",
+        'empresa': f"Empresa {numero}",
+        'link': f"https://www.linkedin.com/jobs/view/{3000 + numero}",
+        'descricao': "Python",
+        'site_origem': site,
+        'keyword_busca': 'Dados',
+        'estado': 'SP'
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "vagas.db"))
+    for numero, site in enumerate(['linkedin', 'linkedin', 'indeed']):
+        db.inserir_vaga(vaga(numero, site))
+    dados = vaga(0, 'linkedin')
+    db.ocultar_vagas([db.gerar_id_vaga(dados['titulo'], dados['empresa'], dados['link'])])
+    return db
+
+
+def test_estatisticas_ignoram_vagas_ocultas(db):
+    stats = db.obter_estatisticas()
+    assert stats['total_vagas'] == 2
+    assert stats['vagas_unicas'] == 2
+    assert stats['vagas_24h'] == 2
+    assert dict(stats['vagas_por_site'].values.tolist()) == {'linkedin': 1, 'indeed': 1}
+    assert stats['vagas_por_empresa']['quantidade'].sum() == 2
+
+
+def test_estatisticas_do_dashboard_batem_com_a_listagem(db):
+    from app_streamlit_pro import StreamlitAppAvancado
+    app = StreamlitAppAvancado(db.db_path)
+    stats = app.obter_estatisticas()
+    assert stats['total'] == len(app.obter_vagas_dataframe()) == 2
+    assert stats['ultimas_24h'] == 2
+    assert stats['por_site']['count'].sum() == 2
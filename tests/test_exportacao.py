@@ -0,0 +1,76 @@
+import csv
+import os
+import time
+
+import pyarrow.parquet as pq
+import pytest
+
+from database import DatabaseManager
+from exportacao import COLUNAS_EXPORTACAO, exportar_para_temporario, exportar_vagas
+
+
+def vaga(numero, site):
+    return {
+        'titulo': f"Analista de Dados {numero}",
+        'empresa': f"Empresa {numero}",
+        'link': f"https://www.{site}.com/jobs/view/{3000 + numero}",
+        'descricao': f"Descrição completa da vaga {numero}",
+        'site_origem': site
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "vagas.db"))
+    for numero, site in enumerate(['linkedin', 'linkedin', 'indeed', 'indeed']):
+        db.inserir_vaga(vaga(numero, site))
+    dados = vaga(3, 'indeed')
+    db.ocultar_vagas([db.gerar_id_vaga(dados['titulo'], dados['empresa'], dados['link'])])
+    return db
+
+
+def test_parquet_tem_o_esquema_fixo_das_colunas(db, tmp_path):
+    destino = str(tmp_path / "vagas.parquet")
+    assert exportar_vagas(db, destino, 'parquet', incluir_descricao=True, tamanho_lote=2) == 3
+    
+    esquema = pq.read_schema(destino)
+    assert esquema.names == list(COLUNAS_EXPORTACAO) + ['data_coleta', 'descricao']
+    assert all(esquema.field(coluna).type == tipo for coluna, tipo in COLUNAS_EXPORTACAO.items())
+    tabela = pq.read_table(destino)
+    assert sorted(tabela.column('descricao').to_pylist()) == [f"Descrição completa da vaga {numero}"
+                                                              for numero in range(3)]
+
+
+def test_csv_escreve_o_cabecalho_uma_vez_entre_lotes(db, tmp_path):
+    destino = str(tmp_path / "vagas.csv")
+    assert exportar_vagas(db, destino, 'csv', tamanho_lote=1) == 3
+    
+    with open(destino, encoding='utf-8', newline='') as arquivo:
+        linhas = list(csv.reader(arquivo))
+    assert linhas[0] == list(COLUNAS_EXPORTACAO) + ['data_coleta']
+    assert len(linhas) == 4
+    assert 'id' not in [linha[0] for linha in linhas[1:]]
+
+
+def test_filtros_da_listagem_valem_na_exportacao(db, tmp_path):
+    destino = str(tmp_path / "vagas.csv")
+    assert exportar_vagas(db, destino, 'csv', filtros={'site': 'indeed'}) == 1
+    assert exportar_vagas(db, destino, 'csv', filtros={'site': 'indeed', 'mostrar_ocultas': True}) == 2
+    
+    with open(destino, encoding='utf-8', newline='') as arquivo:
+        assert {linha['site_origem'] for linha in csv.DictReader(arquivo)} == {'indeed'}
+
+
+def test_exportacao_remove_arquivos_antigos_do_diretorio(db, tmp_path):
+    diretorio = tmp_path / "exportacoes"
+    diretorio.mkdir()
+    antigo, recente, outro = diretorio / "vagas_antigo.csv", diretorio / "vagas_recente.csv", diretorio / "notas.txt"
+    for arquivo in (antigo, recente, outro):
+        arquivo.write_text("x")
+    duas_horas_atras = time.time() - 7200
+    for arquivo in (antigo, outro):
+        os.utime(arquivo, (duas_horas_atras, duas_horas_atras))
+    
+    caminho, total = exportar_para_temporario(db, 'jsonl', diretorio=str(diretorio))
+    assert total == 3
+    assert sorted(os.listdir(diretorio)) == sorted([os.path.basename(caminho), "vagas_recente.csv", "notas.txt"])
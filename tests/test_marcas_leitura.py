@@ -0,0 +1,45 @@
+import pytest
+
+from database import DatabaseManager
+
+
+def vaga(numero):
+    return {
+        'titulo': f"Analista de Dados {numero}",
+        'empresa': f"Empresa {numero}",
+        'link': f"https://www.linkedin.com/jobs/view/{1000 + numero}",
+        'descricao': "Análise de dados com Python e SQL",
+        'site_origem': 'linkedin'
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseManager(str(tmp_path / "vagas.db"))
+
+
+def test_vaga_inserida_apos_excluir_a_mais_recente_aparece_como_nova(db):
+    db.inserir_vaga(vaga(1))
+    db.inserir_vaga(vaga(2))
+    marca = db.versao_vagas()['ultima_vaga']
+    db.registrar_leitura('ana', marca)
+    
+    # A vaga excluída era a de maior rowid: a próxima inserção reaproveitaria o mesmo rowid
+    dados = vaga(2)
+    db.excluir_vagas([db.gerar_id_vaga(dados['titulo'], dados['empresa'], dados['link'])])
+    db.inserir_vaga(vaga(3))
+    
+    versao = db.versao_vagas()
+    assert versao['ultima_vaga'] > db.obter_marca_leitura('ana')
+    
+    from app_streamlit_pro import StreamlitAppAvancado
+    novas = StreamlitAppAvancado(db.db_path).obter_vagas_dataframe(apos_seq=marca)
+    assert novas['titulo'].tolist() == ["Analista de Dados 3"]
+    assert (novas['seq'] > marca).all()
+
+
+def test_marca_de_leitura_nunca_volta(db):
+    db.inserir_vaga(vaga(1))
+    db.registrar_leitura('ana', 5)
+    db.registrar_leitura('ana', 3)
+    assert db.obter_marca_leitura('ana') == 5
@@ -0,0 +1,78 @@
+import sqlite3
+
+from database import DatabaseManager, MIGRACOES
+
+
+def versao_banco(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_banco_novo_chega_na_ultima_versao(tmp_path):
+    db_path = str(tmp_path / "vagas.db")
+    DatabaseManager(db_path)
+    assert versao_banco(db_path) == len(MIGRACOES)
+
+
+def test_passos_reexecutados_apos_queda_antes_da_versao(tmp_path):
+    # Queda depois dos ALTER TABLE e antes de gravar a versão: os passos rodam de novo no próximo início
+    db_path = str(tmp_path / "vagas.db")
+    DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA user_version = 8")
+    conn.commit()
+    conn.close()
+    
+    DatabaseManager(db_path)
+    assert versao_banco(db_path) == len(MIGRACOES)
+
+
+def test_ids_recalculados_tambem_nas_vagas_similares(tmp_path):
+    db_path = str(tmp_path / "vagas.db")
+    db = DatabaseManager(db_path)
+    for numero in (1, 2):
+        db.inserir_vaga({'titulo': "Dev", 'empresa': "Acme", 'descricao': "Python",
+                         'link': f"https://jobs.acme.com/apply?ref=DEV-{numero}"})
+    
+    # IDs como ficavam quando ref era removido de qualquer URL
+    conn = sqlite3.connect(db_path)
+    antigos = conn.execute("SELECT id, link FROM vagas ORDER BY seq").fetchall()
+    for numero, (vaga_id, _) in enumerate(antigos):
+        conn.execute("UPDATE vagas SET id = ? WHERE id = ?", (f"antigo-{numero}", vaga_id))
+    conn.execute("INSERT INTO vagas_similares VALUES ('antigo-0', 0, 'antigo-1', 0.5)")
+    conn.execute(f"PRAGMA user_version = {MIGRACOES.index('_migracao_parametros_por_site')}")
+    conn.commit()
+    conn.close()
+    
+    DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT id FROM vagas ORDER BY seq").fetchall() == [(vaga_id,) for vaga_id, _ in antigos]
+    assert conn.execute("SELECT vaga_id, similar_id FROM vagas_similares").fetchall() == [
+        (antigos[0][0], antigos[1][0])]
+    conn.close()
+
+
+def test_vaga_excluida_continua_excluida_apos_recalculo_dos_ids(tmp_path):
+    db_path = str(tmp_path / "vagas.db")
+    db = DatabaseManager(db_path)
+    vaga = {'titulo': "Dev", 'empresa': "Acme", 'descricao': "Python",
+            'link': "https://jobs.acme.com/apply?ref=DEV-1"}
+    db.inserir_vaga(vaga)
+    vaga_id = db.gerar_id_vaga(vaga['titulo'], vaga['empresa'], vaga['link'])
+    db.excluir_vagas([vaga_id])
+    
+    # Tombstone gravado com o ID de quando ref era removido de qualquer URL
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE vagas_removidas SET vaga_id = 'antigo' WHERE vaga_id = ?", (vaga_id,))
+    conn.execute(f"PRAGMA user_version = {MIGRACOES.index('_migracao_parametros_por_site')}")
+    conn.commit()
+    conn.close()
+    
+    db = DatabaseManager(db_path)
+    assert db.inserir_vaga(vaga) is False
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT vaga_id FROM vagas_removidas").fetchall() == [(vaga_id,)]
+    conn.close()
@@ -0,0 +1,74 @@
+from pipeline import LoteEnviado, PipelineIngestao
+
+
+class BancoFalso:
+    """Registra os lotes gravados; vagas com 'repetida' não são novas"""
+    
+    def __init__(self, falhar=False):
+        self.lotes = []
+        self.falhar = falhar
+    
+    def inserir_vagas_lote(self, vagas, detalhado=False):
+        if self.falhar:
+            raise RuntimeError("database is locked")
+        self.lotes.append([vaga['titulo'] for vaga in vagas])
+        return [not vaga.get('repetida') for vaga in vagas]
+
+
+def vagas(total, repetidas=()):
+    return [{'titulo': f"Vaga {numero}", 'repetida': numero in repetidas} for numero in range(total)]
+
+
+def test_lotes_respeitam_o_tamanho_e_o_resto_sai_ao_finalizar():
+    banco = BancoFalso()
+    pipeline = PipelineIngestao(banco, tamanho_lote=3, intervalo_lote=60)
+    pipeline.enviar_lote(vagas(7))
+    
+    assert pipeline.finalizar() == 7
+    assert [len(lote) for lote in banco.lotes] == [3, 3, 1]
+    assert pipeline.estatisticas()['lotes_gravados'] == 3
+
+
+def test_lote_incompleto_e_gravado_pelo_prazo():
+    banco = BancoFalso()
+    pipeline = PipelineIngestao(banco, tamanho_lote=50, intervalo_lote=0.05).iniciar()
+    lote = pipeline.enviar_lote(vagas(2))
+    
+    assert lote.aguardar(timeout=5) == 2
+    assert pipeline.thread.is_alive()
+    assert banco.lotes == [["Vaga 0", "Vaga 1"]]
+    pipeline.finalizar()
+
+
+def test_lote_enviado_conta_apenas_as_vagas_novas():
+    pipeline = PipelineIngestao(BancoFalso(), tamanho_lote=2, intervalo_lote=60)
+    lote = pipeline.enviar_lote(vagas(5, repetidas={1, 4}))
+    pipeline.finalizar()
+    
+    assert (lote.total, lote.processadas, lote.novas) == (5, 5, 3)
+    assert pipeline.novas_vagas == 3
+
+
+def test_envio_incremental_acompanha_o_mesmo_lote():
+    pipeline = PipelineIngestao(BancoFalso(), tamanho_lote=10, intervalo_lote=60)
+    lote = LoteEnviado()
+    for vaga in vagas(4, repetidas={0}):
+        pipeline.enviar(vaga, lote=lote)
+    pipeline.finalizar()
+    
+    assert lote.aguardar(timeout=0) == 3
+    assert lote.total == 4
+
+
+def test_erro_na_gravacao_conclui_o_lote_sem_vagas_novas():
+    pipeline = PipelineIngestao(BancoFalso(falhar=True), tamanho_lote=10, intervalo_lote=60)
+    lote = pipeline.enviar_lote(vagas(3))
+    pipeline.finalizar()
+    
+    assert lote.aguardar(timeout=0) == 0
+    assert lote.processadas == 3
+    assert pipeline.estatisticas()['erros'] == 1
+
+
+def test_lote_vazio_ja_esta_concluido():
+    assert LoteEnviado().aguardar(timeout=0) == 0
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager
+from relevancia import IndiceRelevancia
+
+
+def vaga(numero, titulo, descricao):
+    return {
+        'titulo': titulo,
+        'empresa': f"Empresa {numero}",
+        'link': f"https://www.linkedin.com/jobs/view/{2000 + numero}",
+        'descricao': descricao,
+        'site_origem': 'linkedin'
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "vagas.db"))
+    db.inserir_vaga(vaga(1, "Engenheiro de Dados", "Pipelines em Python, Spark e Airflow"))
+    db.inserir_vaga(vaga(2, "Designer de Produto", "Figma, pesquisa com usuários e prototipação"))
+    return db
+
+
+def id_da_vaga(db, dados):
+    return db.gerar_id_vaga(dados['titulo'], dados['empresa'], dados['link'])
+
+
+def test_vaga_que_ocupa_a_seq_da_mais_recente_excluida_e_indexada(db):
+    indice = IndiceRelevancia(db)
+    indice.atualizar()
+    
+    db.excluir_vagas([id_da_vaga(db, vaga(2, "Designer de Produto", ""))])
+    nova = vaga(3, "Desenvolvedor Backend", "APIs em Go e Kubernetes")
+    db.inserir_vaga(nova)
+    
+    assert indice.atualizar() == 1
+    ids, _, pontuacoes = indice.ranquear("desenvolvedor backend go kubernetes")
+    assert ids[0] == id_da_vaga(db, nova)
+    assert pontuacoes[0] > 0
+
+
+def test_ids_divergentes_sao_descartados_do_ranking(db):
+    from app_streamlit_pro import StreamlitAppAvancado
+    app = StreamlitAppAvancado(db.db_path)
+    assert len(app.obter_vagas_relevantes("engenheiro de dados python")) == 2
+    
+    # Mesma seq com outro id (ids recalculados pela canonicalização): a pontuação indexada não vale mais
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("UPDATE vagas SET id = 'renomeada' WHERE titulo = 'Engenheiro de Dados'")
+    conn.commit()
+    conn.close()
+    
+    df = app.obter_vagas_relevantes("engenheiro de dados python")
+    assert 'renomeada' not in df['id'].tolist()
+    
+    # Na consulta seguinte o índice é reconstruído e a vaga volta com o id novo
+    df = app.obter_vagas_relevantes("engenheiro de dados python")
+    assert df['id'].iloc[0] == 'renomeada'
+
+
+def test_gravacoes_concorrentes_usam_temporarios_distintos(db, tmp_path):
+    primeiro, segundo = IndiceRelevancia(db), IndiceRelevancia(db)
+    primeiro.atualizar(salvar=False)
+    segundo.atualizar(salvar=False)
+    
+    with open(primeiro.caminho + ".tmp", 'wb') as arquivo:  # Nome fixo usado antes por qualquer gravação
+        arquivo.write(b"parcial")
+    primeiro.salvar()
+    segundo.salvar()
+    
+    carregado = IndiceRelevancia(db)
+    carregado.carregar()
+    assert list(carregado.seqs) == list(primeiro.seqs)
+    assert sorted(os.listdir(tmp_path)) == sorted(["vagas.db", "vagas_relevancia.npz", "vagas_relevancia.npz.tmp"])
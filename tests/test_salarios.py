@@ -0,0 +1,64 @@
+import pytest
+
+from salarios import (COTACOES_BRL, estruturar_salario, formatar_salario, parsear_salary_info,
+                      salario_mensal_brl)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("R$ 8000.0 - R$ 12000.0 - /monthly", (8000.0, 12000.0, 'monthly')),
+    ("8000.0-12000.0 monthly", (8000.0, 12000.0, 'monthly')),
+    ("R$ 10.000 - R$ 15.000", (10000.0, 15000.0, None)),
+    ("R$ 8.500,50 por mês", (8500.5, None, 'monthly')),
+    ("USD 120,000 - 150,000 /yearly", (120000.0, 150000.0, 'yearly')),
+    ("Não informado", (None, None, None)),
+    ("a combinar", (None, None, None)),
+    (None, (None, None, None)),
+])
+def test_parsear_salary_info(texto, esperado):
+    assert parsear_salary_info(texto) == esperado
+
+
+@pytest.mark.parametrize("minimo, maximo, intervalo, moeda, esperado", [
+    (8000, 12000, 'monthly', 'BRL', 10000.0),
+    (120000, None, 'yearly', 'BRL', 10000.0),
+    (1000, 1000, 'weekly', 'BRL', round(1000 * 52 / 12, 2)),
+    (200, None, 'daily', 'BRL', 4400.0),
+    (50, None, '/hourly', 'brl', 11000.0),
+    (100, None, 'hora', 'BRL', 22000.0),
+    (60000, None, 'anual', 'USD', 60000 * COTACOES_BRL['USD'] / 12),
+    (5000, None, None, 'BRL', 5000.0),  # Sem periodicidade, assume mensal
+    (5000, None, 'monthly', 'XYZ', 5000.0),  # Moeda desconhecida fica sem conversão
+])
+def test_salario_mensal_converte_moeda_e_periodicidade(minimo, maximo, intervalo, moeda, esperado):
+    assert salario_mensal_brl(minimo, maximo, intervalo, moeda) == pytest.approx(esperado)
+
+
+@pytest.mark.parametrize("minimo, maximo, intervalo", [
+    (50, None, 'monthly'),            # Abaixo do mínimo mensal
+    (5_000_000, None, 'monthly'),     # Acima do máximo mensal
+    (120, None, 'yearly'),
+    (None, None, 'monthly'),
+    (-8000, 0, 'monthly'),
+    (float('nan'), None, 'monthly'),
+])
+def test_valores_fora_dos_limites_de_sanidade_sao_descartados(minimo, maximo, intervalo):
+    assert salario_mensal_brl(minimo, maximo, intervalo) is None
+
+
+def test_estruturar_prefere_os_valores_numericos_do_jobspy():
+    salario = estruturar_salario({'salary_min': 5000.0, 'salary_max': float('nan'), 'salary_interval': 'monthly',
+                                  'salary_currency': 'BRL', 'salary_info': "R$ 1 - R$ 2"})
+    assert salario == {'salary_min': 5000.0, 'salary_max': None, 'salary_interval': 'monthly',
+                       'salario_mensal_brl': 5000.0}
+
+
+def test_estruturar_usa_o_texto_quando_nao_ha_valores_numericos():
+    salario = estruturar_salario({'salary_info': "R$ 8000.0 - R$ 12000.0 - /monthly"})
+    assert salario == {'salary_min': 8000.0, 'salary_max': 12000.0, 'salary_interval': 'monthly',
+                       'salario_mensal_brl': 10000.0}
+
+
+def test_formatar_salario():
+    assert formatar_salario(8000, 12000, 'mensal') == "R$ 8.000 - R$ 12.000 /monthly"
+    assert formatar_salario(100000, None, 'yearly', 'usd') == "USD 100.000 /yearly"
+    assert formatar_salario(None, None) == "Não informado"
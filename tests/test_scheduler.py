@@ -0,0 +1,86 @@
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+
+import scraper_jobspy
+from database import DatabaseManager
+from pipeline import PipelineEncerrado
+from scheduler import SchedulerManager
+from scraper_jobspy import JobSpyScraper
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "vagas.db"))
+    agora = time.time()
+    for indice in range(3):
+        inicio = agora - (3 - indice) * 3600
+        db.registrar_execucao_scraping('Dados', 'indeed', inicio, inicio + 5, 10, 3)
+    return db
+
+
+@pytest.fixture
+def scraper(db, monkeypatch):
+    monkeypatch.setattr(scraper_jobspy.time, 'sleep', lambda segundos: None)
+    scraper = JobSpyScraper()
+    scraper._db = db
+    return scraper
+
+
+def bloqueado(**params):
+    raise Exception("429 Client Error: Too Many Requests")
+
+
+def test_site_bloqueado_registra_erro_e_nao_altera_a_cadencia(db, scraper, monkeypatch):
+    scheduler = SchedulerManager(db=db)
+    intervalo = scheduler.calcular_intervalo_adaptativo('Dados', 'indeed')
+    
+    monkeypatch.setattr(scraper_jobspy, 'scrape_jobs_cache', bloqueado)
+    assert scraper.executar_termo_site('Dados', 'indeed') == 0
+    
+    conn = sqlite3.connect(db.db_path)
+    erro, = conn.execute("SELECT erro FROM execucoes_scraping ORDER BY id DESC LIMIT 1").fetchone()
+    conn.close()
+    assert "429" in erro
+    assert scheduler.calcular_intervalo_adaptativo('Dados', 'indeed') == intervalo
+
+
+def test_site_bloqueado_nao_interrompe_os_demais(scraper, monkeypatch):
+    def por_site(site_name, **params):
+        if site_name == ['indeed']:
+            bloqueado()
+        return pd.DataFrame([{'title': "Analista de Dados", 'company': "Acme", 'site': 'google',
+                              'job_url': "https://acme.com/vagas/1"}])
+    
+    monkeypatch.setattr(scraper_jobspy, 'scrape_jobs_cache', por_site)
+    scraper.sites = ['indeed', 'google']
+    vagas = list(scraper.iterar_vagas_termo('Dados'))
+    assert [vaga['site_origem'] for vaga in vagas] == ['google']
+
+
+def test_pos_ingestao_roda_uma_vez_por_lote_de_scrapings(db, monkeypatch):
+    scheduler = SchedulerManager(db=db)
+    execucoes = []
+    monkeypatch.setattr(scheduler, 'atualizar_rollups', lambda: execucoes.append('rollups'))
+    monkeypatch.setattr(scheduler, 'atualizar_indice_relevancia', lambda: execucoes.append('indice'))
+    
+    scheduler.processar_pos_ingestao()
+    assert execucoes == []
+    
+    scheduler._ingestao_pendente.set()
+    scheduler._ingestao_pendente.set()
+    scheduler.processar_pos_ingestao()
+    scheduler.processar_pos_ingestao()
+    assert execucoes == ['rollups', 'indice']
+
+
+def test_job_ainda_em_execucao_nao_reabre_o_pipeline_depois_de_parar(db):
+    scheduler = SchedulerManager(db=db)
+    scheduler.pipeline.iniciar()
+    scheduler.parar()
+    
+    with pytest.raises(PipelineEncerrado):
+        scheduler.pipeline.enviar_lote([{'titulo': "Dev", 'empresa': "Acme", 'link': "https://acme.com/vagas/2"}])
+    assert scheduler.pipeline.thread is None
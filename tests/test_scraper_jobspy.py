@@ -0,0 +1,37 @@
+import multiprocessing
+
+import pytest
+
+import scraper_jobspy
+from scraper_jobspy import JobSpyScraper
+
+
+@pytest.fixture
+def esperas(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(scraper_jobspy.time, 'time', lambda: 1000.0)
+    monkeypatch.setattr(scraper_jobspy.time, 'sleep', esperas.append)
+    return esperas
+
+
+def test_orcamento_compartilhado_por_site_entre_instancias(esperas):
+    with multiprocessing.Manager() as manager:
+        orcamento = (manager.Lock(), manager.dict())
+        scrapers = [JobSpyScraper(), JobSpyScraper()]
+        for scraper in scrapers:
+            scraper.orcamento_compartilhado = orcamento
+        
+        scrapers[0].respeitar_orcamento_requisicoes('indeed')
+        scrapers[1].respeitar_orcamento_requisicoes('indeed')
+        scrapers[1].respeitar_orcamento_requisicoes('linkedin')
+        scrapers[0].respeitar_orcamento_requisicoes('indeed')
+    
+    # Segunda e terceira chamadas ao indeed esperam a vez, vindas de qualquer instância; o linkedin não
+    assert esperas == [2, 4]
+
+
+def test_orcamento_local_sem_compartilhamento(esperas):
+    scraper = JobSpyScraper()
+    scraper.respeitar_orcamento_requisicoes('indeed')
+    scraper.respeitar_orcamento_requisicoes('linkedin')
+    assert esperas == [2]
@@ -0,0 +1,26 @@
+from url_canonica import canonicalizar_url, gerar_id_vaga
+
+
+def test_id_nativo_ignora_parametros():
+    assert canonicalizar_url("https://br.linkedin.com/jobs/view/analista-at-acme-4277185869?trk=abc&refId=x") == (
+        "linkedin:4277185869", "https://www.linkedin.com/jobs/view/4277185869")
+
+
+def test_rastreamento_geral_e_removido_em_qualquer_site():
+    _, url = canonicalizar_url("https://carreiras.acme.com.br/vaga?id=42&utm_source=x&gclid=y&fbclid=z#topo")
+    assert url == "https://carreiras.acme.com.br/vaga?id=42"
+
+
+def test_parametros_de_outro_site_continuam_na_url():
+    # ref e position identificam a vaga nesta página de carreira: vagas diferentes não viram a mesma URL
+    _, url_a = canonicalizar_url("https://jobs.acme.com/apply?ref=DEV-1&position=backend")
+    _, url_b = canonicalizar_url("https://jobs.acme.com/apply?ref=DEV-2&position=backend")
+    assert url_a != url_b
+    assert gerar_id_vaga("Dev", "Acme", url_a) != gerar_id_vaga("Dev", "Acme", url_b)
+
+
+def test_parametros_do_proprio_site_sao_removidos():
+    _, url = canonicalizar_url("https://www.linkedin.com/jobs/search/?keywords=dados&trk=public&position=3")
+    assert url == "https://www.linkedin.com/jobs/search?keywords=dados"
+    _, url = canonicalizar_url("https://br.indeed.com/empregos?q=dados&from=searchOnHP")
+    assert url == "https://br.indeed.com/empregos?q=dados"
@@ -0,0 +1,101 @@
+"""
+Normalização dos links das vagas:
+extrai o ID nativo da vaga em cada site (LinkedIn, Indeed, Glassdoor, ZipRecruiter) e monta uma URL canônica
+sem parâmetros de rastreamento, para que a mesma vaga gere sempre o mesmo ID no banco.
+"""
+
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Parâmetros de rastreamento removidos das URLs sem ID nativo em qualquer site (além dos utm_*)
+PARAMETROS_RASTREAMENTO = {
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'gbraid', 'wbraid', 'yclid', 'mc_cid', 'mc_eid', 'igshid', '_ga', '_gl'
+}
+
+# Parâmetros de navegação e rastreamento conhecidos de cada site. Fora deles, nomes como ref, position
+# ou from podem identificar a vaga (páginas de carreira próprias) e ficam na URL canônica
+PARAMETROS_RASTREAMENTO_POR_SITE = {
+    'linkedin': {'refid', 'trackingid', 'trk', 'trkinfo', 'currentjobid', 'position', 'pagenum', 'ebp'},
+    'indeed': {'from', 'vjk', 'advn', 'adid', 'tk', 'xkcb', 'fccid', 'vjs', 'sjdu'},
+    'glassdoor': {'src', 'pos', 'ao', 'guid'},
+    'ziprecruiter': {'ref', 'source'},
+}
+
+def _parametros(partes):
+    return {nome.lower(): valor for nome, valor in parse_qsl(partes.query, keep_blank_values=True)}
+
+def _id_linkedin(partes, parametros):
+    # /jobs/view/4277185869 ou /jobs/view/analista-bi-sr-at-empresa-4277185869
+    busca = re.search(r"/jobs/view/(?:[^/]*?-)?(\d{6,})", partes.path)
+    if busca:
+        return busca.group(1)
+    # Páginas de busca apontam para a vaga selecionada
+    if parametros.get('currentjobid', '').isdigit():
+        return parametros['currentjobid']
+    return None
+
+def _id_indeed(partes, parametros):
+    for nome in ('jk', 'vjk'):
+        if re.fullmatch(r"[0-9a-f]{16}", parametros.get(nome, '')):
+            return parametros[nome]
+    return None
+
+def _id_glassdoor(partes, parametros):
+    # .../job-listing/cargo-empresa-JV_IC123_KO0,17_KE18,31.htm?jl=1009123456
+    for nome in ('jl', 'joblistingid'):
+        if parametros.get(nome, '').isdigit():
+            return parametros[nome]
+    return None
+
+def _id_ziprecruiter(partes, parametros):
+    # .../c/Empresa/Job/Cargo/-in-Cidade?jid=abc123
+    return parametros.get('jid') or None
+
+# host -> (site, extrator do ID, modelo da URL canônica)
+SITES = [
+    ('linkedin.com', 'linkedin', _id_linkedin, "https://www.linkedin.com/jobs/view/{id}"),
+    ('indeed.com', 'indeed', _id_indeed, "https://{host}/viewjob?jk={id}"),
+    ('glassdoor.com', 'glassdoor', _id_glassdoor, "https://{host}/job-listing/?jl={id}"),
+    ('glassdoor.com.br', 'glassdoor', _id_glassdoor, "https://{host}/job-listing/?jl={id}"),
+    ('ziprecruiter.com', 'ziprecruiter', _id_ziprecruiter, "https://www.ziprecruiter.com/jobs/?jid={id}"),
+]
+
+def _identificar_site(host):
+    for dominio, site, extrator, modelo in SITES:
+        if host == dominio or host.endswith("." + dominio):
+            return site, extrator, modelo
+    return None, None, None
+
+def _limpar_url(partes, host, site=None):
+    """URL sem fragmento, sem parâmetros de rastreamento (gerais e do site) e com parâmetros ordenados"""
+    rastreamento = PARAMETROS_RASTREAMENTO | PARAMETROS_RASTREAMENTO_POR_SITE.get(site, set())
+    parametros = sorted(
+        (nome, valor) for nome, valor in parse_qsl(partes.query, keep_blank_values=True)
+        if nome.lower() not in rastreamento and not nome.lower().startswith('utm_')
+    )
+    caminho = partes.path.rstrip('/') or '/'
+    return urlunsplit(('https', host, caminho, urlencode(parametros), ''))
+
+def canonicalizar_url(link):
+    """Retorna (site_job_id, canonical_url); site_job_id é None quando o site não tem ID reconhecível"""
+    link = str(link or '').strip()
+    if not link.startswith('http'):
+        return None, link
+    
+    partes = urlsplit(link)
+    host = partes.netloc.lower().split('@')[-1].split(':')[0]
+    site, extrator, modelo = _identificar_site(host)
+    
+    if extrator:
+        id_nativo = extrator(partes, _parametros(partes))
+        if id_nativo:
+            return f"{site}:{id_nativo}", modelo.format(id=id_nativo, host=host)
+    
+    return None, _limpar_url(partes, host, site)
+
+def gerar_id_vaga(titulo, empresa, link):
+    """ID estável da vaga: pelo ID nativo do site ou, sem ele, por título + empresa + URL canônica"""
+    site_job_id, canonical_url = canonicalizar_url(link)
+    texto_hash = site_job_id if site_job_id else f"{titulo}{empresa}{canonical_url}"
+    return hashlib.md5(texto_hash.encode()).hexdigest()